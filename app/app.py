@@ -1,13 +1,30 @@
-from fastapi import FastAPI, Depends, Header, HTTPException
-from pydantic import BaseModel
-import pandas as pd
-import joblib
 import os
+import sys
 import json
+import asyncio
+import threading
 from datetime import datetime
-from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
-import requests
+from contextlib import asynccontextmanager
+from typing import List
+
+# Imported first so every later import is counted in the boot report
+from phase_04_mlops.monitoring.startup_report import (
+    startup_phase,
+    lazy_import,
+    mark_boot_complete,
+    log_startup_report,
+    get_startup_report
+)
+
+with startup_phase("framework"):
+    from fastapi import FastAPI, Depends, Header, HTTPException, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+    from starlette.concurrency import run_in_threadpool
+    from pydantic import BaseModel
+    from dotenv import load_dotenv
+    import numpy as np
+    import joblib
 
 
 # ===============================
@@ -38,21 +55,53 @@ def verify_api_key(x_api_key: str = Header(..., alias="X-API-KEY")):
 # ===============================
 # LOGGING
 # ===============================
-from phase_04_mlops.logging.logger import log_prediction
+with startup_phase("metrics"):
+    from phase_04_mlops.monitoring.metrics import (
+        time_stage,
+        record_prediction,
+        render_prometheus,
+        get_latency_summary,
+        start_metrics_flusher,
+        stop_metrics_flusher
+    )
+    from phase_04_mlops.monitoring.middleware import MetricsMiddleware
+
+with startup_phase("prediction_logger"):
+    from phase_04_mlops.logging.logger import (
+        log_prediction,
+        log_predictions,
+        start_writer,
+        stop_writer,
+        get_logger_stats
+    )
+    from phase_04_mlops.logging.prediction_store import scan_predictions, tail_predictions
 
 # ===============================
 # SAFE DRIFT IMPORT
 # ===============================
 try:
-    from phase_04_mlops.drift.drift_detector import check_drift
+    with startup_phase("drift"):
+        from phase_04_mlops.drift.drift_detector import (
+            check_drift,
+            check_drift_batch,
+            get_drift_report
+        )
 except ImportError:
-    def check_drift(feature_name, value):
+    def check_drift(feature_name, value, plant_id=0):
         return False
 
-from phase_08_agent.memory import add_memory
-from phase_08_agent.risk_engine import calculate_risk
-from phase_08_agent.alert_system import log_alert
-from phase_08_agent.financial_engine import estimate_financial_risk
+    def check_drift_batch(feature_name, values, plant_ids=None):
+        return np.zeros(len(values), dtype=bool)
+
+    def get_drift_report(plant_id=None):
+        return {"drift_risk": "UNKNOWN", "error": "drift detector unavailable"}
+
+# Light rule-based engines; agents, orchestrator and RAG load on first use
+with startup_phase("agent_engines"):
+    from phase_08_agent.memory import add_memory
+    from phase_08_agent.risk_engine import calculate_risk
+    from phase_08_agent.alert_system import log_alert
+    from phase_08_agent.financial_engine import estimate_financial_risk
 
 # ===============================
 # RUNTIME STATE
@@ -80,32 +129,32 @@ forecast_features_path = os.path.join(
 if not os.path.exists(forecast_features_path):
     raise FileNotFoundError(f"Forecast features not found at {forecast_features_path}")
 
-FORECAST_FEATURES = joblib.load(forecast_features_path)
+with startup_phase("forecast_features"):
+    FORECAST_FEATURES = joblib.load(forecast_features_path)
 
 # ===============================
 # DYNAMIC MODEL LOADER (Multi-Site Support)
 # ===============================
-def load_forecast_model(plant_id: int):
-    ft_model_path = os.path.join(
-        BASE_DIR,
-        "models",
-        "forecasting",
-        f"xgb_plant_{plant_id}_ft.pkl"
+with startup_phase("serving"):
+    from phase_04_mlops.serving.model_pool import (
+        get_forecast_entry,
+        get_forecast_model,
+        get_pool_stats
     )
-
-    base_model_path = os.path.join(
-        BASE_DIR,
-        "models",
-        "forecasting",
-        "xgb_base_model.pkl"
+    from phase_04_mlops.serving.feature_layout import forecast_layout, pdm_layout, without_feature_names
+    from phase_04_mlops.serving.telemetry import TELEMETRY_STORE, PDM_FEATURES, parse_ndjson
+    from phase_04_mlops.serving.artifact_cache import load_json, get_cache_stats
+    from phase_04_mlops.serving.batch_inference import (
+        build_feature_matrix,
+        predict_batch,
+        score_anomalies
     )
 
-    if os.path.exists(ft_model_path):
-        print(f"Loading fine-tuned model for plant {plant_id}")
-        return joblib.load(ft_model_path)
-
-    print("Loading base model")
-    return joblib.load(base_model_path)
+def load_forecast_model(plant_id: int):
+    # Served from the in-process pool; reloads only when the
+    # xgb_plant_{id}_ft.pkl / xgb_base_model.pkl file changes on disk
+    model, _ = get_forecast_model(plant_id)
+    return model
 
 # ===============================
 # LOAD PdM MODEL
@@ -130,13 +179,40 @@ if not os.path.exists(pdm_model_path):
 if not os.path.exists(pdm_features_path):
     raise FileNotFoundError(f"PdM features not found at {pdm_features_path}")
 
-pdm_model = joblib.load(pdm_model_path)
-pdm_features = joblib.load(pdm_features_path)
+with startup_phase("pdm_model"):
+    pdm_features = joblib.load(pdm_features_path)
+    # Scored on float32 matrices in pdm_features order, never DataFrames
+    pdm_model = without_feature_names(joblib.load(pdm_model_path), pdm_features)
+
+    # Column slots resolved once from pdm_features.pkl
+    PDM_LAYOUT = pdm_layout(pdm_model, pdm_features)
 
 # ===============================
 # FASTAPI APP
 # ===============================
-app = FastAPI(title="SolarOps AI Platform")
+with startup_phase("rag_readiness"):
+    from phase_12_vector_rag.readiness import (
+        start_background_ingestion,
+        rag_available,
+        readiness_label,
+        get_readiness
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background prediction log writer; flush pending rows on shutdown
+    start_writer()
+    # Per-worker metric snapshots (only with METRICS_MULTIPROC_DIR)
+    start_metrics_flusher()
+    # Phase 12 — warm the vector index without blocking startup
+    start_background_ingestion()
+    mark_boot_complete()
+    log_startup_report()
+    yield
+    stop_writer()
+    stop_metrics_flusher()
+
+app = FastAPI(title="SolarOps AI Platform", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -145,24 +221,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency covers CORS handling and error responses
+app.add_middleware(MetricsMiddleware)
+
 # ===============================
-# PHASE 12 — VECTOR RAG STARTUP
+# PROMETHEUS METRICS
 # ===============================
-try:
-    from phase_12_vector_rag.ingestion_pipeline import run_full_ingestion
-    from phase_12_vector_rag.vector_store import get_stats as vector_get_stats
-    run_full_ingestion()
-except Exception as e:
-    print(f"[Phase 12] Warning: Vector RAG startup failed: {e}")
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(verify_api_key)])
+def prometheus_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 # ===============================
 # VECTOR STATS ENDPOINT
 # ===============================
 @app.get("/vector-stats", dependencies=[Depends(verify_api_key)])
 def vector_stats():
+    if not rag_available():
+        return {"degraded_mode": True, "rag": get_readiness()}
     try:
-        from phase_12_vector_rag.vector_store import get_stats
-        return get_stats()
+        vector_store = lazy_import("vector_store", "phase_12_vector_rag.vector_store")
+        return vector_store.get_stats()
     except Exception as e:
         return {"error": str(e)}
 
@@ -183,16 +261,93 @@ def root():
 def health_check():
     return {
         "status": "healthy",
+        "readiness": readiness_label(),
         "environment": ENV,
         "uptime_seconds": (datetime.utcnow() - START_TIME).total_seconds(),
         "forecast_multi_site_enabled": True,
         "pdm_model_loaded": True,
+        "model_pool": get_pool_stats(),
+        "artifact_cache": get_cache_stats(),
+        "prediction_logger": get_logger_stats(),
+        "telemetry": TELEMETRY_STORE.stats(),
+        "latency": get_latency_summary(),
+        "rag": get_readiness(),
+        # Only reported once the agents loaded the shared LLM client
+        "llm": (
+            sys.modules["phase_09_agent_orchestration.llm_client"].get_llm_stats()
+            if "phase_09_agent_orchestration.llm_client" in sys.modules else None
+        ),
+        "planner": (
+            sys.modules["phase_13_tool_calling.llm_planner"].get_planner_stats()
+            if "phase_13_tool_calling.llm_planner" in sys.modules else None
+        ),
+        "prompts": (
+            sys.modules["phase_09_agent_orchestration.prompt_builder"].get_prompt_stats()
+            if "phase_09_agent_orchestration.prompt_builder" in sys.modules else None
+        ),
+        "ops_store": (
+            sys.modules["phase_04_mlops.storage.ops_store"].get_store_stats()
+            if "phase_04_mlops.storage.ops_store" in sys.modules else None
+        ),
+        "alert_index": (
+            sys.modules["phase_08_agent.alert_index"].ALERT_INDEX.stats()
+            if "phase_08_agent.alert_index" in sys.modules else None
+        ),
+        "embedding_cache": (
+            sys.modules["phase_12_vector_rag.embedding_cache"].get_embedding_cache_stats()
+            if "phase_12_vector_rag.embedding_cache" in sys.modules else None
+        ),
+        "rag_query_cache": (
+            sys.modules["phase_12_vector_rag.query_cache"].get_query_cache_stats()
+            if "phase_12_vector_rag.query_cache" in sys.modules else None
+        ),
+        "rag_lexical_index": (
+            sys.modules["phase_12_vector_rag.lexical_index"].get_lexical_stats()
+            if "phase_12_vector_rag.lexical_index" in sys.modules else None
+        ),
+        "onnx_embedder": (
+            sys.modules["phase_12_vector_rag.onnx_embedder"].get_onnx_stats()
+            if "phase_12_vector_rag.onnx_embedder" in sys.modules else None
+        ),
         "last_prediction_time": (
             LAST_PREDICTION_TIME.isoformat()
             if LAST_PREDICTION_TIME else None
         )
     }
 
+# ===============================
+# STARTUP REPORT (Import Budget)
+# ===============================
+@app.get("/startup-report", dependencies=[Depends(verify_api_key)])
+def startup_report():
+    return {
+        **get_startup_report(),
+        "rag_warmup": get_readiness()
+    }
+
+# ===============================
+# DRIFT STATUS (Streaming Windows)
+# ===============================
+@app.get("/drift-status", dependencies=[Depends(verify_api_key)])
+def drift_status(plant_id: int = None):
+    return get_drift_report(plant_id)
+
+# ===============================
+# PREDICTION LOGS (segment store)
+# ===============================
+@app.get("/prediction-logs", dependencies=[Depends(verify_api_key)])
+def prediction_logs(limit: int = 50, since: str = None, until: str = None):
+    """Newest `limit` predictions, or those in [since, until) when a range is given."""
+    limit = max(1, min(limit, 5000))
+    try:
+        if since or until:
+            records = scan_predictions(since=since, until=until, limit=limit)
+        else:
+            records = tail_predictions(limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid time range: {e}")
+    return {"count": len(records), "records": records}
+
 # ===============================
 # INPUT SCHEMAS
 # ===============================
@@ -203,6 +358,9 @@ class SolarInput(BaseModel):
     day: int
     month: int
 
+class SolarBatchInput(BaseModel):
+    rows: List[SolarInput]
+
 class PdMInput(BaseModel):
     DC_POWER: float
     AC_POWER: float
@@ -213,6 +371,9 @@ class PdMInput(BaseModel):
     ac_roll_mean_6: float
     dc_roll_mean_6: float
 
+class PdMBatchInput(BaseModel):
+    rows: List[PdMInput]
+
 class OptimizationInput(BaseModel):
     AC_POWER: float
     expected_ac_power: float
@@ -226,23 +387,15 @@ def predict_power(data: SolarInput):
     global LAST_PREDICTION_TIME
     LAST_PREDICTION_TIME = datetime.utcnow()
 
-    model = load_forecast_model(data.plant_id)
-
-    # Create minimal input
-    df = pd.DataFrame([{
-        "plant_id": data.plant_id,
-        "DC_POWER": data.DC_POWER,
-        "hour": data.hour,
-        "day": data.day,
-        "month": data.month
-    }])
-
-    # Align strictly to model features
-    expected_features = model.get_booster().feature_names
-    df = df.reindex(columns=expected_features, fill_value=0)
+    # Precompiled layout: request fields -> float32 row, no DataFrame
+    entry, _ = get_forecast_entry(data.plant_id)
+    layout = forecast_layout(entry)
 
-    prediction = model.predict(df)[0]
-    drift_detected = check_drift("DC_POWER", data.DC_POWER)
+    with time_stage("forecast_inference"):
+        prediction = layout.predict(data)[0]
+    with time_stage("drift_check"):
+        drift_detected = check_drift("DC_POWER", data.DC_POWER, plant_id=data.plant_id)
+    record_prediction()
 
     log_prediction(
         endpoint="predict-power",
@@ -259,6 +412,60 @@ def predict_power(data: SolarInput):
         "drift_detected": drift_detected
     }
 
+# ===============================
+# PHASE 1 – BATCH FORECASTING (Vectorized Multi-Plant)
+# ===============================
+@app.post("/predict-power/batch", dependencies=[Depends(verify_api_key)])
+def predict_power_batch(data: SolarBatchInput):
+    global LAST_PREDICTION_TIME
+    LAST_PREDICTION_TIME = datetime.utcnow()
+
+    rows = data.rows
+    if not rows:
+        return {"count": 0, "models_used": {}, "predictions": []}
+
+    # Column-major view of the request, one contiguous array per field
+    columns = {
+        "plant_id": np.fromiter((r.plant_id for r in rows), dtype=np.int64, count=len(rows)),
+        "DC_POWER": np.fromiter((r.DC_POWER for r in rows), dtype=np.float64, count=len(rows)),
+        "hour": np.fromiter((r.hour for r in rows), dtype=np.int64, count=len(rows)),
+        "day": np.fromiter((r.day for r in rows), dtype=np.int64, count=len(rows)),
+        "month": np.fromiter((r.month for r in rows), dtype=np.int64, count=len(rows)),
+    }
+
+    with time_stage("forecast_batch_inference"):
+        predictions, models_used = predict_batch(columns)
+    with time_stage("drift_check_batch"):
+        drift_flags = check_drift_batch("DC_POWER", columns["DC_POWER"], columns["plant_id"])
+    record_prediction(count=len(rows))
+
+    results = [
+        {
+            "plant_id": int(plant_id),
+            "prediction": float(prediction),
+            "drift_detected": bool(drift)
+        }
+        for plant_id, prediction, drift in zip(columns["plant_id"], predictions, drift_flags)
+    ]
+
+    log_predictions(
+        {
+            "endpoint": "predict-power-batch",
+            "dc_power": r.DC_POWER,
+            "ac_power": None,
+            "prediction": res["prediction"],
+            "status": "drift_detected" if res["drift_detected"] else "success",
+            "model_version": f"plant_{r.plant_id}"
+        }
+        for r, res in zip(rows, results)
+    )
+
+    return {
+        "count": len(results),
+        "models_used": models_used,
+        "predictions": results
+    }
+
 # ===============================
 # PHASE 2 – PREDICTIVE MAINTENANCE
 # ===============================
@@ -271,12 +478,10 @@ def detect_anomaly(data: PdMInput):
         prediction = -1
         status = "abnormal_rule"
     else:
-        X = pd.DataFrame(
-            [[getattr(data, f) for f in pdm_features]],
-            columns=pdm_features
-        )
-        prediction = pdm_model.predict(X)[0]
+        with time_stage("anomaly_inference"):
+            prediction = PDM_LAYOUT.predict(data)[0]
         status = "abnormal_ml" if prediction == -1 else "normal"
+    record_prediction(is_anomaly=prediction == -1)
 
     log_prediction(
         endpoint="detect-anomaly",
@@ -292,6 +497,135 @@ def detect_anomaly(data: PdMInput):
         "action": "Check inverter / system health" if prediction == -1 else "No action required"
     }
 
+# ===============================
+# PHASE 2 – BATCH ANOMALY SCORING
+# ===============================
+@app.post("/detect-anomaly/batch", dependencies=[Depends(verify_api_key)])
+def detect_anomaly_batch(data: PdMBatchInput):
+    global LAST_PREDICTION_TIME
+    LAST_PREDICTION_TIME = datetime.utcnow()
+
+    rows = data.rows
+    if not rows:
+        return {"count": 0, "abnormal_count": 0, "rule_flagged": 0, "results": []}
+
+    columns = {
+        f: np.fromiter((getattr(r, f) for r in rows), dtype=np.float64, count=len(rows))
+        for f in pdm_features
+    }
+    X = build_feature_matrix(columns, pdm_features)
+
+    # Hard rule as a vectorized mask; only the rest reach the model
+    rule_mask = (columns["DC_POWER"] > 3000) & (columns["AC_POWER"] < 100)
+    with time_stage("anomaly_batch_scoring"):
+        labels, scores = score_anomalies(pdm_model, X, rule_mask)
+    record_prediction(is_anomaly=int((labels == -1).sum()), count=len(rows))
+
+    results = []
+    for is_rule, label, score in zip(rule_mask.tolist(), labels.tolist(), scores.tolist()):
+        abnormal = label == -1
+        results.append({
+            "status": "Abnormal" if abnormal else "Normal",
+            "action": "Check inverter / system health" if abnormal else "No action required",
+            "source": "rule" if is_rule else "ml",
+            "anomaly_score": None if is_rule else score
+        })
+
+    log_predictions(
+        {
+            "endpoint": "detect-anomaly-batch",
+            "dc_power": r.DC_POWER,
+            "ac_power": r.AC_POWER,
+            "prediction": label,
+            "status": "abnormal_rule" if is_rule else ("abnormal_ml" if label == -1 else "normal"),
+            "model_version": "isolation_forest_v1"
+        }
+        for r, is_rule, label in zip(rows, rule_mask.tolist(), labels.tolist())
+    )
+
+    return {
+        "count": len(results),
+        "abnormal_count": int((labels == -1).sum()),
+        "rule_flagged": int(rule_mask.sum()),
+        "results": results
+    }
+
+# ===============================
+# PHASE 2 – TELEMETRY INGESTION (Server-side PdM Features)
+# ===============================
+def _process_telemetry(body: bytes, score: bool) -> dict:
+    readings, errors = parse_ndjson(body)
+
+    with time_stage("telemetry_features"):
+        feature_rows = TELEMETRY_STORE.ingest(readings)
+
+    results = []
+    ready = []
+    for reading, features in zip(readings, feature_rows):
+        if isinstance(features, str):
+            results.append({"inverter_id": reading.get("inverter_id"), "status": "rejected", "reason": features})
+            continue
+        results.append({
+            "inverter_id": reading["inverter_id"],
+            "timestamp": reading.get("timestamp"),
+            "status": "warming_up" if features is None else "ok",
+            "features": None if features is None else dict(zip(PDM_FEATURES, features))
+        })
+        if features is not None:
+            ready.append((len(results) - 1, features))
+
+    if score and ready:
+        matrix = np.array([f for _, f in ready], dtype=np.float64)
+        columns = {name: matrix[:, i] for i, name in enumerate(PDM_FEATURES)}
+        X = build_feature_matrix(columns, pdm_features)
+        rule_mask = (columns["DC_POWER"] > 3000) & (columns["AC_POWER"] < 100)
+        with time_stage("anomaly_batch_scoring"):
+            labels, scores = score_anomalies(pdm_model, X, rule_mask)
+        record_prediction(is_anomaly=int((labels == -1).sum()), count=len(ready))
+
+        for (i, _), is_rule, label, raw in zip(ready, rule_mask.tolist(), labels.tolist(), scores.tolist()):
+            results[i]["anomaly"] = {
+                "status": "Abnormal" if label == -1 else "Normal",
+                "source": "rule" if is_rule else "ml",
+                "anomaly_score": None if is_rule else raw
+            }
+
+        log_predictions(
+            {
+                "endpoint": "telemetry",
+                "dc_power": f[0],
+                "ac_power": f[1],
+                "prediction": label,
+                "status": "abnormal_rule" if is_rule else ("abnormal_ml" if label == -1 else "normal"),
+                "model_version": "isolation_forest_v1"
+            }
+            for (_, f), is_rule, label in zip(ready, rule_mask.tolist(), labels.tolist())
+        )
+
+    return {
+        "accepted": sum(1 for r in results if r["status"] != "rejected"),
+        "rejected": sum(1 for r in results if r["status"] == "rejected") + len(errors),
+        "features_ready": len(ready),
+        "scored": len(ready) if score else 0,
+        "errors": errors,
+        "results": results
+    }
+
+
+@app.post("/telemetry", dependencies=[Depends(verify_api_key)])
+async def ingest_telemetry(request: Request, score: bool = False):
+    """
+    NDJSON body, one reading per line:
+        {"inverter_id": "...", "timestamp": "...", "DC_POWER": x, "AC_POWER": y}
+    """
+    global LAST_PREDICTION_TIME
+
+    body = await request.body()
+    result = await run_in_threadpool(_process_telemetry, body, score)
+    if score and result["scored"]:
+        LAST_PREDICTION_TIME = datetime.utcnow()
+    return result
+
 # ===============================
 # PHASE 3 – OPTIMIZATION
 # ===============================
@@ -381,32 +715,18 @@ def get_model_metrics():
         "phase_06_evaluation",
         "evaluation_report.json"
     )
-    with open(metrics_path) as f:
-        return json.load(f)
-
-import requests
-
+    return load_json(metrics_path)
 
 def tool_get_model_metrics():
     path = os.path.join(BASE_DIR, "phase_06_evaluation", "evaluation_report.json")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)
-    return {}
+    return load_json(path, default={})
 
 def tool_get_recent_logs():
-    path = os.path.join(BASE_DIR, "phase_04_mlops", "logging", "prediction_logs.json")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)[-5:]
-    return []
+    return tail_predictions(5)
 
 def tool_get_metrics_history():
     path = os.path.join(BASE_DIR, "phase_06_evaluation", "metrics_history.json")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)[-3:]
-    return []
+    return load_json(path, default=[])[-3:]
 
 
 class AskAIInput(BaseModel):
@@ -418,18 +738,97 @@ class AskAIInput(BaseModel):
 def ask_ai(data: AskAIInput):
 
     # --- Phase 9 + Phase 10: Full Orchestration (with simulation) ---
-    from phase_09_agent_orchestration.orchestrator import run_orchestration
+    orchestrator = lazy_import("orchestrator", "phase_09_agent_orchestration.orchestrator")
 
-    result = run_orchestration(data.plant_id, data.question)
+    with time_stage("orchestration"):
+        result = orchestrator.run_orchestration(data.plant_id, data.question)
 
-    return {
+    return _ask_ai_response(data, result)
+
+
+def _ask_ai_response(data: AskAIInput, result: dict) -> dict:
+    response = {
         "plant_id": data.plant_id,
         "question": data.question,
         "agent_type": "orchestrated_multi_agent",
         "ai_response": result
     }
 
-from phase_08_agent.coordinator_agent import run_multi_agent
+    # Historical answers are served without vector context until warm
+    if not rag_available():
+        response["degraded_mode"] = True
+        response["rag_status"] = get_readiness()["status"]
+
+    return response
+
+# ===============================
+# ASK AI — STREAMING (Server-Sent Events)
+# ===============================
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _produce_events(events, loop, queue: asyncio.Queue, stop: threading.Event):
+    """Drive the orchestration generator on one thread; stop early on disconnect."""
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # event loop already gone
+
+    try:
+        for item in events:
+            if stop.is_set():
+                break
+            put(item)
+    except Exception as e:
+        put(("error", {"error": str(e)}))
+    finally:
+        # Runs pending finally blocks, e.g. cancels an in-flight LLM stream
+        events.close()
+        put(None)
+
+
+@app.post("/ask-ai/stream", dependencies=[Depends(verify_api_key)])
+async def ask_ai_stream(data: AskAIInput):
+    """
+    /ask-ai as Server-Sent Events: routing, plan, each tool_result and
+    the alert decision as soon as they are ready, then the summary as
+    token events and a final "done" event with the /ask-ai payload.
+    """
+    orchestrator = await run_in_threadpool(
+        lazy_import, "orchestrator", "phase_09_agent_orchestration.orchestrator"
+    )
+    events = orchestrator.iter_orchestration(data.plant_id, data.question, stream_summary=True)
+
+    async def event_stream():
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        threading.Thread(
+            target=_produce_events,
+            args=(events, asyncio.get_running_loop(), queue, stop),
+            name="ask-ai-stream",
+            daemon=True
+        ).start()
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, payload = item
+                if event == "done":
+                    payload = _ask_ai_response(data, payload)
+                yield _sse(event, payload)
+        finally:
+            # Client disconnected or stream finished: stop remaining work
+            stop.set()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/multi-agent-analysis", dependencies=[Depends(verify_api_key)])
 def multi_agent_analysis():
@@ -440,9 +839,10 @@ def multi_agent_analysis():
         "evaluation_report.json"
     )
 
-    with open(metrics_path) as f:
-        metrics = json.load(f)
+    metrics = load_json(metrics_path)
 
-    result = run_multi_agent(metrics)
+    coordinator = lazy_import("multi_agent", "phase_08_agent.coordinator_agent")
+    with time_stage("multi_agent"):
+        result = coordinator.run_multi_agent(metrics)
 
     return result
@@ -0,0 +1,117 @@
+"""
+Phase 12 — Embedding Backend Throughput Benchmark
+
+Compares the sentence-transformers (PyTorch) backend against the
+int8-quantized ONNX Runtime backend on CPU:
+
+  - bulk throughput (sentences/s) at several batch sizes, on a mix
+    of short questions and long alert / log documents
+  - single-query latency p50 / p95
+  - concurrent single-query throughput (ONNX dynamic batching)
+  - cosine similarity of the ONNX vectors to the torch ones
+
+Usage:
+    python benchmarks/bench_embeddings.py [n_sentences]
+
+Exports the ONNX model on first run (needs torch, onnxruntime).
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BASE_DIR)
+
+from phase_12_vector_rag.config import EMBEDDING_MODEL_NAME
+from phase_12_vector_rag.onnx_embedder import OnnxEmbedder
+
+QUESTIONS = [
+    "Have we seen critical alerts before?",
+    "P0 on plant 2",
+    "What happened with alert 3f2a9c1b?",
+    "Is the model drifting?",
+]
+DOCUMENT = (
+    "Alert {i} at 2025-06-01T12:{m:02d}:00: Severity P{s}, Priority HIGH, Plant {p}. "
+    "Decision: schedule inverter inspection. Message: DC_POWER dropped {d}% below forecast "
+    "for three consecutive intervals. Context: {{\"dc_power\": {dc}, \"ac_power\": {ac}}}"
+)
+
+
+def _corpus(n: int) -> list:
+    rng = np.random.default_rng(0)
+    texts = []
+    for i in range(n):
+        if i % 3 == 0:
+            texts.append(QUESTIONS[i % len(QUESTIONS)])
+        else:
+            texts.append(DOCUMENT.format(
+                i=i, m=i % 60, s=i % 3, p=1 + i % 4, d=int(rng.integers(5, 60)),
+                dc=round(float(rng.random() * 4000), 1), ac=round(float(rng.random() * 400), 1),
+            ) * (1 + i % 4))
+    return texts
+
+
+def _throughput(encode, texts: list, batch_size: int) -> float:
+    encode(texts[:batch_size])  # warm-up
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        encode(texts[start:start + batch_size])
+    return len(texts) / (time.perf_counter() - started)
+
+
+def _latency(encode_one, texts: list) -> tuple:
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        encode_one(text)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+
+def _concurrent(encode_one, texts: list, workers: int = 8) -> float:
+    with ThreadPoolExecutor(workers) as pool:
+        started = time.perf_counter()
+        list(pool.map(encode_one, texts))
+    return len(texts) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    texts = _corpus(n)
+    queries = [QUESTIONS[i % len(QUESTIONS)] + f" (#{i})" for i in range(100)]
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch_model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+    onnx_model = OnnxEmbedder()
+
+    backends = {
+        "torch": (lambda batch: torch_model.encode(batch, batch_size=len(batch)),
+                  lambda text: torch_model.encode(text)),
+        f"onnx-int8 ({onnx_model.threads} threads)": (onnx_model.encode, onnx_model.encode_one),
+    }
+
+    print(f"Embedding throughput on CPU ({n} sentences, torch threads={torch.get_num_threads()})")
+    print(f"{'backend':<28} {'batch':>6} {'sent/s':>10}")
+    for name, (encode, _) in backends.items():
+        for batch_size in (1, 8, 32, 128):
+            print(f"{name:<28} {batch_size:>6} {_throughput(encode, texts, batch_size):>10.1f}")
+
+    print(f"\n{'backend':<28} {'p50 ms':>8} {'p95 ms':>8} {'8-thread q/s':>13}")
+    for name, (_, encode_one) in backends.items():
+        p50, p95 = _latency(encode_one, queries)
+        print(f"{name:<28} {p50:>8.2f} {p95:>8.2f} {_concurrent(encode_one, queries):>13.1f}")
+
+    reference = torch_model.encode(texts[:128])
+    quantized = onnx_model.encode(texts[:128])
+    cosines = (reference * quantized).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(quantized, axis=1)
+    )
+    print(f"\ncosine(onnx-int8, torch): min {cosines.min():.4f}, mean {cosines.mean():.4f}")
+    print(f"onnx stats: {onnx_model.stats()}")
@@ -0,0 +1,110 @@
+"""
+Phase 4 — Single-Row Inference Micro-Benchmark
+
+Compares per-request latency of the previous pandas path
+(one-row DataFrame + reindex + model.predict) against the
+precompiled FeatureLayout fast path, for both the forecasting
+booster and the PdM Isolation Forest.
+
+Usage:
+    python benchmarks/bench_inference.py [iterations]
+
+Uses the real artifacts when they can be loaded; otherwise it
+fits small stand-in models so the comparison can still run.
+"""
+
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BASE_DIR)
+
+from phase_04_mlops.serving.feature_layout import FORECAST_FIELDS, forecast_layout, pdm_layout
+
+FORECAST_MODEL_PATH = os.path.join(BASE_DIR, "models", "forecasting", "xgb_base_model.pkl")
+PDM_MODEL_PATH = os.path.join(BASE_DIR, "phase_02_predictive_maintenance", "models", "pdm_isolation_forest.pkl")
+PDM_FEATURES_PATH = os.path.join(BASE_DIR, "phase_02_predictive_maintenance", "models", "pdm_features.pkl")
+
+PDM_FIELDS = [
+    "DC_POWER", "AC_POWER", "ac_lag_1", "ac_lag_24",
+    "dc_lag_1", "dc_lag_24", "ac_roll_mean_6", "dc_roll_mean_6"
+]
+
+
+def _load_or_fit_forecast():
+    try:
+        return joblib.load(FORECAST_MODEL_PATH), "xgb_base_model.pkl"
+    except Exception:
+        from xgboost import XGBRegressor
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.random((2000, 5)) * [2, 4000, 24, 31, 12], columns=list(FORECAST_FIELDS))
+        model = XGBRegressor(n_estimators=200, max_depth=6).fit(X, X["DC_POWER"] * 0.1)
+        return model, "stand-in XGBRegressor(200 trees)"
+
+
+def _load_or_fit_pdm():
+    try:
+        return joblib.load(PDM_MODEL_PATH), joblib.load(PDM_FEATURES_PATH), "pdm_isolation_forest.pkl"
+    except Exception:
+        from sklearn.ensemble import IsolationForest
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.random((2000, len(PDM_FIELDS))) * 1000, columns=PDM_FIELDS)
+        return IsolationForest(random_state=0).fit(X), PDM_FIELDS, "stand-in IsolationForest"
+
+
+def _time_per_call(fn, iterations):
+    for _ in range(min(50, iterations)):
+        fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def bench_forecast(iterations):
+    model, label = _load_or_fit_forecast()
+    layout = forecast_layout({"model": model})
+    request = SimpleNamespace(plant_id=1, DC_POWER=2500.0, hour=12, day=15, month=6)
+
+    def pandas_path():
+        df = pd.DataFrame([{f: getattr(request, f) for f in FORECAST_FIELDS}])
+        df = df.reindex(columns=model.get_booster().feature_names, fill_value=0)
+        return model.predict(df)[0]
+
+    def layout_path():
+        return layout.predict(request)[0]
+
+    assert abs(float(pandas_path()) - float(layout_path())) < 1e-3
+    return label, _time_per_call(pandas_path, iterations), _time_per_call(layout_path, iterations)
+
+
+def bench_pdm(iterations):
+    model, features, label = _load_or_fit_pdm()
+    layout = pdm_layout(model, features)
+    request = SimpleNamespace(**{f: 100.0 + i for i, f in enumerate(PDM_FIELDS)})
+
+    def pandas_path():
+        X = pd.DataFrame([[getattr(request, f) for f in features]], columns=features)
+        return model.predict(X)[0]
+
+    def layout_path():
+        return layout.predict(request)[0]
+
+    assert pandas_path() == layout_path()
+    return label, _time_per_call(pandas_path, iterations), _time_per_call(layout_path, iterations)
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"Single-row inference latency ({iterations} iterations, µs/call)")
+    print(f"{'model':<40} {'pandas':>10} {'layout':>10} {'speedup':>9}")
+    for name, bench in (("forecast", bench_forecast), ("pdm", bench_pdm)):
+        label, pandas_us, layout_us = bench(iterations)
+        print(f"{name + ': ' + label:<40} {pandas_us:>10.1f} {layout_us:>10.1f} {pandas_us / layout_us:>8.1f}x")
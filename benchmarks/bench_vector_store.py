@@ -0,0 +1,192 @@
+"""
+Phase 12 — Vector Store Backend Benchmark
+
+Compares the ChromaDB (HNSW) collection against the memory-mapped
+NumPy index (VECTOR_BACKEND=numpy) on a synthetic clustered corpus
+of 384-dim unit vectors with plant_id / doc_type metadata:
+
+  - build time
+  - query latency p50 / p95 (unfiltered, plant filter,
+    plant + doc_type filter), plus batched queries for numpy
+  - recall@k against exact search
+  - resident memory after build and queries
+
+Usage:
+    python benchmarks/bench_vector_store.py [n_docs] [n_queries]
+
+Each backend runs in its own subprocess so RSS figures are not
+shared. Chroma is skipped when chromadb is not installed.
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BASE_DIR)
+
+DIM = 384
+TOP_K = 5
+CHUNK = 2000
+CLUSTERS = 64
+PLANTS = ("1", "2", "3", "4")
+DOC_TYPES = ("AlertRecord", "OperationalLog", "SimulationResult", "EvaluationReport")
+CASES = {
+    "unfiltered": None,
+    "plant": {"plant_id": "2"},
+    "plant+type": {"$and": [{"plant_id": "2"}, {"doc_type": "AlertRecord"}]},
+}
+
+
+def _centers():
+    return np.random.default_rng(0).standard_normal((CLUSTERS, DIM)).astype(np.float32)
+
+
+def _vectors(seed: int, count: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = _centers()
+    vectors = centers[rng.integers(0, CLUSTERS, count)] + rng.standard_normal((count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _corpus_chunks(n_docs: int):
+    """Deterministic corpus, generated chunk by chunk."""
+    for start in range(0, n_docs, CHUNK):
+        count = min(CHUNK, n_docs - start)
+        rows = range(start, start + count)
+        yield (
+            [f"doc_{i}" for i in rows],
+            [f"synthetic document {i}" for i in rows],
+            _vectors(1000 + start, count),
+            [{"plant_id": PLANTS[i % 4], "doc_type": DOC_TYPES[(i // 4) % 4]} for i in rows],
+        )
+
+
+def _matches(meta: dict, where) -> bool:
+    if where is None:
+        return True
+    if "$and" in where:
+        return all(_matches(meta, clause) for clause in where["$and"])
+    return all(meta.get(k) == v for k, v in where.items())
+
+
+def _exact_top_k(n_docs: int, queries: np.ndarray, where) -> list:
+    ids, dists = [], []
+    for chunk_ids, _, vectors, metas in _corpus_chunks(n_docs):
+        keep = np.array([_matches(m, where) for m in metas])
+        if not keep.any():
+            continue
+        d = ((queries[:, None, :].astype(np.float64) - vectors[keep][None]) ** 2).sum(-1)
+        ids.extend(np.array(chunk_ids)[keep])
+        dists.append(d)
+    dists = np.concatenate(dists, axis=1)
+    top = np.argsort(dists, axis=1)[:, :TOP_K]
+    return [{ids[i] for i in row} for row in top]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _build(backend: str, directory: str, n_docs: int):
+    if backend == "chroma":
+        import chromadb
+        client = chromadb.PersistentClient(path=directory)
+        collection = client.get_or_create_collection(name="bench", metadata={"hnsw:space": "l2"})
+    else:
+        from phase_12_vector_rag.mmap_index import MmapVectorIndex
+        collection = MmapVectorIndex(directory, dtype=backend.split(":")[1] if ":" in backend else "float32")
+    for ids, documents, vectors, metas in _corpus_chunks(n_docs):
+        collection.add(ids=ids, documents=documents, embeddings=vectors.tolist(), metadatas=metas)
+    return collection
+
+
+def run_backend(backend: str, n_docs: int, n_queries: int) -> dict:
+    queries = _vectors(7, n_queries)
+    rss_start = _rss_mb()
+    report = {"backend": backend}
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        collection = _build(backend, directory, n_docs)
+        report["build_s"] = round(time.perf_counter() - started, 2)
+
+        results = {}
+        for case, where in CASES.items():
+            kwargs = {"n_results": TOP_K, **({"where": where} if where else {})}
+            collection.query(query_embeddings=[queries[0].tolist()], **kwargs)  # warm-up
+            latencies, found = [], []
+            for q in queries:
+                started = time.perf_counter()
+                result = collection.query(query_embeddings=[q.tolist()], **kwargs)
+                latencies.append((time.perf_counter() - started) * 1000)
+                found.append(set(result["ids"][0]))
+            results[case] = found
+            report[f"{case}_p50_ms"] = round(float(np.percentile(latencies, 50)), 3)
+            report[f"{case}_p95_ms"] = round(float(np.percentile(latencies, 95)), 3)
+
+        if backend != "chroma":
+            started = time.perf_counter()
+            collection.query(query_embeddings=queries.tolist(), n_results=TOP_K)
+            report["batched_ms_per_query"] = round((time.perf_counter() - started) * 1000 / n_queries, 3)
+
+        report["rss_mb"] = round(_rss_mb(), 1)
+        report["rss_delta_mb"] = round(report["rss_mb"] - rss_start, 1)
+        report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        del collection
+
+    for case, where in CASES.items():
+        truth = _exact_top_k(n_docs, queries, where)
+        hits = sum(len(found & exact) for found, exact in zip(results[case], truth))
+        report[f"{case}_recall"] = round(hits / (TOP_K * n_queries), 4)
+    return report
+
+
+def _available(backend: str) -> bool:
+    if backend != "chroma":
+        return True
+    try:
+        import chromadb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--backend":
+        print(json.dumps(run_backend(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))))
+        sys.exit(0)
+
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    reports = []
+    for backend in ("chroma", "numpy:float32", "numpy:float16"):
+        if not _available(backend):
+            print(f"[skip] {backend}: chromadb is not installed")
+            continue
+        out = subprocess.run(
+            [sys.executable, __file__, "--backend", backend, str(n_docs), str(n_queries)],
+            capture_output=True, text=True, check=True,
+        )
+        reports.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"Vector store backends ({n_docs} docs x {DIM} dims, {n_queries} queries, top_k={TOP_K})")
+    columns = ["build_s", "rss_delta_mb", "peak_rss_mb", "batched_ms_per_query"]
+    for case in CASES:
+        columns += [f"{case}_p50_ms", f"{case}_p95_ms", f"{case}_recall"]
+    print(f"{'metric':<24}" + "".join(f"{r['backend']:>16}" for r in reports))
+    for column in columns:
+        print(f"{column:<24}" + "".join(f"{str(r.get(column, '-')):>16}" for r in reports))
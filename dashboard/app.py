@@ -150,6 +150,14 @@ def call_api(endpoint, payload):
     except Exception as e:
         return None, str(e)
 
+def fetch_api(endpoint, params=None):
+    try:
+        r = requests.get(f"{API_URL}{endpoint}", params=params, timeout=5)
+        r.raise_for_status()
+        return r.json(), None
+    except Exception as e:
+        return None, str(e)
+
 # ================= SIDEBAR NAVIGATION =================
 with st.sidebar:
     st.image("https://cdn-icons-png.flaticon.com/512/3106/3106807.png", width=50)
@@ -356,6 +364,19 @@ if selected_nav == "Dashboard":
             }
         )
 
+        st.markdown("##### Recent Predictions")
+        pred_logs, pred_error = fetch_api("/prediction-logs", {"limit": 20})
+        if pred_error:
+            st.caption(f"Prediction log unavailable: {pred_error}")
+        elif pred_logs["records"]:
+            st.dataframe(
+                pd.DataFrame(pred_logs["records"][::-1]),
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.caption("No predictions logged yet.")
+
 # ================= OTHER PAGES =================
 elif selected_nav == "Inverter Health":
     st.title("Inverter Health Diagnostics")
@@ -1,6 +1,8 @@
 import json
 import os
 
+from phase_04_mlops.drift.streaming_drift import StreamingDriftEngine
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 STATS_PATH = os.path.join(BASE_DIR, "training_stats.json")
@@ -8,10 +10,13 @@ STATS_PATH = os.path.join(BASE_DIR, "training_stats.json")
 with open(STATS_PATH, "r") as f:
     TRAINING_STATS = json.load(f)
 
+# Rolling per-plant windows scored against the training histograms
+DRIFT_ENGINE = StreamingDriftEngine(TRAINING_STATS)
+
 
-def check_drift(feature_name, value, threshold=3):
+def _zscore_drift(feature_name, value, threshold=3):
     """
-    Z-score based drift detection
+    Z-score based drift detection (features without a reference histogram)
     """
     mean = TRAINING_STATS[feature_name]["mean"]
     std = TRAINING_STATS[feature_name]["std"]
@@ -22,3 +27,48 @@ def check_drift(feature_name, value, threshold=3):
     z_score = abs(value - mean) / std
 
     return z_score > threshold
+
+
+def check_drift(feature_name, value, plant_id=0, threshold=3):
+    """
+    Record a value in the plant's rolling window and report whether
+    the window distribution has drifted from the training reference.
+    """
+    if DRIFT_ENGINE.tracks(feature_name):
+        return DRIFT_ENGINE.update(plant_id, feature_name, value)
+
+    return _zscore_drift(feature_name, value, threshold)
+
+
+def check_drift_batch(feature_name, values, plant_ids=None, threshold=3):
+    """
+    Windowed drift check for a batch of values, in row order.
+
+    Returns:
+        numpy bool array, one flag per value.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+
+    if not DRIFT_ENGINE.tracks(feature_name):
+        mean = TRAINING_STATS[feature_name]["mean"]
+        std = TRAINING_STATS[feature_name]["std"]
+        if std == 0:
+            return np.zeros(len(values), dtype=bool)
+        return np.abs(values - mean) / std > threshold
+
+    if plant_ids is None:
+        plant_ids = np.zeros(len(values), dtype=np.int64)
+
+    update = DRIFT_ENGINE.update
+    return np.fromiter(
+        (update(int(pid), feature_name, v) for pid, v in zip(plant_ids, values.tolist())),
+        dtype=bool,
+        count=len(values)
+    )
+
+
+def get_drift_report(plant_id=None):
+    """Current windowed drift status for /drift-status."""
+    return DRIFT_ENGINE.status(plant_id)
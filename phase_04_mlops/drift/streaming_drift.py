@@ -0,0 +1,263 @@
+"""
+Phase 4 — Streaming Drift Engine
+
+Keeps a rolling window per (plant_id, feature) and compares its
+distribution against the reference histogram captured at training
+time (training_stats.json), instead of z-scoring single values.
+
+Each window is a fixed-size ring buffer with incremental bin counts
+and running sums, so an update is O(1) apart from one bisect over
+the ~20 bin edges. PSI and a binned KS statistic are recomputed
+every RESCORE_EVERY updates (cached flag on the request path) and
+on demand for /drift-status.
+
+Drift levels follow the usual PSI bands:
+    PSI < 0.10          → LOW
+    0.10 <= PSI < 0.25  → MEDIUM
+    PSI >= 0.25         → HIGH (flagged as drift)
+"""
+
+import json
+import math
+import os
+import threading
+from array import array
+from bisect import bisect_right
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATS_PATH = os.path.join(BASE_DIR, "training_stats.json")
+# Single source of the reference distribution, whoever rebuilds it
+REFERENCE_DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(BASE_DIR)), "data", "processed", "solar_cleaned.csv"
+)
+REFERENCE_FEATURES = ["DC_POWER"]
+
+# ~1 day of 15-minute readings from 22 inverters per plant
+WINDOW_SIZE = int(os.getenv("DRIFT_WINDOW_SIZE", 2048))
+MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", 256))
+RESCORE_EVERY = 32
+
+PSI_MEDIUM = 0.10
+PSI_HIGH = 0.25
+
+_EPS = 1e-4
+
+
+def _psi_level(psi: float) -> str:
+    if psi >= PSI_HIGH:
+        return "HIGH"
+    if psi >= PSI_MEDIUM:
+        return "MEDIUM"
+    return "LOW"
+
+
+class FeatureWindow:
+    """Ring-buffer window with incremental histogram and moments."""
+
+    __slots__ = (
+        "edges", "reference", "size", "values", "bins", "counts",
+        "pos", "n", "total", "total_sq", "updates", "drifting", "lock"
+    )
+
+    def __init__(self, edges, reference, size=WINDOW_SIZE):
+        self.edges = list(edges)
+        self.reference = list(reference)
+        self.size = size
+        self.values = array("d", bytes(8 * size))
+        self.bins = array("H", bytes(2 * size))
+        self.counts = [0] * len(self.reference)
+        self.pos = 0
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+        self.drifting = False
+        self.lock = threading.Lock()
+
+    def update(self, value: float) -> bool:
+        """Push one value; returns the cached drift flag."""
+        b = bisect_right(self.edges, value)
+        with self.lock:
+            pos = self.pos
+            if self.n == self.size:
+                old = self.values[pos]
+                self.total -= old
+                self.total_sq -= old * old
+                self.counts[self.bins[pos]] -= 1
+            else:
+                self.n += 1
+
+            self.values[pos] = value
+            self.bins[pos] = b
+            self.counts[b] += 1
+            self.total += value
+            self.total_sq += value * value
+            self.pos = pos + 1 if pos + 1 < self.size else 0
+
+            self.updates += 1
+            if self.updates % RESCORE_EVERY == 0:
+                self.drifting = self.n >= MIN_SAMPLES and self._psi() >= PSI_HIGH
+
+        return self.drifting
+
+    def _psi(self) -> float:
+        n = self.n
+        psi = 0.0
+        for count, expected in zip(self.counts, self.reference):
+            actual = max(count / n, _EPS)
+            expected = max(expected, _EPS)
+            psi += (actual - expected) * math.log(actual / expected)
+        return psi
+
+    def score(self) -> dict:
+        """Full PSI / KS / moment snapshot of the current window."""
+        with self.lock:
+            n = self.n
+            if n == 0:
+                return {"samples": 0, "drift_risk": "LOW", "drift_detected": False}
+
+            psi = self._psi()
+            ks = 0.0
+            cdf_actual = 0.0
+            cdf_expected = 0.0
+            for count, expected in zip(self.counts, self.reference):
+                cdf_actual += count / n
+                cdf_expected += expected
+                ks = max(ks, abs(cdf_actual - cdf_expected))
+
+            mean = self.total / n
+            variance = max(0.0, self.total_sq / n - mean * mean)
+
+        ready = n >= MIN_SAMPLES
+        level = _psi_level(psi) if ready else "LOW"
+        return {
+            "samples": n,
+            "window_size": self.size,
+            "warming_up": not ready,
+            "psi": round(psi, 4),
+            "ks": round(ks, 4),
+            "window_mean": round(mean, 4),
+            "window_std": round(math.sqrt(variance), 4),
+            "drift_risk": level,
+            "drift_detected": level == "HIGH",
+        }
+
+
+class StreamingDriftEngine:
+    """Registry of per-plant, per-feature windows."""
+
+    def __init__(self, training_stats: dict, window_size: int = WINDOW_SIZE):
+        self.window_size = window_size
+        self.references = {
+            feature: stats["histogram"]
+            for feature, stats in training_stats.items()
+            if "histogram" in stats
+        }
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def tracks(self, feature_name: str) -> bool:
+        return feature_name in self.references
+
+    def window(self, plant_id, feature_name: str) -> FeatureWindow:
+        key = (plant_id, feature_name)
+        window = self._windows.get(key)
+        if window is None:
+            with self._lock:
+                window = self._windows.get(key)
+                if window is None:
+                    ref = self.references[feature_name]
+                    window = FeatureWindow(ref["edges"], ref["proportions"], self.window_size)
+                    self._windows[key] = window
+        return window
+
+    def update(self, plant_id, feature_name: str, value: float) -> bool:
+        """Record a value; returns whether the window is currently drifting."""
+        return self.window(plant_id, feature_name).update(float(value))
+
+    def status(self, plant_id=None) -> dict:
+        """
+        Drift snapshot for /drift-status.
+
+        Args:
+            plant_id: Optional plant filter.
+
+        Returns:
+            Dict with overall drift_risk and per plant/feature scores.
+        """
+        windows = {}
+        overall = "LOW"
+        for (pid, feature), window in sorted(self._windows.items(), key=lambda kv: str(kv[0])):
+            if plant_id is not None and pid != plant_id:
+                continue
+            score = window.score()
+            windows.setdefault(str(pid), {})[feature] = score
+            if score["drift_risk"] == "HIGH" or (score["drift_risk"] == "MEDIUM" and overall == "LOW"):
+                overall = score["drift_risk"]
+
+        return {
+            "drift_risk": overall,
+            "drift_detected": overall == "HIGH",
+            "method": "windowed_psi_ks",
+            "thresholds": {"psi_medium": PSI_MEDIUM, "psi_high": PSI_HIGH, "min_samples": MIN_SAMPLES},
+            "plants": windows,
+        }
+
+
+def build_reference(values, bins: int = 20) -> dict:
+    """
+    Capture a feature's reference distribution at training time.
+
+    Bin edges are training-set quantiles (deduplicated, so heavy
+    zero mass from night-time readings collapses into one bin).
+
+    Args:
+        values: 1-D array-like of training values.
+        bins: Target number of quantile bins.
+
+    Returns:
+        Dict with mean, std, samples and histogram{edges, proportions}.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+    counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+
+    return {
+        "mean": round(float(values.mean()), 2),
+        "std": round(float(values.std()), 2),
+        "samples": int(len(values)),
+        "histogram": {
+            "edges": [round(float(e), 6) for e in edges],
+            "proportions": [round(float(c) / len(values), 6) for c in counts],
+        },
+    }
+
+
+def save_training_stats(df, features, path: str = STATS_PATH) -> dict:
+    """Write mean/std and reference histograms for features to training_stats.json."""
+    stats = {feature: build_reference(df[feature].values) for feature in features}
+    with open(path, "w") as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+def rebuild_training_stats(csv_path: str = REFERENCE_DATA_PATH, path: str = STATS_PATH) -> dict:
+    """Rebuild training_stats.json from the processed training data."""
+    import pandas as pd
+
+    return save_training_stats(pd.read_csv(csv_path), REFERENCE_FEATURES, path)
+
+
+if __name__ == "__main__":
+    # Rebuild the reference from the processed training data:
+    #   python -m phase_04_mlops.drift.streaming_drift [csv_path]
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else REFERENCE_DATA_PATH
+    stats = rebuild_training_stats(csv_path)
+    print(f"Reference captured from {csv_path}: {list(stats)}")
@@ -1,21 +1,175 @@
-import csv
+"""
+Phase 4 — Prediction Logger
+
+Endpoints enqueue prediction rows without touching the disk;
+a background writer thread group-commits them to the segmented
+prediction log store (prediction_store) when either LOG_FLUSH_ROWS
+rows are pending or LOG_FLUSH_INTERVAL seconds passed since the
+first pending row.
+
+The queue is bounded. When it is full the "drop" policy discards
+the row (counted in stats) and the "block" policy makes the
+request thread wait for space.
+"""
+
+import atexit
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+
+from phase_04_mlops.logging.prediction_store import get_prediction_store
+
+LOG_QUEUE_SIZE = int(os.getenv("PREDICTION_LOG_QUEUE_SIZE", 10000))
+LOG_QUEUE_POLICY = os.getenv("PREDICTION_LOG_QUEUE_POLICY", "drop")  # drop | block
+LOG_FLUSH_ROWS = int(os.getenv("PREDICTION_LOG_FLUSH_ROWS", 256))
+LOG_FLUSH_INTERVAL = float(os.getenv("PREDICTION_LOG_FLUSH_INTERVAL", 1.0))
+
+_STOP = object()
+
+_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_writer = None
+_writer_lock = threading.Lock()
+
+_stats = {
+    "enqueued": 0,
+    "dropped": 0,
+    "flushes": 0,
+    "rows_written": 0,
+    "write_errors": 0,
+    "flush_time_ms_total": 0.0,
+    "last_flush_ms": None,
+    "max_flush_ms": 0.0,
+}
+
+
+# ============================
+# Writer thread
+# ============================
+
+def _write_rows(rows):
+    """Append rows to the active prediction log segment in one write."""
+    get_prediction_store().append(rows)
+
+
+def _flush(batch):
+    """Group-commit a batch and record flush latency."""
+    if not batch:
+        return
+
+    started = time.perf_counter()
+    try:
+        _write_rows(batch)
+        _stats["rows_written"] += len(batch)
+    except Exception as e:
+        # Never crash the writer for a logging failure
+        _stats["write_errors"] += 1
+        print(f"[PREDICTION LOGGER ERROR] Failed to write {len(batch)} rows: {e}")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    _stats["flushes"] += 1
+    _stats["flush_time_ms_total"] += elapsed_ms
+    _stats["last_flush_ms"] = round(elapsed_ms, 3)
+    _stats["max_flush_ms"] = max(_stats["max_flush_ms"], elapsed_ms)
+
+
+def _writer_loop():
+    batch = []
+    deadline = None
+
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            item = _queue.get(timeout=timeout)
+        except queue.Empty:
+            item = None
+
+        if item is _STOP:
+            _flush(batch)
+            return
+
+        if item is not None:
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + LOG_FLUSH_INTERVAL
 
-LOG_DIR = "phase_04_mlops/logs"
-os.makedirs(LOG_DIR, exist_ok=True)
+        if batch and (len(batch) >= LOG_FLUSH_ROWS or time.monotonic() >= deadline):
+            _flush(batch)
+            batch = []
+            deadline = None
 
-LOG_FILE = os.path.join(LOG_DIR, "predictions_log.csv")
 
-HEADERS = [
-    "timestamp",
-    "endpoint",
-    "dc_power",
-    "ac_power",
-    "prediction",
-    "status",
-    "model_version"
-]
+def start_writer():
+    """Start the background writer thread (idempotent)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(
+                target=_writer_loop,
+                name="prediction-log-writer",
+                daemon=True
+            )
+            _writer.start()
+
+
+def _drain():
+    """Take every row still queued, without waiting."""
+    rows = []
+    while True:
+        try:
+            item = _queue.get_nowait()
+        except queue.Empty:
+            return rows
+        if item is not _STOP:
+            rows.append(item)
+
+
+def stop_writer(timeout: float = 10.0):
+    """
+    Flush every pending row and stop the writer thread.
+
+    Never waits more than `timeout` seconds, even with a full queue
+    and a dead writer. Rows still queued once the writer has exited
+    (enqueued behind the stop marker, or left by a dead writer) are
+    flushed here.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            _queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        _writer.join(max(0.0, deadline - time.monotonic()))
+        if not _writer.is_alive():
+            _flush(_drain())
+        _writer = None
+
+
+atexit.register(stop_writer)
+
+
+# ============================
+# Request-path API
+# ============================
+
+def _enqueue(row):
+    if _writer is None:
+        start_writer()
+
+    if LOG_QUEUE_POLICY == "block":
+        _queue.put(row)
+    else:
+        try:
+            _queue.put_nowait(row)
+        except queue.Full:
+            _stats["dropped"] += 1
+            return
+
+    _stats["enqueued"] += 1
+
 
 def log_prediction(
     endpoint,
@@ -25,20 +179,49 @@ def log_prediction(
     status,
     model_version
 ):
-    file_exists = os.path.isfile(LOG_FILE)
-
-    with open(LOG_FILE, "a", newline="") as f:
-        writer = csv.writer(f)
-
-        if not file_exists:
-            writer.writerow(HEADERS)
-
-        writer.writerow([
-            datetime.utcnow().isoformat(),
-            endpoint,
-            dc_power,
-            ac_power,
-            prediction,
-            status,
-            model_version
-        ])
+    _enqueue((
+        time.time(),
+        endpoint,
+        dc_power,
+        ac_power,
+        prediction,
+        status,
+        model_version
+    ))
+
+
+def log_predictions(records):
+    """
+    Enqueue many prediction records at once.
+
+    Args:
+        records: Iterable of dicts with the log_prediction keyword fields.
+    """
+    timestamp = time.time()
+
+    for r in records:
+        _enqueue((
+            timestamp,
+            r["endpoint"],
+            r["dc_power"],
+            r["ac_power"],
+            r["prediction"],
+            r["status"],
+            r["model_version"]
+        ))
+
+
+def get_logger_stats() -> dict:
+    """Queue depth and flush latency metrics for /health."""
+    flushes = _stats["flushes"]
+    return {
+        **_stats,
+        "flush_time_ms_total": round(_stats["flush_time_ms_total"], 3),
+        "max_flush_ms": round(_stats["max_flush_ms"], 3),
+        "avg_flush_ms": round(_stats["flush_time_ms_total"] / flushes, 3) if flushes else None,
+        "queue_depth": _queue.qsize(),
+        "queue_capacity": LOG_QUEUE_SIZE,
+        "queue_policy": LOG_QUEUE_POLICY,
+        "writer_alive": _writer is not None and _writer.is_alive(),
+        "store": get_prediction_store().stats(),
+    }
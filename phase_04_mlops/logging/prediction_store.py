@@ -0,0 +1,434 @@
+"""
+Phase 4 — Prediction Log Store
+
+Append-only segment files for prediction logs, written by the
+prediction logger's background thread and read by the agent tools,
+RAG ingestion and the dashboard (/prediction-logs).
+
+Each segment is a set of files named <start_ms>-<pid>-<seq>:
+    .plog     8-byte header + fixed-size binary records
+              (timestamp, dc_power, ac_power, prediction as float64,
+              endpoint / status / model_version as uint16 string ids;
+              a None number is stored as NaN)
+    .strings  string table, one JSON string per line (id = line number),
+              always written before the records that use it; id 0 is
+              reserved for None (a JSON null line)
+    .idx      sparse index: (record number, timestamp) every
+              PREDICTION_LOG_INDEX_STRIDE records
+
+Fixed-size records make tail reads a single seek from the end of
+the newest segments; time-range scans bisect the sparse index and
+then read at most one stride before streaming forward. Timestamps
+are kept non-decreasing within a segment (rows enqueued by
+concurrent requests can arrive a few microseconds out of order).
+
+Segments rotate after PREDICTION_LOG_SEGMENT_BYTES or
+PREDICTION_LOG_SEGMENT_SECONDS, and only the newest
+PREDICTION_LOG_MAX_SEGMENTS are kept. Each process writes its own
+segments (pid in the name), so several workers never interleave
+writes; readers merge all segments by timestamp.
+"""
+
+import bisect
+import glob
+import heapq
+import json
+import math
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+PREDICTION_LOG_DIR = os.getenv(
+    "PREDICTION_LOG_DIR", os.path.join(BASE_DIR, "phase_04_mlops", "logs", "predictions")
+)
+SEGMENT_MAX_BYTES = int(os.getenv("PREDICTION_LOG_SEGMENT_BYTES", 8 * 1024 * 1024))
+SEGMENT_MAX_SECONDS = float(os.getenv("PREDICTION_LOG_SEGMENT_SECONDS", 3600))
+MAX_SEGMENTS = int(os.getenv("PREDICTION_LOG_MAX_SEGMENTS", 48))
+INDEX_STRIDE = int(os.getenv("PREDICTION_LOG_INDEX_STRIDE", 1024))
+
+MAGIC = b"PLOGv1\n\0"
+HEADER_SIZE = len(MAGIC)
+RECORD = struct.Struct("<ddddHHHxx")  # 40 bytes
+INDEX_ENTRY = struct.Struct("<Id")
+
+MAX_STRINGS = 2 ** 16 - 3  # uint16 ids; one row can add three new strings
+_READ_CHUNK = 4096  # records per read while scanning
+
+
+# ============================
+# Encoding helpers
+# ============================
+
+def _num(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _opt(value: float):
+    return None if math.isnan(value) else value
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def to_epoch(value):
+    """Epoch seconds from an ISO string (naive = UTC), datetime or number."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+# ============================
+# Reading a segment
+# ============================
+
+class Segment:
+    """Read-only view of one segment (safe while it is being appended)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.base = path[:-len(".plog")]
+        # <start_ms>-<pid>-<seq>
+        self.sort_key = tuple(int(part) for part in os.path.basename(self.base).split("-"))
+        self.start_ts = self.sort_key[0] / 1000
+
+    def count(self) -> int:
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        # A record still being written at EOF is ignored
+        return max(0, (size - HEADER_SIZE) // RECORD.size)
+
+    def _strings(self) -> list:
+        try:
+            with open(self.base + ".strings", "r") as f:
+                return [json.loads(line) for line in f if line.endswith("\n")]
+        except FileNotFoundError:
+            return []
+
+    def _index(self) -> list:
+        try:
+            with open(self.base + ".idx", "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+    def read_raw(self, first: int, n: int) -> list:
+        if n <= 0:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(HEADER_SIZE + first * RECORD.size)
+            data = f.read(n * RECORD.size)
+        usable = len(data) - len(data) % RECORD.size
+        return list(RECORD.iter_unpack(data[:usable]))
+
+    def last_ts(self):
+        n = self.count()
+        rows = self.read_raw(n - 1, 1) if n else []
+        return rows[0][0] if rows else None
+
+    def lower_bound(self, ts: float, count: int) -> int:
+        """First record number with timestamp >= ts."""
+        index = self._index()
+        pos = bisect.bisect_left([entry[1] for entry in index], ts)
+        lo = index[pos - 1][0] if pos > 0 else 0
+        hi = index[pos][0] if pos < len(index) else count
+        window = self.read_raw(lo, hi - lo)
+        return lo + bisect.bisect_left([row[0] for row in window], ts)
+
+    def decode(self, rows: list, strings: list = None) -> list:
+        strings = self._strings() if strings is None else strings
+
+        def text(i):
+            return strings[i] if i < len(strings) else None
+
+        return [
+            {
+                "timestamp": _iso(ts),
+                "endpoint": text(endpoint),
+                "dc_power": _opt(dc),
+                "ac_power": _opt(ac),
+                "prediction": _opt(prediction),
+                "status": text(status),
+                "model_version": text(model),
+            }
+            for ts, dc, ac, prediction, endpoint, status, model in rows
+        ]
+
+
+# ============================
+# Store
+# ============================
+
+class PredictionLogStore:
+    def __init__(
+        self,
+        directory: str = PREDICTION_LOG_DIR,
+        max_segment_bytes: int = SEGMENT_MAX_BYTES,
+        max_segment_seconds: float = SEGMENT_MAX_SECONDS,
+        max_segments: int = MAX_SEGMENTS,
+        index_stride: int = INDEX_STRIDE,
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.max_segments = max_segments
+        self.index_stride = index_stride
+
+        self._lock = threading.Lock()
+        self._active = None  # writer state for this process's open segment
+        self._seq = 0
+        self._stats = {"records_written": 0, "segments_created": 0, "segments_deleted": 0}
+
+    # ----------------------------
+    # Writing
+    # ----------------------------
+
+    def _open_segment(self, now: float) -> dict:
+        os.makedirs(self.directory, exist_ok=True)
+        self._seq += 1
+        base = os.path.join(self.directory, f"{int(now * 1000):013d}-{os.getpid()}-{self._seq}")
+        records = open(base + ".plog", "wb", buffering=0)
+        records.write(MAGIC)
+        strings_file = open(base + ".strings", "a", buffering=1)
+        strings_file.write("null\n")
+        self._stats["segments_created"] += 1
+        return {
+            "base": base,
+            "records": records,
+            "strings_file": strings_file,
+            "index_file": open(base + ".idx", "ab", buffering=0),
+            "strings": {None: 0},
+            "count": 0,
+            "opened": now,
+            "last_ts": -math.inf,
+        }
+
+    def _close_active(self) -> None:
+        if self._active is not None:
+            for key in ("records", "strings_file", "index_file"):
+                self._active[key].close()
+            self._active = None
+
+    def _needs_rotation(self, now: float) -> bool:
+        seg = self._active
+        return (
+            seg["count"] * RECORD.size >= self.max_segment_bytes
+            or now - seg["opened"] >= self.max_segment_seconds
+            or len(seg["strings"]) >= MAX_STRINGS
+        )
+
+    def _string_id(self, seg: dict, value, new_strings: list) -> int:
+        value = None if value is None else str(value)
+        sid = seg["strings"].get(value)
+        if sid is None:
+            sid = seg["strings"][value] = len(seg["strings"])
+            new_strings.append(value)
+        return sid
+
+    def append(self, rows) -> int:
+        """
+        Append rows: (epoch_ts, endpoint, dc_power, ac_power,
+        prediction, status, model_version) tuples.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        with self._lock:
+            now = time.time()
+            if self._active is not None and self._needs_rotation(now):
+                self._close_active()
+                self._enforce_retention()
+            if self._active is None:
+                self._active = self._open_segment(now)
+            seg = self._active
+
+            new_strings, packed, index = [], [], []
+            last_ts = seg["last_ts"]
+            for n, (ts, endpoint, dc, ac, prediction, status, model) in enumerate(rows, seg["count"]):
+                last_ts = max(float(ts), last_ts)
+                if n % self.index_stride == 0:
+                    index.append(INDEX_ENTRY.pack(n, last_ts))
+                packed.append(RECORD.pack(
+                    last_ts, _num(dc), _num(ac), _num(prediction),
+                    self._string_id(seg, endpoint, new_strings),
+                    self._string_id(seg, status, new_strings),
+                    self._string_id(seg, model, new_strings),
+                ))
+
+            # Strings first, so readers never see an unknown id
+            if new_strings:
+                seg["strings_file"].write("".join(json.dumps(s) + "\n" for s in new_strings))
+                seg["strings_file"].flush()
+            seg["records"].write(b"".join(packed))
+            if index:
+                seg["index_file"].write(b"".join(index))
+
+            seg["count"] += len(rows)
+            seg["last_ts"] = last_ts
+            self._stats["records_written"] += len(rows)
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_active()
+
+    def _enforce_retention(self) -> None:
+        segments = self.segments()
+        active = self._active["base"] if self._active else None
+        cutoff = time.time() - self.max_segment_seconds
+        for seg in segments[:max(0, len(segments) - self.max_segments)]:
+            # Another worker may still be appending to a recent segment
+            if seg.base == active or os.path.getmtime(seg.path) > cutoff:
+                continue
+            for suffix in (".plog", ".strings", ".idx"):
+                try:
+                    os.remove(seg.base + suffix)
+                except FileNotFoundError:
+                    pass
+            self._stats["segments_deleted"] += 1
+
+    # ----------------------------
+    # Reading
+    # ----------------------------
+
+    def segments(self) -> list:
+        """All segments (every process), oldest first."""
+        segments = [Segment(p) for p in glob.glob(os.path.join(self.directory, "*.plog"))]
+        return sorted(segments, key=lambda seg: seg.sort_key)
+
+    def tail(self, n: int = 5) -> list:
+        """
+        Newest n records across all segments, oldest first.
+        Reads at most n records from the end of each segment that
+        can still contribute.
+        """
+        if n <= 0:
+            return []
+        candidates = []
+        for seg in sorted(self.segments(), key=lambda s: s.start_ts, reverse=True):
+            # Segments ending before the n-th newest record so far cannot contribute
+            if len(candidates) >= n:
+                last = seg.last_ts()
+                if last is None or last <= candidates[0][0]:
+                    continue
+            count = seg.count()
+            rows = seg.read_raw(max(0, count - n), min(n, count))
+            candidates.extend((row[0], seg.path, i, row, seg) for i, row in enumerate(rows))
+            candidates = heapq.nlargest(n, candidates, key=lambda c: (c[0], c[1], c[2]))
+            candidates.sort(key=lambda c: (c[0], c[1], c[2]))
+
+        by_segment = {}
+        records = []
+        for ts, path, _, row, seg in candidates:
+            if path not in by_segment:
+                by_segment[path] = seg._strings()
+            records.extend(seg.decode([row], by_segment[path]))
+        return records
+
+    def _scan_segment(self, seg: Segment, since, until):
+        count = seg.count()
+        pos = seg.lower_bound(since, count) if since is not None else 0
+        strings = None
+        while pos < count:
+            rows = seg.read_raw(pos, min(_READ_CHUNK, count - pos))
+            if not rows:
+                return
+            if strings is None:
+                strings = seg._strings()
+            for record_ts, record in zip((r[0] for r in rows), seg.decode(rows, strings)):
+                if until is not None and record_ts >= until:
+                    return
+                yield record_ts, record
+            pos += len(rows)
+
+    def scan(self, since=None, until=None, limit: int = None):
+        """
+        Records with since <= timestamp < until, in time order.
+
+        Args:
+            since, until: ISO strings (UTC), datetimes or epoch seconds.
+            limit: Maximum number of records.
+
+        Returns:
+            List of record dicts.
+        """
+        records = []
+        for record in self.iter_scan(since, until):
+            records.append(record)
+            if limit is not None and len(records) >= limit:
+                break
+        return records
+
+    def iter_scan(self, since=None, until=None):
+        """Generator form of scan: streams records chunk by chunk per segment."""
+        since, until = to_epoch(since), to_epoch(until)
+        streams = []
+        for seg in self.segments():
+            # Bounds come from the records: rows enqueued before a
+            # rotation can be older than the segment's open time
+            first = seg.read_raw(0, 1)
+            if not first or (until is not None and first[0][0] >= until):
+                continue
+            last = seg.last_ts()
+            if last is None or (since is not None and last < since):
+                continue
+            streams.append(self._scan_segment(seg, since, until))
+
+        for _, record in heapq.merge(*streams, key=lambda item: item[0]):
+            yield record
+
+    def stats(self) -> dict:
+        segments = self.segments()
+        with self._lock:
+            return {
+                **self._stats,
+                "segments": len(segments),
+                "records": sum(s.count() for s in segments),
+                "bytes": sum(os.path.getsize(s.path) for s in segments if os.path.exists(s.path)),
+                "active_segment": os.path.basename(self._active["base"]) if self._active else None,
+            }
+
+
+# ============================
+# Process-wide store
+# ============================
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_prediction_store() -> PredictionLogStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PredictionLogStore()
+    return _store
+
+
+def tail_predictions(limit: int = 5) -> list:
+    """Most recent prediction log records, oldest first."""
+    return get_prediction_store().tail(limit)
+
+
+def scan_predictions(since=None, until=None, limit: int = None) -> list:
+    """Prediction log records in a time range, oldest first."""
+    return get_prediction_store().scan(since, until, limit)
+
+
+def iter_predictions(since=None, until=None):
+    """Stream prediction log records in a time range, oldest first."""
+    return get_prediction_store().iter_scan(since, until)
@@ -1,19 +1,164 @@
+"""
+Phase 4 — Service Metrics
+
+Per-route request latency histograms, in-flight gauges and error
+counters (fed by monitoring.middleware), per-stage timings for the
+expensive parts of a request, and prediction counters. Exported in
+Prometheus text format on /metrics.
+
+Recording only touches in-process counters under a per-series lock.
+With several uvicorn workers, set METRICS_MULTIPROC_DIR to a shared
+directory: each worker writes its snapshot to metrics_<pid>.json
+every METRICS_FLUSH_INTERVAL seconds, and whichever worker serves
+/metrics sums all snapshots (its own taken live). Counters of exited
+workers are kept so totals never go backwards; their in-flight
+gauges are dropped.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
 from datetime import datetime
 
 START_TIME = datetime.utcnow()
 
+# Seconds; upper bounds (le) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1.0))
+
 metrics = {
     "total_predictions": 0,
     "total_anomalies": 0,
     "last_prediction_time": None
 }
 
-def record_prediction(is_anomaly=False):
-    metrics["total_predictions"] += 1
-    metrics["last_prediction_time"] = datetime.utcnow()
+_metrics_lock = threading.Lock()
+_series_lock = threading.Lock()
+_routes = {}
+_stages = {}
+
+_flusher = None
+_flusher_stop = threading.Event()
+
+
+# ============================
+# Series
+# ============================
+
+class Histogram:
+    """Fixed-bucket latency histogram (non-cumulative bucket counts)."""
+
+    __slots__ = ("counts", "total", "count", "lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        i = bisect_left(LATENCY_BUCKETS, seconds)
+        with self.lock:
+            self.counts[i] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"counts": list(self.counts), "sum": self.total, "count": self.count}
+
+
+class RouteSeries:
+    """Latency, status, error and in-flight counters for one method+route."""
+
+    __slots__ = ("latency", "statuses", "errors", "in_flight", "lock")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = {}
+        self.errors = 0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+
+    def finish(self, seconds: float, status: int, error: bool) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if error:
+                self.errors += 1
+        self.latency.observe(seconds)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            statuses = {str(k): v for k, v in self.statuses.items()}
+            errors, in_flight = self.errors, self.in_flight
+        return {
+            "latency": self.latency.snapshot(),
+            "statuses": statuses,
+            "errors": errors,
+            "in_flight": in_flight,
+        }
+
+
+def route_series(method: str, route: str) -> RouteSeries:
+    key = (method, route)
+    series = _routes.get(key)
+    if series is None:
+        with _series_lock:
+            series = _routes.setdefault(key, RouteSeries())
+    return series
+
+
+def _stage_histogram(stage: str) -> Histogram:
+    histogram = _stages.get(stage)
+    if histogram is None:
+        with _series_lock:
+            histogram = _stages.setdefault(stage, Histogram())
+    return histogram
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Record the wall time of an expensive step (inference, orchestration, ...)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage timing measured by the caller (label known only afterwards)."""
+    _stage_histogram(stage).observe(seconds)
+
+
+def record_prediction(is_anomaly=False, count=1):
+    """
+    Count served predictions.
+
+    Args:
+        is_anomaly: Bool for a single prediction, or the number of
+            anomalies in a batch.
+        count: Number of predictions served.
+    """
+    with _metrics_lock:
+        metrics["total_predictions"] += count
+        metrics["last_prediction_time"] = datetime.utcnow()
+        metrics["total_anomalies"] += int(is_anomaly)
 
-    if is_anomaly:
-        metrics["total_anomalies"] += 1
 
 def get_metrics():
     uptime = (datetime.utcnow() - START_TIME).total_seconds()
@@ -21,3 +166,259 @@ def get_metrics():
         "uptime_seconds": uptime,
         **metrics
     }
+
+
+# ============================
+# Snapshots / multi-worker merge
+# ============================
+
+def _local_snapshot() -> dict:
+    return {
+        "pid": os.getpid(),
+        "routes": {
+            f"{method} {route}": series.snapshot()
+            for (method, route), series in list(_routes.items())
+        },
+        "stages": {stage: h.snapshot() for stage, h in list(_stages.items())},
+        "predictions": {
+            "total_predictions": metrics["total_predictions"],
+            "total_anomalies": metrics["total_anomalies"],
+        },
+    }
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(MULTIPROC_DIR, f"metrics_{pid}.json")
+
+
+def flush_snapshot() -> None:
+    """Atomically write this worker's snapshot to METRICS_MULTIPROC_DIR."""
+    if not MULTIPROC_DIR:
+        return
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_local_snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_histogram(into: dict, other: dict) -> None:
+    into["counts"] = [a + b for a, b in zip(into["counts"], other["counts"])]
+    into["sum"] += other["sum"]
+    into["count"] += other["count"]
+
+
+def _empty_histogram() -> dict:
+    return {"counts": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0, "count": 0}
+
+
+def collect() -> dict:
+    """Merged snapshot of this worker and, in multiprocess mode, all others."""
+    local = _local_snapshot()
+    snapshots = [local]
+
+    if MULTIPROC_DIR:
+        for path in glob.glob(os.path.join(MULTIPROC_DIR, "metrics_*.json")):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if snapshot.get("pid") == local["pid"]:
+                continue
+            if not _pid_alive(snapshot["pid"]):
+                for route in snapshot["routes"].values():
+                    route["in_flight"] = 0
+            snapshots.append(snapshot)
+
+    merged = {
+        "workers": len(snapshots),
+        "routes": {},
+        "stages": {},
+        "predictions": {"total_predictions": 0, "total_anomalies": 0},
+    }
+    for snapshot in snapshots:
+        for key, route in snapshot["routes"].items():
+            into = merged["routes"].setdefault(key, {
+                "latency": _empty_histogram(), "statuses": {}, "errors": 0, "in_flight": 0
+            })
+            _merge_histogram(into["latency"], route["latency"])
+            for status, n in route["statuses"].items():
+                into["statuses"][status] = into["statuses"].get(status, 0) + n
+            into["errors"] += route["errors"]
+            into["in_flight"] += route["in_flight"]
+        for stage, histogram in snapshot["stages"].items():
+            _merge_histogram(merged["stages"].setdefault(stage, _empty_histogram()), histogram)
+        for name, n in snapshot["predictions"].items():
+            merged["predictions"][name] += n
+    return merged
+
+
+def _flusher_loop():
+    while not _flusher_stop.wait(FLUSH_INTERVAL):
+        try:
+            flush_snapshot()
+        except OSError as e:
+            print(f"[METRICS] Failed to write snapshot: {e}")
+
+
+def start_metrics_flusher():
+    """Start periodic snapshot writes when METRICS_MULTIPROC_DIR is set (idempotent)."""
+    global _flusher
+    if not MULTIPROC_DIR or (_flusher is not None and _flusher.is_alive()):
+        return
+    _flusher_stop.clear()
+    _flusher = threading.Thread(target=_flusher_loop, name="metrics-flusher", daemon=True)
+    _flusher.start()
+
+
+def stop_metrics_flusher():
+    """Stop the flusher and write a final snapshot."""
+    global _flusher
+    if _flusher is None:
+        return
+    _flusher_stop.set()
+    _flusher.join(FLUSH_INTERVAL + 1)
+    _flusher = None
+    flush_snapshot()
+
+
+# ============================
+# Export
+# ============================
+
+def estimate_quantile(histogram: dict, q: float):
+    """
+    Estimate a latency quantile from bucket counts (linear
+    interpolation inside the bucket, like histogram_quantile).
+
+    Returns:
+        Seconds, or None when the histogram is empty.
+    """
+    count = histogram["count"]
+    if not count:
+        return None
+
+    rank = q * count
+    seen = 0
+    lower = 0.0
+    for upper, n in zip(LATENCY_BUCKETS, histogram["counts"]):
+        if n and seen + n >= rank:
+            return lower + (upper - lower) * (rank - seen) / n
+        seen += n
+        lower = upper
+    # Overflow bucket: best guess is the highest finite bound
+    return LATENCY_BUCKETS[-1]
+
+
+def get_latency_summary() -> dict:
+    """Per-route request count, error count and p50/p99 (ms) for /health."""
+    summary = {}
+    for key, route in sorted(collect()["routes"].items()):
+        latency = route["latency"]
+        p50 = estimate_quantile(latency, 0.50)
+        p99 = estimate_quantile(latency, 0.99)
+        summary[key] = {
+            "requests": latency["count"],
+            "errors": route["errors"],
+            "in_flight": route["in_flight"],
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+        }
+    return summary
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+def _histogram_lines(name: str, histogram: dict, labels: str) -> list:
+    lines = []
+    cumulative = 0
+    sep = "," if labels else ""
+    for upper, n in zip(LATENCY_BUCKETS, histogram["counts"]):
+        cumulative += n
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{upper}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {histogram["count"]}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram['sum']}")
+    lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+    return lines
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+    merged = collect()
+    routes = sorted(merged["routes"].items())
+
+    lines = [
+        "# HELP solarops_http_requests_total HTTP requests by route and status.",
+        "# TYPE solarops_http_requests_total counter",
+    ]
+    for key, route in routes:
+        method, path = key.split(" ", 1)
+        for status, n in sorted(route["statuses"].items()):
+            lines.append(
+                f"solarops_http_requests_total{{{_labels(method=method, route=path, status=status)}}} {n}"
+            )
+
+    lines += [
+        "# HELP solarops_http_request_errors_total Requests that raised or returned 5xx.",
+        "# TYPE solarops_http_request_errors_total counter",
+    ]
+    for key, route in routes:
+        method, path = key.split(" ", 1)
+        lines.append(f"solarops_http_request_errors_total{{{_labels(method=method, route=path)}}} {route['errors']}")
+
+    lines += [
+        "# HELP solarops_http_requests_in_flight Requests currently being served.",
+        "# TYPE solarops_http_requests_in_flight gauge",
+    ]
+    for key, route in routes:
+        method, path = key.split(" ", 1)
+        lines.append(f"solarops_http_requests_in_flight{{{_labels(method=method, route=path)}}} {route['in_flight']}")
+
+    lines += [
+        "# HELP solarops_http_request_duration_seconds Request latency by route.",
+        "# TYPE solarops_http_request_duration_seconds histogram",
+    ]
+    for key, route in routes:
+        method, path = key.split(" ", 1)
+        lines += _histogram_lines(
+            "solarops_http_request_duration_seconds", route["latency"], _labels(method=method, route=path)
+        )
+
+    lines += [
+        "# HELP solarops_stage_duration_seconds Wall time of expensive request stages.",
+        "# TYPE solarops_stage_duration_seconds histogram",
+    ]
+    for stage, histogram in sorted(merged["stages"].items()):
+        lines += _histogram_lines("solarops_stage_duration_seconds", histogram, _labels(stage=stage))
+
+    predictions = merged["predictions"]
+    lines += [
+        "# HELP solarops_predictions_total Predictions served.",
+        "# TYPE solarops_predictions_total counter",
+        f"solarops_predictions_total {predictions['total_predictions']}",
+        "# HELP solarops_anomalies_total Anomalies detected.",
+        "# TYPE solarops_anomalies_total counter",
+        f"solarops_anomalies_total {predictions['total_anomalies']}",
+        "# HELP solarops_metrics_workers Worker snapshots merged into this scrape.",
+        "# TYPE solarops_metrics_workers gauge",
+        f"solarops_metrics_workers {merged['workers']}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,66 @@
+"""
+Phase 4 — Request Metrics Middleware
+
+Plain ASGI middleware (no BaseHTTPMiddleware, so streaming
+responses are not buffered) that records per-route latency,
+status, error and in-flight counts into monitoring.metrics.
+
+Requests are labelled with the route template (e.g. /predict-power)
+rather than the raw path, so label cardinality stays bounded;
+paths that match no route share the "unmatched" label.
+"""
+
+import time
+
+from starlette.routing import Match
+
+from phase_04_mlops.monitoring.metrics import route_series
+
+UNMATCHED = "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, routes=None):
+        self.app = app
+        self.routes = routes
+        self._labels = {}
+
+    def _route_label(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        label = self._labels.get(key)
+        if label is not None:
+            return label
+
+        routes = self.routes if self.routes is not None else scope["app"].routes
+        for route in routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                # Only matched paths are cached, so 404 scans cannot grow it
+                label = self._labels[key] = route.path
+                return label
+        return UNMATCHED
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        series = route_series(scope["method"], self._route_label(scope))
+        status = 500
+        error = False
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        series.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            error = True
+            raise
+        finally:
+            series.finish(time.perf_counter() - started, status, error or status >= 500)
@@ -0,0 +1,103 @@
+"""
+Phase 4 — Startup Import Budget
+
+Breaks API cold-start wall time down per subsystem so regressions
+(e.g. a module-level import of torch or chromadb) are visible.
+
+Boot phases are timed with startup_phase() while app.app is being
+imported. Heavy phase 8–13 subsystems are loaded on first use via
+lazy_import(), which records that one-off cost under "deferred".
+"""
+
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+
+# Modules whose presence after boot usually means a cold-start regression
+HEAVY_MODULES = (
+    "pandas",
+    "sklearn",
+    "xgboost",
+    "torch",
+    "sentence_transformers",
+    "chromadb",
+)
+
+_BOOT_STARTED = time.perf_counter()
+
+_phases = []
+_deferred = {}
+_boot = {"completed": False, "seconds": None}
+
+
+@contextmanager
+def startup_phase(subsystem: str):
+    """Time a block of boot work and count the modules it imported."""
+    started = time.perf_counter()
+    modules_before = len(sys.modules)
+    try:
+        yield
+    finally:
+        _phases.append({
+            "subsystem": subsystem,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+            "modules_loaded": len(sys.modules) - modules_before,
+        })
+
+
+def lazy_import(subsystem: str, module_name: str):
+    """
+    Import a module on first use, recording its cost under subsystem.
+
+    Args:
+        subsystem: Report label, e.g. "orchestrator".
+        module_name: Dotted module path.
+
+    Returns:
+        The imported module.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    started = time.perf_counter()
+    modules_before = len(sys.modules)
+    module = importlib.import_module(module_name)
+
+    _deferred.setdefault(subsystem, {
+        "module": module_name,
+        "ms": round((time.perf_counter() - started) * 1000, 2),
+        "modules_loaded": len(sys.modules) - modules_before,
+    })
+    return module
+
+
+def mark_boot_complete() -> None:
+    """Freeze total boot time (called once the app is serving)."""
+    if not _boot["completed"]:
+        _boot["completed"] = True
+        _boot["seconds"] = round(time.perf_counter() - _BOOT_STARTED, 3)
+
+
+def get_startup_report() -> dict:
+    """Per-subsystem boot timings, first-use imports and loaded heavy modules."""
+    return {
+        "boot_seconds": _boot["seconds"],
+        "phases": list(_phases),
+        "deferred": dict(_deferred),
+        "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+    }
+
+
+def log_startup_report() -> None:
+    """Print the boot breakdown, slowest subsystem first."""
+    report = get_startup_report()
+    print(f"[STARTUP] Boot completed in {report['boot_seconds']}s")
+    for phase in sorted(report["phases"], key=lambda p: p["ms"], reverse=True):
+        print(
+            f"[STARTUP]   {phase['subsystem']:<20} {phase['ms']:>9.2f} ms"
+            f"  ({phase['modules_loaded']} modules)"
+        )
+    if report["heavy_modules_loaded"]:
+        print(f"[STARTUP] Heavy modules loaded at boot: {', '.join(report['heavy_modules_loaded'])}")
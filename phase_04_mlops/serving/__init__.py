@@ -0,0 +1 @@
+# Phase 4 MLOps serving module
@@ -0,0 +1,190 @@
+"""
+Phase 4 — JSON Artifact Cache
+
+Parses evaluation_report.json, metrics_history.json,
+training_stats.json, prediction_logs.json, ... once per process
+instead of on every tool call. Each lookup stats the file and
+re-parses it only when st_mtime_ns or size changed, like the
+forecast model pool.
+
+Cached documents are shared between requests, so they are handed
+out as read-only views: FrozenDict / FrozenList raise TypeError on
+mutation. copy.copy / copy.deepcopy / dict.copy() return plain
+mutable containers, so simulation code can still derive modified
+copies.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+
+_MISSING = object()
+
+_entries = {}
+_lock = threading.Lock()
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "reloads": 0,
+    "parse_time_ms_total": 0.0,
+}
+_file_stats = {}
+
+
+# ============================
+# Read-only views
+# ============================
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is a read-only cached artifact; copy it first")
+
+
+class FrozenDict(dict):
+    """dict view of a cached JSON object that refuses mutation."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class FrozenList(list):
+    """list view of a cached JSON array that refuses mutation."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def freeze(value):
+    """Recursively wrap parsed JSON in read-only containers."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+# ============================
+# Cache
+# ============================
+
+def _file_counters(path: str) -> dict:
+    counters = _file_stats.get(path)
+    if counters is None:
+        counters = _file_stats.setdefault(path, {"hits": 0, "misses": 0, "reloads": 0})
+    return counters
+
+
+def _parse_entry(path: str, stat) -> dict:
+    started = time.perf_counter()
+    with open(path, "r") as f:
+        data = freeze(json.load(f))
+    _stats["parse_time_ms_total"] += (time.perf_counter() - started) * 1000
+
+    return {
+        "data": data,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def load_json(path: str, default=_MISSING):
+    """
+    Return the parsed, read-only contents of a JSON artifact.
+
+    Args:
+        path: Absolute path of the JSON file.
+        default: Returned when the file does not exist; if omitted,
+            FileNotFoundError propagates.
+
+    Returns:
+        FrozenDict / FrozenList (or scalar) shared across callers.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if default is _MISSING:
+            raise
+        return default
+
+    counters = _file_counters(path)
+    entry = _entries.get(path)
+    if (
+        entry is not None
+        and entry["mtime_ns"] == stat.st_mtime_ns
+        and entry["size"] == stat.st_size
+    ):
+        _stats["hits"] += 1
+        counters["hits"] += 1
+        return entry["data"]
+
+    with _lock:
+        # Another thread may have parsed it while we waited
+        entry = _entries.get(path)
+        if (
+            entry is not None
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            _stats["hits"] += 1
+            counters["hits"] += 1
+            return entry["data"]
+
+        _stats["misses"] += 1
+        counters["misses"] += 1
+        if entry is not None:
+            _stats["reloads"] += 1
+            counters["reloads"] += 1
+
+        entry = _parse_entry(path, stat)
+        _entries[path] = entry
+        return entry["data"]
+
+
+def clear_cache() -> None:
+    """Drop all cached documents (next lookup re-parses from disk)."""
+    with _lock:
+        _entries.clear()
+
+
+def get_cache_stats() -> dict:
+    """Return overall and per-file hit rates for /health."""
+    lookups = _stats["hits"] + _stats["misses"]
+    files = {}
+    for path, counters in sorted(_file_stats.items()):
+        file_lookups = counters["hits"] + counters["misses"]
+        files[os.path.basename(path)] = {
+            **counters,
+            "hit_rate": round(counters["hits"] / file_lookups, 4) if file_lookups else None,
+        }
+    return {
+        **_stats,
+        "parse_time_ms_total": round(_stats["parse_time_ms_total"], 3),
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else None,
+        "files": files,
+    }
@@ -0,0 +1,124 @@
+"""
+Phase 4 — Batch Inference Helpers
+
+Vectorized multi-plant forecasting for /predict-power/batch.
+Rows are grouped by the artifact they resolve to (fine-tuned or
+shared base model) and each group is scored with a single
+predict call on a contiguous float32 matrix.
+"""
+
+import numpy as np
+
+from phase_04_mlops.serving.feature_layout import forecast_layout
+from phase_04_mlops.serving.model_pool import get_forecast_entry
+
+
+def build_feature_matrix(columns: dict, feature_names: list, index=None) -> np.ndarray:
+    """
+    Assemble a C-contiguous float32 matrix in the model's feature order.
+
+    Features the request does not carry are left at 0, matching the
+    DataFrame.reindex(fill_value=0) behaviour of the single-row path.
+
+    Args:
+        columns: Mapping of feature name -> 1-D numpy array.
+        feature_names: Feature order expected by the booster.
+        index: Optional integer index selecting the rows of a group.
+
+    Returns:
+        np.ndarray of shape (n_rows, len(feature_names)).
+    """
+    n_rows = len(next(iter(columns.values()))) if index is None else len(index)
+    X = np.zeros((n_rows, len(feature_names)), dtype=np.float32)
+
+    for j, name in enumerate(feature_names):
+        col = columns.get(name)
+        if col is not None:
+            X[:, j] = col if index is None else col[index]
+
+    return X
+
+
+def group_rows_by_model(plant_ids: np.ndarray) -> dict:
+    """
+    Resolve each distinct plant to its model once and group row indices.
+
+    Args:
+        plant_ids: 1-D integer array of plant IDs, one per row.
+
+    Returns:
+        Dict of model_key -> {"entry": pool entry, "index": np.ndarray}.
+    """
+    unique_plants, inverse = np.unique(plant_ids, return_inverse=True)
+
+    groups = {}
+    for slot, plant_id in enumerate(unique_plants):
+        entry, key = get_forecast_entry(int(plant_id))
+        group = groups.setdefault(key, {"entry": entry, "slots": []})
+        group["slots"].append(slot)
+
+    for group in groups.values():
+        group["index"] = np.flatnonzero(np.isin(inverse, group.pop("slots")))
+
+    return groups
+
+
+def predict_batch(columns: dict) -> tuple:
+    """
+    Score every row with the model its plant resolves to.
+
+    Args:
+        columns: Mapping of feature name -> 1-D numpy array; must
+            contain "plant_id".
+
+    Returns:
+        (predictions, models_used) where predictions is a float64
+        array in the original row order and models_used maps
+        model_key -> row count.
+    """
+    plant_ids = columns["plant_id"].astype(np.int64)
+    predictions = np.empty(len(plant_ids), dtype=np.float64)
+    models_used = {}
+
+    for key, group in group_rows_by_model(plant_ids).items():
+        layout = forecast_layout(group["entry"])
+        index = group["index"]
+        X = build_feature_matrix(columns, layout.feature_names, index)
+        predictions[index] = layout.predict_fn(X)
+        models_used[key] = int(len(index))
+
+    return predictions, models_used
+
+
+def score_anomalies(model, X: np.ndarray, rule_mask: np.ndarray) -> tuple:
+    """
+    Score the rows that survive the rule mask with one model pass.
+
+    Isolation Forest labels are derived from score_samples and the
+    fitted offset_ (what predict does internally), so the forest is
+    traversed once for both labels and raw scores.
+
+    Args:
+        model: Fitted PdM model (Isolation Forest), without stored
+            feature names (see feature_layout.without_feature_names).
+        X: Feature matrix in pdm_features order.
+        rule_mask: Bool array, True where the hard rule already fired.
+
+    Returns:
+        (labels, scores): labels are -1/1 per row; scores are float64
+        with NaN for rule-flagged rows.
+    """
+    labels = np.full(len(X), -1, dtype=np.int64)
+    scores = np.full(len(X), np.nan, dtype=np.float64)
+
+    ml_index = np.flatnonzero(~rule_mask)
+    if len(ml_index):
+        X_ml = X[ml_index]
+        if hasattr(model, "score_samples") and hasattr(model, "offset_"):
+            raw = model.score_samples(X_ml)
+            labels[ml_index] = np.where(raw - model.offset_ < 0, -1, 1)
+            scores[ml_index] = raw
+        else:
+            labels[ml_index] = model.predict(X_ml)
+
+    return labels, scores
@@ -0,0 +1,113 @@
+"""
+Phase 4 — Precompiled Feature Layouts
+
+Zero-DataFrame fast path for single-row inference.
+
+A FeatureLayout is resolved once per model: it maps request
+fields onto column slots of the model's feature order (booster
+feature_names for forecasting, pdm_features.pkl for PdM) and
+writes each request straight into a preallocated float32 row
+buffer. Missing features stay at 0, matching the previous
+DataFrame.reindex(fill_value=0) behaviour.
+"""
+
+import copy
+import threading
+
+import numpy as np
+
+FORECAST_FIELDS = ("plant_id", "DC_POWER", "hour", "day", "month")
+
+
+class FeatureLayout:
+    """Field -> column slot mapping with a per-thread row buffer."""
+
+    def __init__(self, feature_names, fields, predict_fn):
+        self.feature_names = list(feature_names)
+        self.slots = tuple(
+            (name, idx)
+            for idx, name in enumerate(self.feature_names)
+            if name in fields
+        )
+        self.predict_fn = predict_fn
+        self._local = threading.local()
+
+    def row(self, data) -> np.ndarray:
+        """
+        Write a request object's fields into this thread's row buffer.
+
+        Args:
+            data: Any object exposing the fields as attributes
+                (e.g. a pydantic request model).
+
+        Returns:
+            The (1, n_features) float32 buffer, reused across calls.
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+            self._local.buffer = buffer
+
+        row = buffer[0]
+        for name, idx in self.slots:
+            row[idx] = getattr(data, name)
+        return buffer
+
+    def predict(self, data):
+        """Score a single request object; returns the model's output array."""
+        return self.predict_fn(self.row(data))
+
+
+def without_feature_names(model, feature_names):
+    """
+    Shallow copy of a fitted sklearn model that predicts on plain arrays.
+
+    Models fitted on a DataFrame check column names on every call and
+    warn for NumPy input. The layouts guarantee pdm_features order, so
+    the stored names are verified once here and dropped from the copy
+    (the original keeps them for DataFrame callers).
+
+    Raises:
+        ValueError: if the model was fitted on a different column order.
+    """
+    fitted = getattr(model, "feature_names_in_", None)
+    if fitted is None:
+        return model
+    if list(fitted) != list(feature_names):
+        raise ValueError(f"Model was fitted on columns {list(fitted)}, expected {list(feature_names)}")
+    model = copy.copy(model)
+    del model.feature_names_in_
+    return model
+
+
+def _model_predict_fn(model):
+    """Pick the cheapest NumPy prediction entry point a model offers."""
+    if hasattr(model, "get_booster"):
+        # XGBoost: skip sklearn wrapper validation and DMatrix creation
+        return model.get_booster().inplace_predict
+    return model.predict
+
+
+def forecast_layout(entry: dict) -> FeatureLayout:
+    """
+    Return the layout for a model pool entry, compiling it on first use.
+
+    The layout is stored on the entry itself, so it is dropped
+    together with the model when the pool reloads the artifact.
+
+    Args:
+        entry: Pool entry from model_pool.get_entry().
+    """
+    layout = entry.get("layout")
+    if layout is None:
+        model = entry["model"]
+        feature_names = model.get_booster().feature_names or FORECAST_FIELDS
+        layout = FeatureLayout(feature_names, FORECAST_FIELDS, _model_predict_fn(model))
+        entry["layout"] = layout
+    return layout
+
+
+def pdm_layout(model, feature_names) -> FeatureLayout:
+    """Compile the PdM layout from pdm_features.pkl."""
+    model = without_feature_names(model, feature_names)
+    return FeatureLayout(feature_names, set(feature_names), model.predict)
@@ -0,0 +1,166 @@
+"""
+Phase 4 — Forecast Model Pool
+
+Keeps deserialized forecasting models in memory so that
+/predict-power does not joblib.load a booster on every request.
+
+Entries are keyed by artifact path, so every plant without a
+fine-tuned model shares the single base model entry. Each lookup
+stats the artifact and reloads it when st_mtime_ns or size changed
+(e.g. after phase_07_finetuning rewrote xgb_plant_{id}_ft.pkl).
+"""
+
+import os
+import threading
+import time
+
+import joblib
+
+BASE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+
+MODEL_DIR = os.path.join(BASE_DIR, "models", "forecasting")
+BASE_MODEL_NAME = "xgb_base_model.pkl"
+
+_entries = {}
+_lock = threading.Lock()
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "reloads": 0,
+    "load_time_ms_total": 0.0,
+    "last_load_time_ms": None,
+}
+
+
+def resolve_model_path(plant_id: int, model_dir: str = None):
+    """
+    Resolve which artifact serves a plant.
+
+    Args:
+        plant_id: Solar plant identifier.
+        model_dir: Directory holding the forecasting artifacts.
+
+    Returns:
+        (path, os.stat_result) of the fine-tuned model if present,
+        otherwise of the shared base model.
+    """
+    model_dir = model_dir or MODEL_DIR
+    ft_path = os.path.join(model_dir, f"xgb_plant_{plant_id}_ft.pkl")
+    try:
+        return ft_path, os.stat(ft_path)
+    except FileNotFoundError:
+        base_path = os.path.join(model_dir, BASE_MODEL_NAME)
+        return base_path, os.stat(base_path)
+
+
+def _load_entry(path: str, stat) -> dict:
+    """Deserialize an artifact and record load timing."""
+    started = time.perf_counter()
+    model = joblib.load(path)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    _stats["load_time_ms_total"] += elapsed_ms
+    _stats["last_load_time_ms"] = round(elapsed_ms, 3)
+    print(f"[MODEL POOL] Loaded {os.path.basename(path)} in {elapsed_ms:.1f} ms")
+
+    return {
+        "model": model,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "loaded_at": time.time(),
+    }
+
+
+def get_entry(path: str, stat=None) -> dict:
+    """
+    Return the pool entry for an artifact, loading it on first use
+    or when the file on disk changed since it was loaded.
+
+    Args:
+        path: Absolute path of the joblib artifact.
+        stat: Optional os.stat_result already taken by the caller.
+
+    Returns:
+        Entry dict with model, mtime_ns, size and loaded_at.
+    """
+    if stat is None:
+        stat = os.stat(path)
+
+    entry = _entries.get(path)
+    if (
+        entry is not None
+        and entry["mtime_ns"] == stat.st_mtime_ns
+        and entry["size"] == stat.st_size
+    ):
+        _stats["hits"] += 1
+        return entry
+
+    with _lock:
+        # Another thread may have loaded it while we waited
+        entry = _entries.get(path)
+        if (
+            entry is not None
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            _stats["hits"] += 1
+            return entry
+
+        _stats["misses"] += 1
+        if entry is not None:
+            _stats["reloads"] += 1
+
+        entry = _load_entry(path, stat)
+        _entries[path] = entry
+        return entry
+
+
+def get_forecast_entry(plant_id: int, model_dir: str = None):
+    """
+    Return the pool entry serving a plant.
+
+    Args:
+        plant_id: Solar plant identifier.
+        model_dir: Directory holding the forecasting artifacts.
+
+    Returns:
+        (entry, model_key) where model_key is the artifact file name.
+        Plants sharing the base model get the same entry and key.
+    """
+    path, stat = resolve_model_path(plant_id, model_dir)
+    return get_entry(path, stat), os.path.basename(path)
+
+
+def get_forecast_model(plant_id: int, model_dir: str = None):
+    """
+    Return the in-memory forecasting model for a plant.
+
+    Args:
+        plant_id: Solar plant identifier.
+        model_dir: Directory holding the forecasting artifacts.
+
+    Returns:
+        (model, model_key) where model_key is the artifact file name.
+    """
+    entry, key = get_forecast_entry(plant_id, model_dir)
+    return entry["model"], key
+
+
+def clear_pool() -> None:
+    """Drop all cached models (next lookup reloads from disk)."""
+    with _lock:
+        _entries.clear()
+
+
+def get_pool_stats() -> dict:
+    """Return hit/miss/load-time counters for /health."""
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "load_time_ms_total": round(_stats["load_time_ms_total"], 3),
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else None,
+        "cached_models": sorted(os.path.basename(p) for p in _entries),
+    }
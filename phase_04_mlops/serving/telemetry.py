@@ -0,0 +1,182 @@
+"""
+Phase 4 — Telemetry Feature Buffers
+
+Server-side PdM feature engineering for raw SCADA readings, so
+gateways no longer need to keep 24 hours of history themselves.
+
+Each inverter owns a small ring buffer (two array('d') of 25 slots:
+the current reading plus 24 lags) and running 6-reading sums.
+Features match the training notebooks:
+    *_lag_k        → value k readings ago      (Series.shift(k))
+    *_roll_mean_6  → mean of the last 6 values (Series.rolling(6).mean())
+and every reading is processed in O(1).
+"""
+
+import json
+import math
+import threading
+from array import array
+
+from phase_04_mlops.logging.prediction_store import to_epoch
+
+HISTORY = 25
+ROLL_WINDOW = 6
+
+PDM_FEATURES = (
+    "DC_POWER", "AC_POWER",
+    "ac_lag_1", "ac_lag_24", "dc_lag_1", "dc_lag_24",
+    "ac_roll_mean_6", "dc_roll_mean_6",
+)
+
+
+def parse_ndjson(body: bytes) -> tuple:
+    """
+    Split an NDJSON request body into readings.
+
+    Lines that are not UTF-8, not JSON, or not a JSON object are
+    reported per line instead of failing the whole request.
+
+    Returns:
+        (readings, errors) — parsed dicts, and {"line", "error"} dicts.
+    """
+    readings = []
+    errors = []
+    for line_no, raw in enumerate(body.splitlines(), 1):
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            errors.append({"line": line_no, "error": "invalid UTF-8"})
+            continue
+        if not line.strip():
+            continue
+        try:
+            parsed = json.loads(line)
+        except json.JSONDecodeError as e:
+            errors.append({"line": line_no, "error": f"invalid JSON: {e.msg}"})
+            continue
+        if not isinstance(parsed, dict):
+            errors.append({"line": line_no, "error": "reading must be a JSON object"})
+            continue
+        readings.append(parsed)
+    return readings, errors
+
+
+class InverterBuffer:
+    """Ring buffer of the last HISTORY AC/DC readings for one inverter."""
+
+    __slots__ = ("ac", "dc", "pos", "n", "ac_sum", "dc_sum", "last_timestamp")
+
+    def __init__(self):
+        self.ac = array("d", bytes(8 * HISTORY))
+        self.dc = array("d", bytes(8 * HISTORY))
+        self.pos = 0
+        self.n = 0
+        self.ac_sum = 0.0
+        self.dc_sum = 0.0
+        self.last_timestamp = None  # epoch seconds of the newest reading
+
+    def push(self, dc_power: float, ac_power: float):
+        """
+        Append a reading and derive its PdM features.
+
+        Returns:
+            Tuple in PDM_FEATURES order, or None while fewer than
+            24 previous readings are buffered (warm-up).
+        """
+        pos = self.pos
+        ac, dc = self.ac, self.dc
+
+        # Slide the 6-reading sums: drop the reading leaving the window
+        if self.n >= ROLL_WINDOW:
+            out = (pos - ROLL_WINDOW) % HISTORY
+            self.ac_sum -= ac[out]
+            self.dc_sum -= dc[out]
+        self.ac_sum += ac_power
+        self.dc_sum += dc_power
+
+        ac[pos] = ac_power
+        dc[pos] = dc_power
+        self.pos = pos + 1 if pos + 1 < HISTORY else 0
+        self.n += 1
+
+        if self.n < HISTORY:
+            return None
+
+        lag_1 = (pos - 1) % HISTORY
+        lag_24 = (pos - 24) % HISTORY
+        return (
+            dc_power,
+            ac_power,
+            ac[lag_1],
+            ac[lag_24],
+            dc[lag_1],
+            dc[lag_24],
+            self.ac_sum / ROLL_WINDOW,
+            self.dc_sum / ROLL_WINDOW,
+        )
+
+
+class TelemetryStore:
+    """Registry of per-inverter buffers."""
+
+    def __init__(self):
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self.readings = 0
+        self.rejected = 0
+
+    def ingest(self, readings: list) -> list:
+        """
+        Push parsed readings in arrival order.
+
+        Args:
+            readings: List of dicts with inverter_id, DC_POWER,
+                AC_POWER and optional timestamp / plant_id.
+
+        Returns:
+            One entry per reading: feature tuple, None (warm-up),
+            or an error string for rejected readings.
+        """
+        out = []
+        with self._lock:
+            for r in readings:
+                try:
+                    key = str(r["inverter_id"])
+                    dc_power = float(r["DC_POWER"])
+                    ac_power = float(r["AC_POWER"])
+                    # One NaN / inf would stay in the running sums for good
+                    if not (math.isfinite(dc_power) and math.isfinite(ac_power)):
+                        raise ValueError("DC_POWER and AC_POWER must be finite")
+                    timestamp = to_epoch(r.get("timestamp") or None)
+                except (KeyError, TypeError, ValueError) as e:
+                    self.rejected += 1
+                    out.append(f"invalid reading: {e}")
+                    continue
+
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    buffer = self._buffers[key] = InverterBuffer()
+
+                # Drop re-sent or out-of-order readings; compared as epochs so
+                # "Z" / "+00:00" offsets and optional microseconds agree
+                if timestamp is not None:
+                    if buffer.last_timestamp is not None and timestamp <= buffer.last_timestamp:
+                        self.rejected += 1
+                        out.append("out_of_order")
+                        continue
+                    buffer.last_timestamp = timestamp
+
+                out.append(buffer.push(dc_power, ac_power))
+                self.readings += 1
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "inverters_tracked": len(self._buffers),
+            "readings_ingested": self.readings,
+            "readings_rejected": self.rejected,
+            "buffer_slots_per_inverter": HISTORY,
+        }
+
+
+TELEMETRY_STORE = TelemetryStore()
@@ -0,0 +1,486 @@
+"""
+Phase 4 — Operational Store
+
+One embedded SQLite database (WAL mode) for the records the agents
+append at runtime: alerts (Phase 11 alerting and Phase 8 agent
+alerts), agent conversation memory and Phase 10 simulation logs.
+Previously each of these was a JSON file that was read, appended to
+and rewritten whole on every write, which is O(n) per write and
+loses records when several workers write at once.
+
+    alerts       indexed by (plant_id, timestamp), (severity, timestamp),
+                 timestamp and (source, id)
+    memory       indexed by (plant_id, timestamp)
+    simulations  indexed by timestamp
+
+Inserts are single append-only transactions; WAL lets readers run
+alongside a writer and SQLite's lock serializes writers across
+processes. Records are stored as their original JSON documents plus
+the indexed columns, so readers get back exactly what was logged.
+
+Retention is applied per table (and alert source): max_rows is
+enforced on every insert, max_age_days at most once per
+RETENTION_INTERVAL seconds. Defaults keep the old caps (last 50
+agent alerts, last 10 memory entries) and everything else forever.
+
+On first open the legacy JSON files are imported once, in a single
+transaction guarded by the migrations table, so concurrent workers
+cannot import twice. The JSON files are left in place, unchanged.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+OPS_STORE_PATH = os.getenv(
+    "OPS_STORE_PATH", os.path.join(BASE_DIR, "phase_04_mlops", "storage", "ops_store.db")
+)
+BUSY_TIMEOUT = float(os.getenv("OPS_STORE_BUSY_TIMEOUT", 5.0))
+RETENTION_INTERVAL = float(os.getenv("OPS_STORE_RETENTION_INTERVAL", 60))
+
+
+def _env_int(name: str, default=None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# (table, alert source or None) -> policy
+RETENTION = {
+    ("alerts", "alerting"): {
+        "max_rows": _env_int("OPS_STORE_ALERT_MAX_ROWS"),
+        "max_age_days": _env_int("OPS_STORE_ALERT_RETENTION_DAYS"),
+    },
+    ("alerts", "agent"): {
+        "max_rows": _env_int("OPS_STORE_AGENT_ALERT_MAX_ROWS", 50),
+        "max_age_days": _env_int("OPS_STORE_ALERT_RETENTION_DAYS"),
+    },
+    ("memory", None): {
+        "max_rows": _env_int("OPS_STORE_MEMORY_MAX_ROWS", 10),
+        "max_age_days": None,
+    },
+    ("simulations", None): {
+        "max_rows": _env_int("OPS_STORE_SIMULATION_MAX_ROWS"),
+        "max_age_days": _env_int("OPS_STORE_SIMULATION_RETENTION_DAYS"),
+    },
+}
+
+# Legacy JSON files imported on first open: name -> (path, table, alert source)
+LEGACY_FILES = {
+    "alerts_phase11": (os.path.join(BASE_DIR, "phase_11_alerting", "alerts.json"), "alerts", "alerting"),
+    "alerts_phase08": (os.path.join(BASE_DIR, "phase_08_agent", "alerts.json"), "alerts", "agent"),
+    "memory_phase08": (os.path.join(BASE_DIR, "phase_08_agent", "ai_memory.json"), "memory", None),
+    "simulations_phase10": (
+        os.path.join(BASE_DIR, "phase_10_scenario_engine", "simulation_logs.json"), "simulations", None
+    ),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    alert_id TEXT,
+    plant_id INTEGER,
+    severity TEXT,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp);
+CREATE INDEX IF NOT EXISTS idx_alerts_plant ON alerts(plant_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts(severity, timestamp);
+CREATE INDEX IF NOT EXISTS idx_alerts_source ON alerts(source, id);
+
+CREATE TABLE IF NOT EXISTS memory (
+    id INTEGER PRIMARY KEY,
+    plant_id INTEGER,
+    risk_level TEXT,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memory_plant ON memory(plant_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS simulations (
+    id INTEGER PRIMARY KEY,
+    plant_id INTEGER,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_simulations_timestamp ON simulations(timestamp);
+
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+
+
+# ============================
+# Row extraction
+# ============================
+
+def _alert_row(record: dict, source: str) -> tuple:
+    alert = record.get("alert", record)
+    return (
+        source,
+        alert.get("alert_id"),
+        alert.get("plant_id", 1),
+        alert.get("severity"),
+        alert.get("timestamp", record.get("logged_at", "")) or "",
+        json.dumps(record, default=str),
+    )
+
+
+def _memory_row(record: dict) -> tuple:
+    return (
+        record.get("plant_id"),
+        record.get("risk_level"),
+        record.get("timestamp", "") or "",
+        json.dumps(record, default=str),
+    )
+
+
+def _simulation_row(record: dict) -> tuple:
+    event = record.get("event", {})
+    return (
+        event.get("plant_id") if isinstance(event, dict) else None,
+        record.get("timestamp", "") or "",
+        json.dumps(record, default=str),
+    )
+
+
+_INSERT = {
+    "alerts": (
+        "INSERT INTO alerts (source, alert_id, plant_id, severity, timestamp, record) VALUES (?, ?, ?, ?, ?, ?)",
+        _alert_row,
+    ),
+    "memory": (
+        "INSERT INTO memory (plant_id, risk_level, timestamp, record) VALUES (?, ?, ?, ?)",
+        lambda record, source=None: _memory_row(record),
+    ),
+    "simulations": (
+        "INSERT INTO simulations (plant_id, timestamp, record) VALUES (?, ?, ?)",
+        lambda record, source=None: _simulation_row(record),
+    ),
+}
+
+
+# ============================
+# Store
+# ============================
+
+class OpsStore:
+    def __init__(self, path: str = OPS_STORE_PATH, migrate: bool = True):
+        self.path = path
+        self._local = threading.local()
+        self._retention_lock = threading.Lock()
+        self._last_age_sweep = 0.0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if migrate:
+            self.migrate_legacy_files()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection in autocommit mode; transactions are explicit."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ----------------------------
+    # Migration
+    # ----------------------------
+
+    def migrate_legacy_files(self, files: dict = None) -> dict:
+        """
+        Import legacy JSON files once.
+
+        Returns:
+            {name: rows imported} for files imported by this call.
+        """
+        imported = {}
+        for name, (path, table, source) in (files or LEGACY_FILES).items():
+            def run(conn):
+                if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+                    return None
+                records = []
+                if os.path.exists(path):
+                    try:
+                        with open(path, "r") as f:
+                            records = json.load(f)
+                    except (json.JSONDecodeError, IOError) as e:
+                        print(f"[OPS STORE] Skipping unreadable {path}: {e}")
+                sql, to_row = _INSERT[table]
+                rows = [to_row(r, source) for r in records if isinstance(r, dict)]
+                conn.executemany(sql, rows)
+                conn.execute(
+                    "INSERT INTO migrations (name, applied_at, rows) VALUES (?, ?, ?)",
+                    (name, datetime.utcnow().isoformat(), len(rows)),
+                )
+                return len(rows)
+
+            rows = self._write(run)
+            if rows is not None:
+                imported[name] = rows
+                if rows:
+                    print(f"[OPS STORE] Migrated {rows} records from {os.path.basename(path)} into {table}")
+        return imported
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+
+    def insert(self, table: str, record: dict, source: str = None) -> int:
+        """Append one record and enforce its row cap in the same transaction."""
+        sql, to_row = _INSERT[table]
+        policy = RETENTION.get((table, source), {})
+
+        def run(conn):
+            row_id = conn.execute(sql, to_row(record, source)).lastrowid
+            if policy.get("max_rows"):
+                self._trim_rows(conn, table, source, policy["max_rows"])
+            return row_id
+
+        row_id = self._write(run)
+        self._maybe_sweep_ages()
+        return row_id
+
+    def _trim_rows(self, conn, table: str, source, max_rows: int) -> int:
+        scope, params = ("source = ?", (source,)) if table == "alerts" else ("1 = 1", ())
+        cutoff = conn.execute(
+            f"SELECT id FROM {table} WHERE {scope} ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (*params, max_rows),
+        ).fetchone()
+        if cutoff is None:
+            return 0
+        return conn.execute(f"DELETE FROM {table} WHERE {scope} AND id <= ?", (*params, cutoff[0])).rowcount
+
+    def _maybe_sweep_ages(self) -> None:
+        now = time.monotonic()
+        with self._retention_lock:
+            if now - self._last_age_sweep < RETENTION_INTERVAL:
+                return
+            self._last_age_sweep = now
+        self.apply_retention(rows=False)
+
+    def apply_retention(self, rows: bool = True, ages: bool = True) -> dict:
+        """
+        Enforce every retention policy now.
+
+        Returns:
+            {"table[:source]": rows deleted}
+        """
+        deleted = {}
+        for (table, source), policy in RETENTION.items():
+            label = f"{table}:{source}" if source else table
+
+            def run(conn):
+                n = 0
+                if rows and policy.get("max_rows"):
+                    n += self._trim_rows(conn, table, source, policy["max_rows"])
+                if ages and policy.get("max_age_days"):
+                    cutoff = (datetime.utcnow() - timedelta(days=policy["max_age_days"])).isoformat()
+                    scope, params = ("source = ? AND ", (source,)) if table == "alerts" else ("", ())
+                    n += conn.execute(
+                        f"DELETE FROM {table} WHERE {scope}timestamp < ?", (*params, cutoff)
+                    ).rowcount
+                return n
+
+            n = self._write(run)
+            if n:
+                deleted[label] = n
+        return deleted
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+
+    def _select(self, table: str, filters: dict, order: str, limit: int = None) -> list:
+        clauses, params = [], []
+        for column, op, value in (
+            ("source", "=", filters.get("source")),
+            ("plant_id", "=", filters.get("plant_id")),
+            ("severity", "=", filters.get("severity")),
+            ("timestamp", ">=", filters.get("since")),
+            ("timestamp", "<", filters.get("until")),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT record FROM {table} {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(row[0]) for row in self._conn().execute(sql, params)]
+
+    def query_alerts(self, source=None, plant_id=None, severity=None, since=None, until=None,
+                     limit: int = None, newest_first: bool = True) -> list:
+        """Alert records matching the filters, ordered by timestamp."""
+        order = "timestamp DESC, id DESC" if newest_first else "timestamp, id"
+        return self._select("alerts", {
+            "source": source, "plant_id": plant_id, "severity": severity,
+            "since": since, "until": until,
+        }, order, limit)
+
+    def count_alerts(self, source=None, plant_id=None, severity=None) -> int:
+        clauses, params = [], []
+        for column, value in (("source", source), ("plant_id", plant_id), ("severity", severity)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._conn().execute(f"SELECT COUNT(*) FROM alerts {where}", params).fetchone()[0]
+
+    def recent_memory(self, limit: int = 10, plant_id=None) -> list:
+        """Last `limit` memory entries, oldest first."""
+        records = self._select("memory", {"plant_id": plant_id}, "id DESC", limit)
+        return records[::-1]
+
+    def query_simulations(self, since=None, until=None, limit: int = None) -> list:
+        """Simulation records in chronological order."""
+        return self._select("simulations", {"since": since, "until": until}, "timestamp, id", limit)
+
+    def iter_records(self, table: str, source=None, batch_size: int = 500):
+        """
+        Stream every record of a table in id order, batch_size rows
+        per query (keyset paging), for bulk readers such as backfills.
+        """
+        if table not in ("alerts", "memory", "simulations"):
+            raise ValueError(f"Unknown table: {table}")
+        scope = "AND source = ?" if source is not None else ""
+        last_id = 0
+        while True:
+            params = [last_id] + ([source] if source is not None else []) + [batch_size]
+            rows = self._conn().execute(
+                f"SELECT id, record FROM {table} WHERE id > ? {scope} ORDER BY id LIMIT ?", params
+            ).fetchall()
+            if not rows:
+                return
+            for _, record in rows:
+                yield json.loads(record)
+            last_id = rows[-1][0]
+
+    # ----------------------------
+    # Change feed (in-memory indexes)
+    # ----------------------------
+
+    def open_reader(self) -> sqlite3.Connection:
+        """
+        Dedicated connection for an index that tracks this store.
+        PRAGMA data_version on it changes whenever any other
+        connection (thread or process) commits.
+        """
+        return sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+
+    @staticmethod
+    def data_version(conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    @staticmethod
+    def alert_rows_after(conn: sqlite3.Connection, last_id: int) -> list:
+        """(id, source, record) of alerts appended after last_id, in id order."""
+        return [
+            (row_id, source, json.loads(record))
+            for row_id, source, record in conn.execute(
+                "SELECT id, source, record FROM alerts WHERE id > ? ORDER BY id", (last_id,)
+            )
+        ]
+
+    @staticmethod
+    def alert_min_id(conn: sqlite3.Connection, source: str):
+        """Oldest surviving alert id of a source (None if it has none)."""
+        return conn.execute("SELECT MIN(id) FROM alerts WHERE source = ?", (source,)).fetchone()[0]
+
+    @staticmethod
+    def alert_count(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        return {
+            "path": self.path,
+            "tables": {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("alerts", "memory", "simulations")
+            },
+        }
+
+
+# ============================
+# Process-wide store
+# ============================
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> OpsStore:
+    """The shared store, opened (and migrated) on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = OpsStore(OPS_STORE_PATH)
+    return _store
+
+
+def get_store_stats():
+    """Row counts for /health, or None before the store was first used."""
+    return _store.stats() if _store is not None else None
+
+
+def insert_alert(record: dict, source: str) -> int:
+    return get_store().insert("alerts", record, source)
+
+
+def insert_memory(record: dict) -> int:
+    return get_store().insert("memory", record)
+
+
+def insert_simulation(record: dict) -> int:
+    return get_store().insert("simulations", record)
+
+
+def query_alerts(**filters) -> list:
+    return get_store().query_alerts(**filters)
+
+
+def count_alerts(**filters) -> int:
+    return get_store().count_alerts(**filters)
+
+
+def recent_memory(limit: int = 10, plant_id=None) -> list:
+    return get_store().recent_memory(limit, plant_id)
+
+
+def query_simulations(**filters) -> list:
+    return get_store().query_simulations(**filters)
+
+
+def iter_alerts(source=None, batch_size: int = 500):
+    return get_store().iter_records("alerts", source, batch_size)
+
+
+def iter_simulations(batch_size: int = 500):
+    return get_store().iter_records("simulations", batch_size=batch_size)
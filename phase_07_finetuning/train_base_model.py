@@ -2,12 +2,14 @@ import pandas as pd
 import numpy as np
 import os
 import joblib
+import sys
 from xgboost import XGBRegressor
 
 # ===============================
 # PATHS
 # ===============================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
 DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "solar_features.csv")
 
 # ===============================
@@ -51,4 +53,13 @@ model.fit(X_train, y_train)
 MODEL_PATH = os.path.join(BASE_DIR, "models", "forecasting", "xgb_base_model.pkl")
 joblib.dump(model, MODEL_PATH)
 
+# ===============================
+# CAPTURE DRIFT REFERENCE (Phase 4)
+# ===============================
+# Always from data/processed/solar_cleaned.csv, so the drift baseline
+# does not depend on which script ran last
+from phase_04_mlops.drift.streaming_drift import rebuild_training_stats
+
+rebuild_training_stats()
+
 print("Base model trained and saved successfully.")
@@ -0,0 +1,162 @@
+"""
+Phase 8 — Alert Index
+
+In-memory materialized view of the alerts table for the
+historical agent. Built once from the operational store, then kept
+current incrementally: before answering, the index checks the
+store's PRAGMA data_version (O(1)) and, only if another connection
+committed, pulls the rows appended since the last seen id.
+
+Held per view — all alerts, per severity, per plant and per
+(severity, plant) — as lists sorted by (timestamp, id), so
+newest-first queries slice from the end, time ranges bisect and
+counts are list lengths.
+
+Retention deletes are detected by comparing the store's row count
+with the index size after a catch-up. Row caps (e.g. 50 agent
+alerts) always remove a source's oldest ids, so the index first
+evicts, per source, the ids below the oldest surviving one; only a
+mismatch left after that (age-based sweeps, manual deletes) triggers
+a full rebuild.
+"""
+
+import bisect
+import threading
+from collections import deque
+
+from phase_04_mlops.storage.ops_store import get_store
+
+
+def normalize_alert(entry: dict) -> dict:
+    """Normalize alert entry to a consistent format."""
+    alert = entry.get("alert", entry)
+    return {
+        "alert_id": alert.get("alert_id", "unknown"),
+        "timestamp": alert.get("timestamp", entry.get("logged_at", "")),
+        "severity": alert.get("severity", "UNKNOWN"),
+        "decision": alert.get("decision", ""),
+        "priority": alert.get("priority", ""),
+        "plant_id": alert.get("plant_id", 1),
+        "message": alert.get("message", ""),
+    }
+
+
+class AlertIndex:
+    def __init__(self, store=None):
+        self._store = store
+        self._conn = None
+        self._lock = threading.Lock()
+        self._version = None
+        self._reset()
+        self._stats = {"builds": 0, "incremental_rows": 0, "evicted_rows": 0, "refreshes": 0}
+
+    def _reset(self) -> None:
+        self._last_id = 0
+        self._alerts = {}     # id -> normalized alert
+        self._views = {}      # (severity|None, plant|None) -> sorted [(timestamp, id)]
+        self._by_source = {}  # source -> deque of ids, ascending
+
+    def _views_of(self, alert: dict) -> tuple:
+        severity, plant = alert["severity"], alert["plant_id"]
+        return (None, None), (severity, None), (None, plant), (severity, plant)
+
+    def _add(self, row_id: int, source: str, record: dict) -> None:
+        alert = normalize_alert(record)
+        self._alerts[row_id] = alert
+        self._by_source.setdefault(source, deque()).append(row_id)
+        key = (alert["timestamp"] or "", row_id)
+        for view in self._views_of(alert):
+            entries = self._views.setdefault(view, [])
+            # Appends are almost always the newest alert
+            if not entries or entries[-1] <= key:
+                entries.append(key)
+            else:
+                bisect.insort(entries, key)
+        self._last_id = max(self._last_id, row_id)
+
+    def _evict_trimmed(self, store) -> None:
+        """Drop each source's ids below its oldest surviving id (row-cap trims)."""
+        for source, ids in self._by_source.items():
+            if not ids:
+                continue
+            oldest = store.alert_min_id(self._conn, source)
+            while ids and (oldest is None or ids[0] < oldest):
+                row_id = ids.popleft()
+                alert = self._alerts.pop(row_id)
+                key = (alert["timestamp"] or "", row_id)
+                for view in self._views_of(alert):
+                    entries = self._views[view]
+                    del entries[bisect.bisect_left(entries, key)]
+                self._stats["evicted_rows"] += 1
+
+    def refresh(self) -> None:
+        """Catch up with the store if anything was committed since the last check."""
+        with self._lock:
+            store = self._store or get_store()
+            if self._conn is None:
+                self._conn = store.open_reader()
+            version = store.data_version(self._conn)
+            if version == self._version:
+                return
+            self._stats["refreshes"] += 1
+
+            if self._version is not None:
+                new_rows = store.alert_rows_after(self._conn, self._last_id)
+                for row_id, source, record in new_rows:
+                    self._add(row_id, source, record)
+                self._stats["incremental_rows"] += len(new_rows)
+                if store.alert_count(self._conn) != len(self._alerts):
+                    self._evict_trimmed(store)
+
+            if self._version is None or store.alert_count(self._conn) != len(self._alerts):
+                self._build(store)
+            self._version = version
+
+    def _build(self, store) -> None:
+        self._reset()
+        for row_id, source, record in store.alert_rows_after(self._conn, 0):
+            self._add(row_id, source, record)
+        self._stats["builds"] += 1
+
+    def query(self, severity=None, plant_id=None, limit: int = 10, since=None, until=None) -> list:
+        """
+        Normalized alerts, newest first.
+
+        Args:
+            severity: Severity filter (e.g. "P0").
+            plant_id: Plant filter.
+            limit: Maximum number of alerts.
+            since, until: ISO timestamp bounds, since <= t < until.
+        """
+        self.refresh()
+        with self._lock:
+            entries = self._views.get((severity, plant_id), [])
+            lo = bisect.bisect_left(entries, (since, 0)) if since else 0
+            hi = bisect.bisect_left(entries, (until, 0)) if until else len(entries)
+            if limit is not None:
+                lo = max(lo, hi - limit)
+            return [dict(self._alerts[row_id]) for _, row_id in reversed(entries[lo:hi])]
+
+    def count(self, severity=None, plant_id=None) -> int:
+        self.refresh()
+        with self._lock:
+            return len(self._views.get((severity, plant_id), ()))
+
+    def counters(self) -> dict:
+        """Per-severity and per-plant alert counts."""
+        self.refresh()
+        with self._lock:
+            by_severity, by_plant = {}, {}
+            for (severity, plant), entries in self._views.items():
+                if severity is not None and plant is None:
+                    by_severity[severity] = len(entries)
+                elif plant is not None and severity is None:
+                    by_plant[plant] = len(entries)
+            return {"total": len(self._alerts), "by_severity": by_severity, "by_plant": by_plant}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "alerts": len(self._alerts), "last_id": self._last_id}
+
+
+ALERT_INDEX = AlertIndex()
@@ -1,49 +1,15 @@
 """
 Phase 8 — Historical Alert Agent (Memory Agent)
 
-Queries historical alert data from Phase 11 alert logs
-and Phase 12 vector store to answer questions about
+Queries historical alert data from the operational store
+(Phase 11 and Phase 8 alerts) and Phase 12 vector store to answer questions about
 past incidents, previous alerts, and historical patterns.
 
 This agent is activated when the intent classifier detects
 historical/memory-related questions.
 """
 
-import json
-import os
-
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-# Primary alert source (Phase 11 — structured logs)
-ALERT_LOG_PATH = os.path.join(BASE_DIR, "phase_11_alerting", "alerts.json")
-
-# Secondary alert source (Phase 8 — agent-level alerts)
-AGENT_ALERT_PATH = os.path.join(BASE_DIR, "phase_08_agent", "alerts.json")
-
-
-def _load_alerts(path: str) -> list:
-    """Safely load alerts from a JSON file."""
-    if not os.path.exists(path):
-        return []
-    try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
-
-
-def _normalize_alert(entry: dict) -> dict:
-    """Normalize alert entry to a consistent format."""
-    alert = entry.get("alert", entry)
-    return {
-        "alert_id": alert.get("alert_id", "unknown"),
-        "timestamp": alert.get("timestamp", entry.get("logged_at", "")),
-        "severity": alert.get("severity", "UNKNOWN"),
-        "decision": alert.get("decision", ""),
-        "priority": alert.get("priority", ""),
-        "plant_id": alert.get("plant_id", 1),
-        "message": alert.get("message", ""),
-    }
+from phase_08_agent.alert_index import ALERT_INDEX
 
 
 def get_alert_history(
@@ -62,24 +28,12 @@ def get_alert_history(
     Returns:
         List of normalized alert dicts, sorted newest-first.
     """
-    # Merge alerts from both sources
-    raw_alerts = _load_alerts(ALERT_LOG_PATH) + _load_alerts(AGENT_ALERT_PATH)
-
-    # Normalize
-    alerts = [_normalize_alert(a) for a in raw_alerts]
-
-    # Filter by severity
-    if severity_filter:
-        alerts = [a for a in alerts if a["severity"] == severity_filter]
-
-    # Filter by plant
-    if plant_id is not None:
-        alerts = [a for a in alerts if a["plant_id"] == plant_id]
-
-    # Sort newest first
-    alerts.sort(key=lambda a: a["timestamp"], reverse=True)
-
-    return alerts[:limit]
+    # Both sources are served from the incrementally maintained index
+    return ALERT_INDEX.query(
+        severity=severity_filter or None,
+        plant_id=plant_id,
+        limit=limit,
+    )
 
 
 def get_last_critical_alert(plant_id: int = None) -> dict | None:
@@ -121,18 +75,21 @@ def historical_analysis(question: str, plant_id: int = 1) -> dict:
     )
 
     # Also query Phase 12 Vector RAG for semantic context
+    # (skipped while the index is still warming up at startup)
     rag_context = ""
     try:
-        from phase_12_vector_rag.rag_engine import run_rag
-        rag_result = run_rag(question, plant_id=plant_id)
-        rag_context = rag_result.get("context", "")
+        from phase_12_vector_rag.readiness import rag_available
+        if rag_available():
+            from phase_12_vector_rag.rag_engine import run_rag
+            rag_result = run_rag(question, plant_id=plant_id)
+            rag_context = rag_result.get("context", "")
     except Exception:
         pass
 
     # Build summary
-    total_alerts = len(_load_alerts(ALERT_LOG_PATH) + _load_alerts(AGENT_ALERT_PATH))
-    critical_count = len(get_alert_history(severity_filter="P0"))
-    warning_count = len(get_alert_history(severity_filter="P1"))
+    total_alerts = ALERT_INDEX.count()
+    critical_count = ALERT_INDEX.count(severity="P0")
+    warning_count = ALERT_INDEX.count(severity="P1")
 
     if alerts:
         last = alerts[0]
@@ -1,22 +1,9 @@
-import os
-import json
+from phase_04_mlops.storage.ops_store import insert_memory, recent_memory
 
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-
-MEMORY_PATH = os.path.join(BASE_DIR, "phase_08_agent", "ai_memory.json")
+MEMORY_LIMIT = 10  # Keep last 10 conversations
 
 def load_memory():
-    if os.path.exists(MEMORY_PATH):
-        with open(MEMORY_PATH, "r") as f:
-            return json.load(f)
-    return []
-
-def save_memory(memory):
-    os.makedirs(os.path.dirname(MEMORY_PATH), exist_ok=True)
-    with open(MEMORY_PATH, "w") as f:
-        json.dump(memory[-10:], f, indent=2)  # Keep last 10 conversations
+    return recent_memory(MEMORY_LIMIT)
 
 def add_memory(entry):
-    memory = load_memory()
-    memory.append(entry)
-    save_memory(memory)
+    insert_memory(entry)
@@ -1,6 +1,9 @@
-import json
 import os
 
+# Parsed once per process, re-read only when the file changes
+from phase_04_mlops.serving.artifact_cache import load_json
+from phase_04_mlops.logging.prediction_store import tail_predictions
+
 BASE_DIR = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..")
 )
@@ -8,26 +11,22 @@ BASE_DIR = os.path.abspath(
 
 def get_model_metrics():
     path = os.path.join(BASE_DIR, "phase_06_evaluation", "evaluation_report.json")
-    if not os.path.exists(path):
+    metrics = load_json(path, default=None)
+    if metrics is None:
         return {"error": "metrics not found"}
-    with open(path) as f:
-        return json.load(f)
+    return metrics
 
 
 def get_drift_status():
     path = os.path.join(BASE_DIR, "phase_04_mlops", "drift", "training_stats.json")
-    if not os.path.exists(path):
+    stats = load_json(path, default=None)
+    if stats is None:
         return {"error": "drift stats not found"}
-    with open(path) as f:
-        return json.load(f)
+    return stats
 
 
 def get_recent_logs():
-    path = os.path.join(BASE_DIR, "phase_04_mlops", "logging", "prediction_logs.json")
-    if not os.path.exists(path):
-        return {"error": "logs not found"}
-    with open(path) as f:
-        return json.load(f)[-5:]
+    return tail_predictions(5)
 
 
 def load_evaluation_data():
@@ -36,10 +35,7 @@ def load_evaluation_data():
 
 def load_metrics_history():
     path = os.path.join(BASE_DIR, "phase_06_evaluation", "metrics_history.json")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)[-3:]
-    return []
+    return load_json(path, default=[])[-3:]
 
 
 def load_recent_logs():
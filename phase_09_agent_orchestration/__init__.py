@@ -7,8 +7,21 @@ Modules:
     - response_aggregator: Merges agent outputs into structured JSON
     - confidence_engine: Confidence scoring based on agent agreement
     - tools: Internal tool functions (metrics, logs, drift)
+
+run_orchestration is resolved lazily so that importing a light
+submodule (e.g. tools) does not load every agent phase.
 """
 
-from phase_09_agent_orchestration.orchestrator import run_orchestration
+import importlib
+
+_EXPORTS = {
+    "run_orchestration": "phase_09_agent_orchestration.orchestrator",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = ["run_orchestration"]
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
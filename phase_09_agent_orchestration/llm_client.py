@@ -3,9 +3,411 @@ Phase 9 — LLM Client (Infrastructure Adapter)
 
 Uses Ollama local LLM for reliable, token-free inference.
 No external API keys or quotas required.
+
+One shared asyncio client serves the summarizer, the phase 13
+planner and the phase 12 RAG engine:
+    - pooled keep-alive httpx session on a dedicated event-loop thread
+    - reachable Ollama host discovered once and cached (re-probed after
+      LLM_DISCOVERY_TTL seconds or a connection failure), instead of
+      paying a connect timeout on host.docker.internal every call
+    - per-call deadline covering queueing, discovery and generation
+    - at most LLM_MAX_CONCURRENCY generations in flight; a call whose
+      deadline passes while waiting for a slot raises LLMBusyError and,
+      being local saturation rather than a backend fault, does not
+      count against the circuit breaker
+    - circuit breaker: after LLM_BREAKER_FAILURES consecutive failures
+      calls fail fast for LLM_BREAKER_COOLDOWN seconds, then a single
+      trial call decides whether to close it again
+
+Sync callers use generate() / generate_summary(); async callers
+await agenerate() from any event loop. stream_generate() relays
+Ollama "stream": true tokens as they arrive.
 """
 
-import requests
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+
+import httpx
+
+OLLAMA_HOSTS = [
+    h.strip().rstrip("/")
+    for h in os.getenv(
+        "OLLAMA_HOSTS",
+        "http://host.docker.internal:11434,http://localhost:11434"
+    ).split(",")
+    if h.strip()
+]
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 30))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 2))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+LLM_DISCOVERY_TTL = float(os.getenv("LLM_DISCOVERY_TTL", 300))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 3))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", 30))
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when no LLM backend answered within the deadline."""
+
+
+class LLMBusyError(LLMUnavailableError):
+    """Raised when every LLM slot stayed busy until the deadline."""
+
+
+# ============================
+# Circuit breaker
+# ============================
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → half_open → closed."""
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, cooldown=LLM_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend right now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        """Caller went away mid-call: neither success nor failure."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def retry_in(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+
+# ============================
+# Shared client
+# ============================
+
+_loop = None
+_loop_lock = threading.Lock()
+
+_client = None
+_semaphore = None
+_host = {"url": None, "resolved_at": 0.0}
+
+BREAKER = CircuitBreaker()
+
+_stats = {
+    "calls": 0,
+    "successes": 0,
+    "failures": 0,
+    "fast_fails": 0,
+    "queue_timeouts": 0,
+    "discoveries": 0,
+    "in_flight": 0,
+    "latency_ms_total": 0.0,
+}
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the client's event-loop thread on first use."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def _get_client() -> httpx.AsyncClient:
+    # Only touched from the client loop, so no lock needed
+    global _client, _semaphore
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONCURRENCY * 2,
+                max_keepalive_connections=LLM_MAX_CONCURRENCY
+            ),
+        )
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _client
+
+
+async def _resolve_host(client: httpx.AsyncClient) -> str:
+    """Return the cached reachable Ollama base URL, probing hosts if stale."""
+    if _host["url"] and time.monotonic() - _host["resolved_at"] < LLM_DISCOVERY_TTL:
+        return _host["url"]
+
+    _stats["discoveries"] += 1
+    for base_url in OLLAMA_HOSTS:
+        try:
+            response = await client.get(f"{base_url}/api/tags", timeout=LLM_CONNECT_TIMEOUT)
+            if response.status_code < 500:
+                _host["url"] = base_url
+                _host["resolved_at"] = time.monotonic()
+                print(f"[LLM CLIENT] Using Ollama at {base_url}")
+                return base_url
+        except httpx.HTTPError:
+            continue
+
+    _host["url"] = None
+    raise LLMUnavailableError(f"no Ollama host reachable ({', '.join(OLLAMA_HOSTS)})")
+
+
+async def _acquire_slot(deadline: float) -> None:
+    """
+    Wait for a concurrency slot until the deadline.
+
+    Timing out here is local saturation, not a backend fault: the
+    breaker's half-open trial (if this call held it) is released and
+    the timeout is reported as queue_timeouts, not failures.
+    """
+    _get_client()
+    try:
+        await asyncio.wait_for(_semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        BREAKER.record_cancelled()
+        _stats["queue_timeouts"] += 1
+        raise LLMBusyError(f"all {LLM_MAX_CONCURRENCY} LLM slots busy until the deadline")
+    except asyncio.CancelledError:
+        BREAKER.record_cancelled()
+        raise
+
+
+async def _generate(prompt: str, model: str, deadline: float) -> str:
+    """One generation; the caller holds a concurrency slot."""
+    client = _get_client()
+
+    base_url = await _resolve_host(client)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise LLMUnavailableError("deadline exceeded during host discovery")
+
+    try:
+        response = await client.post(
+            f"{base_url}/api/generate",
+            json={
+                "model": model,
+                "prompt": prompt,
+                "stream": False
+            },
+            timeout=httpx.Timeout(remaining, connect=min(remaining, LLM_CONNECT_TIMEOUT)),
+        )
+        response.raise_for_status()
+    except httpx.TransportError:
+        # Host went away: re-discover on the next call
+        _host["url"] = None
+        raise
+
+    data = response.json()
+    return data.get("response", "LLM returned empty response")
+
+
+async def _guarded_generate(prompt: str, model: str, timeout: float) -> str:
+    """Breaker + deadline + stats around one generation (runs on the client loop)."""
+    _stats["calls"] += 1
+    if not BREAKER.allow():
+        _stats["fast_fails"] += 1
+        raise LLMUnavailableError(
+            f"circuit open after {BREAKER.failures} failures; retry in {BREAKER.retry_in():.0f}s"
+        )
+
+    started = time.monotonic()
+    deadline = started + timeout
+    _stats["in_flight"] += 1
+    try:
+        await _acquire_slot(deadline)
+        try:
+            text = await asyncio.wait_for(
+                _generate(prompt, model, deadline), max(0.001, deadline - time.monotonic())
+            )
+        except asyncio.CancelledError:
+            BREAKER.record_cancelled()
+            raise
+        except asyncio.TimeoutError:
+            BREAKER.record_failure()
+            _stats["failures"] += 1
+            raise LLMUnavailableError(f"LLM call exceeded {timeout:.0f}s deadline")
+        except Exception:
+            BREAKER.record_failure()
+            _stats["failures"] += 1
+            raise
+        finally:
+            _semaphore.release()
+    finally:
+        _stats["in_flight"] -= 1
+
+    BREAKER.record_success()
+    _stats["successes"] += 1
+    _stats["latency_ms_total"] += (time.monotonic() - started) * 1000
+    return text
+
+
+async def agenerate(prompt: str, model: str = None, timeout: float = None) -> str:
+    """
+    Generate text from any event loop.
+
+    Args:
+        prompt: Prompt string.
+        model: Ollama model name (defaults to OLLAMA_MODEL).
+        timeout: Overall deadline in seconds (defaults to LLM_TIMEOUT).
+
+    Returns:
+        Generated text.
+
+    Raises:
+        LLMUnavailableError / httpx.HTTPError when the backend fails.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _guarded_generate(prompt, model or OLLAMA_MODEL, timeout or LLM_TIMEOUT),
+        _get_loop()
+    )
+    return await asyncio.wrap_future(future)
+
+
+def generate(prompt: str, model: str = None, timeout: float = None) -> str:
+    """Blocking variant of agenerate() for thread-pool callers."""
+    timeout = timeout or LLM_TIMEOUT
+    future = asyncio.run_coroutine_threadsafe(
+        _guarded_generate(prompt, model or OLLAMA_MODEL, timeout),
+        _get_loop()
+    )
+    # The coroutine enforces the deadline; the grace only covers scheduling
+    return future.result(timeout + 1)
+
+
+async def _stream_into(prompt: str, model: str, timeout: float, emit) -> None:
+    """
+    Relay streamed tokens to emit(token) (runs on the client loop).
+
+    timeout bounds queueing, discovery and each read (so it is the
+    time-to-first-token and the longest allowed stall between tokens).
+    """
+    _stats["calls"] += 1
+    if not BREAKER.allow():
+        _stats["fast_fails"] += 1
+        raise LLMUnavailableError(
+            f"circuit open after {BREAKER.failures} failures; retry in {BREAKER.retry_in():.0f}s"
+        )
+
+    client = _get_client()
+    started = time.monotonic()
+    deadline = started + timeout
+    _stats["in_flight"] += 1
+    try:
+        await _acquire_slot(deadline)
+        try:
+            base_url = await asyncio.wait_for(_resolve_host(client), max(0.0, deadline - time.monotonic()))
+            remaining = max(0.001, deadline - time.monotonic())
+            try:
+                async with client.stream(
+                    "POST",
+                    f"{base_url}/api/generate",
+                    json={
+                        "model": model,
+                        "prompt": prompt,
+                        "stream": True
+                    },
+                    timeout=httpx.Timeout(remaining, connect=min(remaining, LLM_CONNECT_TIMEOUT)),
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("response"):
+                            emit(chunk["response"])
+                        if chunk.get("done"):
+                            break
+            except httpx.TransportError:
+                _host["url"] = None
+                raise
+        except asyncio.CancelledError:
+            BREAKER.record_cancelled()
+            raise
+        except asyncio.TimeoutError:
+            BREAKER.record_failure()
+            _stats["failures"] += 1
+            raise LLMUnavailableError(f"LLM stream exceeded {timeout:.0f}s deadline")
+        except Exception:
+            BREAKER.record_failure()
+            _stats["failures"] += 1
+            raise
+        finally:
+            _semaphore.release()
+    finally:
+        _stats["in_flight"] -= 1
+
+    BREAKER.record_success()
+    _stats["successes"] += 1
+    _stats["latency_ms_total"] += (time.monotonic() - started) * 1000
+
+
+_END = object()
+
+
+def stream_generate(prompt: str, model: str = None, timeout: float = None):
+    """
+    Yield generated tokens as Ollama streams them.
+
+    Closing the generator early (e.g. the HTTP client disconnected)
+    cancels the upstream request and frees its concurrency slot.
+
+    Raises:
+        LLMUnavailableError / httpx.HTTPError when the backend fails.
+    """
+    tokens = queue.Queue()
+
+    async def pump():
+        try:
+            await _stream_into(prompt, model or OLLAMA_MODEL, timeout or LLM_TIMEOUT, tokens.put)
+            tokens.put(_END)
+        except BaseException as e:
+            tokens.put(e)
+            raise
+
+    future = asyncio.run_coroutine_threadsafe(pump(), _get_loop())
+    try:
+        while True:
+            item = tokens.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        future.cancel()
 
 
 def generate_summary(prompt: str) -> str:
@@ -19,33 +421,20 @@ def generate_summary(prompt: str) -> str:
         LLM-generated response string.
     """
     try:
-        # Try Docker-internal host first
-        url = "http://host.docker.internal:11434/api/generate"
-        try:
-            response = requests.post(
-                url,
-                json={
-                    "model": "mistral",
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
-            )
-        except requests.exceptions.RequestException:
-            # Fallback to localhost for local testing
-            url = "http://localhost:11434/api/generate"
-            response = requests.post(
-                url,
-                json={
-                    "model": "mistral",
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
-            )
-
-        data = response.json()
-        return data.get("response", "LLM returned empty response")
-
+        return generate(prompt)
     except Exception as e:
         return f"LLM call failed: {str(e)}"
+
+
+def get_llm_stats() -> dict:
+    """Breaker state, resolved host and call counters for /health."""
+    successes = _stats["successes"]
+    return {
+        **_stats,
+        "latency_ms_total": round(_stats["latency_ms_total"], 3),
+        "avg_latency_ms": round(_stats["latency_ms_total"] / successes, 3) if successes else None,
+        "host": _host["url"],
+        "breaker_state": BREAKER.state,
+        "breaker_retry_in_seconds": round(BREAKER.retry_in(), 1),
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+    }
@@ -14,7 +14,6 @@ Central orchestrator that:
 Entry point: run_orchestration(plant_id, question)
 """
 
-import json
 import copy
 from datetime import datetime
 
@@ -22,7 +21,8 @@ from datetime import datetime
 from phase_09_agent_orchestration.intent_classifier import classify_intent
 from phase_09_agent_orchestration.confidence_engine import compute_confidence
 from phase_09_agent_orchestration.response_aggregator import aggregate_responses
-from phase_09_agent_orchestration.llm_client import generate_summary
+from phase_09_agent_orchestration.llm_client import generate_summary, stream_generate
+from phase_09_agent_orchestration.prompt_builder import Section, build_prompt
 from phase_09_agent_orchestration.tools import (
     get_model_metrics,
     get_recent_logs,
@@ -66,21 +66,48 @@ AGENT_REGISTRY = {
 }
 
 
-def run_orchestration(plant_id: int, question: str, override_metrics=None) -> dict:
+def _summary_events(prompt: str, stream: bool):
     """
-    Full orchestration pipeline. This is the only function
-    the FastAPI endpoint needs to call.
+    Generate the LLM summary, optionally relaying streamed tokens.
+
+    Yields:
+        ("token", {"text"}) per streamed token and ("summary_error",
+        {"error"}) if the stream fails (streaming mode only).
+
+    Returns:
+        The full summary text.
+    """
+    if not stream:
+        return generate_summary(prompt)
+
+    parts = []
+    try:
+        for token in stream_generate(prompt):
+            parts.append(token)
+            yield "token", {"text": token}
+    except Exception as e:
+        yield "summary_error", {"error": str(e)}
+        if not parts:
+            return f"LLM call failed: {str(e)}"
+    return "".join(parts)
+
+
+def iter_orchestration(plant_id: int, question: str, stream_summary: bool = False):
+    """
+    Orchestration pipeline as a sequence of progress events, so the
+    streaming /ask-ai variant can forward each stage as it completes.
 
     Args:
         plant_id: The solar plant identifier.
         question: User's natural language question.
-        override_metrics: Optional dict of simulated metrics
-            from Phase 10 simulation engine. When provided,
-            these replace the real metrics from tools.
+        stream_summary: Relay the summary as "token" events instead
+            of one blocking LLM call.
 
-    Returns:
-        Structured JSON with agent outputs, confidence,
-        executive summary, and LLM-generated explanation.
+    Yields:
+        (event, data) pairs: "routing", then either "historical"
+        (knowledge lookup) or "plan" / "tool_result" per step /
+        "alert", then summary "token"s, and finally "done" with the
+        full response run_orchestration() returns.
     """
 
     started_at = datetime.utcnow().isoformat()
@@ -89,7 +116,7 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
     # STEP 1 — Classify Intent
     # ============================
     intent_info = classify_intent(question)
-    selected_agents = intent_info["selected_agents"]
+    yield "routing", intent_info
 
     # ============================
     # FAST PATH — Knowledge Lookup (Historical Queries)
@@ -99,14 +126,17 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
 
         # Generate LLM summary from historical data
         hist_data = hist_result.get("historical_analysis", {})
-        summary_prompt = (
-            f"Question: {question}\n\n"
-            f"Historical Alert Data: {json.dumps(hist_data.get('matching_alerts', []), indent=2)}\n"
-            f"Alert Statistics: {json.dumps(hist_data.get('alert_statistics', {}), indent=2)}\n"
-            f"RAG Context: {hist_data.get('rag_context', 'None')}\n\n"
-            f"Provide a precise answer based ONLY on the historical data above."
-        )
-        ai_summary = generate_summary(summary_prompt)
+        yield "historical", hist_data
+
+        # Alerts are newest-first, so truncation drops the oldest
+        summary_prompt, prompt_report = build_prompt("historical", [
+            Section("Question", question),
+            Section("Historical Alert Data", hist_data.get("matching_alerts", []), priority=2),
+            Section("Alert Statistics", hist_data.get("alert_statistics", {}), priority=3),
+            Section("RAG Context", hist_data.get("rag_context") or "None", priority=1),
+            Section("", "Provide a precise answer based ONLY on the historical data above."),
+        ])
+        ai_summary = yield from _summary_events(summary_prompt, stream_summary)
 
         # Store memory
         add_memory({
@@ -119,7 +149,7 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
             "timestamp": started_at
         })
 
-        return {
+        yield "done", {
             "routing": intent_info,
             "executive_summary": hist_data.get("executive_summary", ""),
             "historical_data": hist_data.get("matching_alerts", []),
@@ -131,27 +161,35 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
                 "agents_used": ["memory_agent"],
                 "started_at": started_at,
                 "completed_at": datetime.utcnow().isoformat(),
+                "prompt": prompt_report,
             }
         }
+        return
 
     # ============================
     # STEP 2 — Phase 13 Dynamic Orchestration
     # ============================
     # Delegate to LLM Planner for all reasoning tasks
-    from phase_13_tool_calling.tool_router import run_dynamic_orchestration
-    
-    dynamic_result = run_dynamic_orchestration(question, plant_id)
-    
+    from phase_13_tool_calling.tool_router import (
+        iter_dynamic_orchestration,
+        build_summary_prompt
+    )
+
+    for event, data in iter_dynamic_orchestration(question, plant_id):
+        if event == "tools_done":
+            dynamic_state = data
+        else:
+            yield event, data
+
     # ============================
     # STEP 3 — Wrap & Format Output
     # ============================
     # We must adapt Phase 13 output to match existing API schema
     
     # Extract data from dynamic result
-    tool_results = dynamic_result.get("tool_results", {})
-    plan = dynamic_result.get("plan", {})
-    final_answer = dynamic_result.get("final_answer", "")
-    metadata = dynamic_result.get("metadata", {})
+    tool_results = dynamic_state["tool_results"]
+    plan = dynamic_state["plan"]
+    tools_used = [s["tool"] for s in dynamic_state["steps"]]
     
     # Map to legacy structure
     response = {
@@ -159,7 +197,7 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
         "question": question,
         "final_decision": "Analysis Complete", # Placeholder
         "priority": "P2", # Default, needs real logic if alert not triggered
-        "executive_summary": final_answer,
+        "executive_summary": "",
         "agent_outputs": tool_results,
         "confidence": {
             "score": 1.0, # Phase 13 assumes high confidence if plan succeeds
@@ -167,10 +205,10 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
             "breakdown": ["Dynamic planning successful"]
         },
         "orchestration_metadata": {
-            "selected_agents": metadata.get("tools_used", []),
+            "selected_agents": tools_used,
             "routing_type": "dynamic_planner",
-            "started_at": metadata.get("started_at"),
-            "completed_at": metadata.get("completed_at"),
+            "started_at": dynamic_state["started_at"],
+            "completed_at": None,
             "plan": plan
         }
     }
@@ -178,12 +216,13 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
     # ============================
     # STEP 4 — Phase 11 Alert Evaluation
     # ============================
-    # Re-evaluate alerts based on the tool outputs
+    # Re-evaluate alerts based on the tool outputs (severity rules do
+    # not read the summary, so the decision is known before it streams)
     
     eval_context = copy.deepcopy(response)
     
     # Use metrics from the shared_state (which correctly contains mutated simulation data!)
-    shared_state = dynamic_result.get("shared_state", {})
+    shared_state = dynamic_state["shared_state"]
     eval_context["metrics"] = shared_state.get("metrics", {})
     eval_context["simulation_overrides"] = shared_state.get("overrides_applied", {})
 
@@ -197,8 +236,23 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
     else:
         response["final_decision"] = "System Nominal"
 
+    yield "alert", {
+        **alert_info,
+        "final_decision": response["final_decision"],
+        "priority": response["priority"]
+    }
+
+    # ============================
+    # STEP 5 — LLM Summary
     # ============================
-    # STEP 5 — Store Memory
+    summary_prompt, prompt_report = build_summary_prompt(question, dynamic_state["steps"], tool_results)
+    final_answer = yield from _summary_events(summary_prompt, stream_summary)
+    response["executive_summary"] = final_answer
+    response["orchestration_metadata"]["completed_at"] = datetime.utcnow().isoformat()
+    response["orchestration_metadata"]["prompt"] = prompt_report
+
+    # ============================
+    # STEP 6 — Store Memory
     # ============================
     risk_level = "LOW" # Default
     if "risk_assessment" in tool_results:
@@ -209,10 +263,30 @@ def run_orchestration(plant_id: int, question: str, override_metrics=None) -> di
         "question": question,
         "response": final_answer,
         "risk_level": risk_level,
-        "agents_used": metadata.get("tools_used", []),
+        "agents_used": tools_used,
         "confidence": 1.0,
         "timestamp": started_at
     })
 
-    return response
+    yield "done", response
+
+
+def run_orchestration(plant_id: int, question: str, override_metrics=None) -> dict:
+    """
+    Full orchestration pipeline. This is the only function
+    the FastAPI endpoint needs to call.
+
+    Args:
+        plant_id: The solar plant identifier.
+        question: User's natural language question.
+        override_metrics: Optional dict of simulated metrics
+            from Phase 10 simulation engine. When provided,
+            these replace the real metrics from tools.
 
+    Returns:
+        Structured JSON with agent outputs, confidence,
+        executive summary, and LLM-generated explanation.
+    """
+    for event, data in iter_orchestration(plant_id, question):
+        if event == "done":
+            return data
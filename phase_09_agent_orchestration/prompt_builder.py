@@ -0,0 +1,223 @@
+"""
+Phase 9 — Prompt Builder
+
+Assembles LLM prompts from prioritized sections under a token
+budget. Local Ollama latency grows with prompt length, so payloads
+are serialized as compact JSON (no indentation, floats rounded to
+FLOAT_DECIMALS places, empty fields, tracebacks and the full metrics
+copy inside simulation_result dropped), and when the prompt still
+exceeds PROMPT_TOKEN_BUDGET the lowest-priority sections are shortened
+first: lists lose their trailing items, text is cut, and a section
+that cannot fit is omitted. Required sections (question,
+instructions) are never touched.
+
+Tokens are estimated as characters / PROMPT_CHARS_PER_TOKEN; no
+tokenizer is loaded. Every prompt's size is returned with it and
+aggregated per prompt kind for /health.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 1500))
+CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", 4))
+FLOAT_DECIMALS = 4
+
+REQUIRED = None  # priority of sections that are never truncated
+
+# Nested fields that repeat data the summary already has
+_DROP_KEYS = {"traceback"}
+# simulation_result.metrics is a full evaluation report copy;
+# only its core metric values matter to the summary
+_KEEP_SIMULATION_METRICS = ("r2", "rmse", "mape", "mae")
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+@dataclass
+class Section:
+    """One labelled block of a prompt. Higher priority is kept longer."""
+    label: str
+    content: Any
+    priority: Any = REQUIRED
+
+
+# ============================
+# Serialization
+# ============================
+
+def _round(value: float) -> float:
+    # Fixed decimals, not significant digits: 123456.78 kWh must stay 123456.78
+    return round(value, FLOAT_DECIMALS)
+
+
+def prune(value):
+    """Drop empty values and redundant fields, round floats."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            if key in _DROP_KEYS:
+                continue
+            if key == "simulation_result" and isinstance(item, dict):
+                item = _prune_simulation(item)
+            item = prune(item)
+            if item in (None, "", [], {}):
+                continue
+            pruned[key] = item
+        return pruned
+    if isinstance(value, (list, tuple)):
+        return [prune(item) for item in value]
+    if isinstance(value, float):
+        return _round(value)
+    return value
+
+
+def _prune_simulation(result: dict) -> dict:
+    metrics = result.get("metrics", {})
+    core = metrics.get("metrics", metrics) if isinstance(metrics, dict) else {}
+    core = {k: core[k] for k in _KEEP_SIMULATION_METRICS if k in core}
+    return {k: core if k == "metrics" else v for k, v in result.items()}
+
+
+def compact_json(value) -> str:
+    """Compact JSON of the pruned value."""
+    return json.dumps(prune(value), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN + 0.999)
+
+
+# ============================
+# Budgeting
+# ============================
+
+def _render(content) -> str:
+    return content if isinstance(content, str) else compact_json(content)
+
+
+def _line(label: str, body: str) -> str:
+    return f"{label}: {body}\n" if label else f"{body}\n"
+
+
+def _shrink(content, max_tokens: int):
+    """
+    Shorten a section body to at most max_tokens, or None to omit it.
+    Lists keep their leading items (callers order them by relevance).
+    """
+    if max_tokens <= 0:
+        return None
+    if isinstance(content, (list, tuple)):
+        items = list(prune(content))
+        kept = []
+        for item in items:
+            candidate = kept + [item]
+            marker = [f"... {len(items) - len(candidate)} more omitted"] if len(candidate) < len(items) else []
+            if estimate_tokens(compact_json(candidate + marker)) > max_tokens:
+                break
+            kept = candidate
+        if not kept:
+            return None
+        omitted = len(items) - len(kept)
+        return compact_json(kept + ([f"... {omitted} more omitted"] if omitted else []))
+
+    text = _render(content)
+    limit = int(max_tokens * CHARS_PER_TOKEN) - len(" ...[truncated]")
+    if limit <= 0:
+        return None
+    return text[:limit] + " ...[truncated]"
+
+
+def build_prompt(kind: str, sections: list, budget: int = None) -> tuple:
+    """
+    Assemble a prompt from sections within a token budget.
+
+    Args:
+        kind: Prompt name for reporting ("summary", "historical", ...).
+        sections: Section list, in prompt order.
+        budget: Token budget (defaults to PROMPT_TOKEN_BUDGET).
+
+    Returns:
+        (prompt, report): report has tokens, budget, chars, per-section
+        tokens and the labels of truncated / omitted sections.
+    """
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    bodies = [_render(s.content) for s in sections]
+    sizes = [estimate_tokens(_line(s.label, b)) for s, b in zip(sections, bodies)]
+    over = sum(sizes) - budget
+
+    truncated, omitted = [], []
+    order = sorted(
+        (i for i, s in enumerate(sections) if s.priority is not REQUIRED),
+        key=lambda i: sections[i].priority,
+    )
+    for i in order:
+        if over <= 0:
+            break
+        header = estimate_tokens(_line(sections[i].label, ""))
+        shrunk = _shrink(sections[i].content, sizes[i] - over - header)
+        if shrunk is None:
+            bodies[i] = None
+            omitted.append(sections[i].label)
+            new_size = 0
+        else:
+            bodies[i] = shrunk
+            truncated.append(sections[i].label)
+            new_size = estimate_tokens(_line(sections[i].label, shrunk))
+        over -= sizes[i] - new_size
+        sizes[i] = new_size
+
+    prompt = "".join(_line(s.label, b) for s, b in zip(sections, bodies) if b is not None)
+    report = {
+        "kind": kind,
+        "tokens": estimate_tokens(prompt),
+        "budget": budget,
+        "chars": len(prompt),
+        "sections": {s.label or "text": n for s, n in zip(sections, sizes)},
+        "truncated": truncated,
+        "omitted": omitted,
+    }
+    _record(report)
+    return prompt, report
+
+
+def measure_prompt(kind: str, prompt: str) -> dict:
+    """Report size of a prompt assembled elsewhere (e.g. the planner)."""
+    report = {
+        "kind": kind,
+        "tokens": estimate_tokens(prompt),
+        "budget": None,
+        "chars": len(prompt),
+        "sections": {},
+        "truncated": [],
+        "omitted": [],
+    }
+    _record(report)
+    return report
+
+
+def _record(report: dict) -> None:
+    with _stats_lock:
+        kind = _stats.setdefault(report["kind"], {
+            "prompts": 0, "tokens_total": 0, "tokens_max": 0, "truncated": 0
+        })
+        kind["prompts"] += 1
+        kind["tokens_total"] += report["tokens"]
+        kind["tokens_max"] = max(kind["tokens_max"], report["tokens"])
+        kind["truncated"] += bool(report["truncated"] or report["omitted"])
+
+
+def get_prompt_stats() -> dict:
+    """Per-kind prompt counts and sizes for /health."""
+    with _stats_lock:
+        return {
+            "budget": PROMPT_TOKEN_BUDGET,
+            "kinds": {
+                kind: {**s, "tokens_avg": round(s["tokens_total"] / s["prompts"], 1)}
+                for kind, s in _stats.items()
+            },
+        }
@@ -1,24 +1,21 @@
-import json
 import os
 
+from phase_04_mlops.logging.prediction_store import tail_predictions
+from phase_04_mlops.serving.artifact_cache import load_json
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
 
 def get_model_metrics():
     path = os.path.join(BASE_DIR, "phase_06_evaluation", "evaluation_report.json")
-    if not os.path.exists(path):
+    metrics = load_json(path, default=None)
+    if metrics is None:
         return {"error": "Metrics not found"}
-    with open(path, "r") as f:
-        return json.load(f)
+    return metrics
 
 
 def get_recent_logs(limit=5):
-    path = os.path.join(BASE_DIR, "phase_04_mlops", "logging", "prediction_logs.json")
-    if not os.path.exists(path):
-        return {"error": "Logs not found"}
-    with open(path, "r") as f:
-        logs = json.load(f)
-    return logs[-limit:]
+    return tail_predictions(limit)
 
 
 def get_drift_status():
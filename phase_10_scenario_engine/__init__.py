@@ -5,7 +5,7 @@ Production-ready simulation engine for hypothetical reasoning:
     detect_scenario         — Detect what-if questions, extract overrides
     apply_metric_overrides  — Override real metrics with simulated values
     recalculate_risk        — Recalculate risk/priority from modified metrics
-    log_simulation          — Log simulation events to simulation_logs.json
+    log_simulation          — Log simulation events to the operational store
 """
 
 from phase_10_scenario_engine.scenario_detector import detect_scenario
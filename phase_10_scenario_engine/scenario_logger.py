@@ -1,23 +1,20 @@
 """
 Phase 10 — Scenario Logger
 
-Logs all simulation runs to simulation_logs.json
-with timestamps and full scenario details.
+Logs all simulation runs to the operational store
+(simulations table) with timestamps and full scenario details.
 
-No global state. Append-only logging.
+Append-only logging.
 """
 
-import os
-import json
 from datetime import datetime
 
-LOG_DIR = os.path.dirname(__file__)
-LOG_FILE = os.path.join(LOG_DIR, "simulation_logs.json")
+from phase_04_mlops.storage.ops_store import insert_simulation
 
 
 def log_simulation(event: dict) -> None:
     """
-    Append a simulation event to simulation_logs.json.
+    Append a simulation event to the operational store.
 
     Args:
         event: dict containing simulation details:
@@ -30,16 +27,4 @@ def log_simulation(event: dict) -> None:
         "event": event
     }
 
-    # Load existing logs or start fresh
-    logs = []
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, "r") as f:
-                logs = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            logs = []
-
-    logs.append(record)
-
-    with open(LOG_FILE, "w") as f:
-        json.dump(logs, f, indent=2)
+    insert_simulation(record)
@@ -5,7 +5,7 @@ Production-grade alerting for AI-powered renewable energy platform.
 
     evaluate_alert      — Main entry: evaluate orchestration result and trigger alerts
     determine_severity  — Determine P0/P1/P2 severity from results
-    log_alert           — Append alert record to alerts.json
+    log_alert           — Append alert record to the operational store
     Alert               — Alert data model
 """
 
@@ -1,21 +1,19 @@
 """
 Phase 11 — Alert Logger
 
-Appends alert records to alerts.json.
-Thread-safe, append-only, with exception handling.
+Appends alert records to the operational store (alerts table,
+source "alerting"). Concurrency-safe, append-only, with exception
+handling. alerts.json is only read once, by the store migration.
 """
 
-import os
-import json
 from datetime import datetime
 
-LOG_DIR = os.path.dirname(__file__)
-ALERT_LOG_PATH = os.path.join(LOG_DIR, "alerts.json")
+from phase_04_mlops.storage.ops_store import insert_alert
 
 
 def log_alert(alert_data: dict) -> None:
     """
-    Append an alert record to alerts.json.
+    Append an alert record to the operational store.
 
     Args:
         alert_data: Alert dict to log.
@@ -26,19 +24,7 @@ def log_alert(alert_data: dict) -> None:
     }
 
     try:
-        alerts = []
-        if os.path.exists(ALERT_LOG_PATH):
-            try:
-                with open(ALERT_LOG_PATH, "r") as f:
-                    alerts = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                alerts = []
-
-        alerts.append(record)
-
-        with open(ALERT_LOG_PATH, "w") as f:
-            json.dump(alerts, f, indent=2)
-
+        insert_alert(record, source="alerting")
     except Exception as e:
         # Never crash the pipeline for a logging failure
         print(f"[ALERT LOGGER ERROR] Failed to log alert: {e}")
@@ -3,18 +3,26 @@ Phase 12 — Production Vector RAG System
 
 Persistent ChromaDB vector store with semantic retrieval
 for contextual LLM augmentation.
+
+Exports are resolved lazily so that importing a light submodule
+(e.g. readiness) does not load chromadb or sentence-transformers.
 """
 
-from phase_12_vector_rag.ingestion_pipeline import run_full_ingestion, ingest_single_document
-from phase_12_vector_rag.rag_engine import run_rag, ask_with_rag
-from phase_12_vector_rag.retriever import retrieve_relevant_documents
-from phase_12_vector_rag.vector_store import get_stats
+import importlib
+
+_EXPORTS = {
+    "run_full_ingestion": "phase_12_vector_rag.ingestion_pipeline",
+    "ingest_single_document": "phase_12_vector_rag.ingestion_pipeline",
+    "run_rag": "phase_12_vector_rag.rag_engine",
+    "ask_with_rag": "phase_12_vector_rag.rag_engine",
+    "retrieve_relevant_documents": "phase_12_vector_rag.retriever",
+    "get_stats": "phase_12_vector_rag.vector_store",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    "run_full_ingestion",
-    "ingest_single_document",
-    "run_rag",
-    "ask_with_rag",
-    "retrieve_relevant_documents",
-    "get_stats",
-]
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,302 @@
+"""
+Phase 12 — Bulk Ingestion Pipeline
+
+Staged, streaming pipeline used by run_full_ingestion and backfills:
+
+    readers ──▶ [embed queue] ──▶ embedding workers ──▶ [write queue] ──▶ writer
+    (one thread,                  (BULK_WORKERS                          (caller's thread,
+     micro-batches of              threads: drop stored IDs,              bulk add_documents
+     BULK_BATCH_SIZE docs)         embed via the cache)                   of BULK_WRITE_SIZE)
+
+Sources are iterators of documents, so nothing is read ahead of the
+pipeline. Both queues are bounded (BULK_QUEUE_DEPTH batches): when
+embedding or writing falls behind, the stage feeding it blocks, so
+memory stays flat however large the backfill is. Workers overlap
+tokenization, store lookups and model calls; the model backends
+release the GIL while computing.
+
+Progress (documents read / skipped / embedded / written per source,
+throughput, queue depths) is logged every BULK_PROGRESS_SECONDS and
+passed to an optional callback. The first exception in any stage
+stops the pipeline and is re-raised to the caller.
+"""
+
+import os
+import queue
+import threading
+import time
+
+from phase_12_vector_rag.utils import log_rag
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 64))
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", 2))
+BULK_WRITE_SIZE = int(os.getenv("BULK_WRITE_SIZE", 512))
+BULK_QUEUE_DEPTH = int(os.getenv("BULK_QUEUE_DEPTH", 4))
+BULK_PROGRESS_SECONDS = float(os.getenv("BULK_PROGRESS_SECONDS", 5))
+
+_POLL_SECONDS = 0.1
+
+
+class _Stopped(Exception):
+    """Raised inside a stage when another stage failed."""
+
+
+class BulkIngestion:
+    """
+    One pipeline run.
+
+    Args:
+        existing: Callable(ids) -> set of IDs already stored.
+        embed: Callable(contents) -> list of vectors.
+        write: Callable(ids, contents, embeddings, metadatas) -> rows
+            actually added (IDs stored concurrently are not counted).
+        batch_size: Documents per embedding micro-batch.
+        workers: Embedding worker threads.
+        write_size: Documents per bulk write.
+        queue_depth: Batches buffered between stages.
+        on_progress: Optional callback(report) at each progress tick.
+        on_source_done: Optional callback(source, written) when a
+            source's last document has been written.
+    """
+
+    def __init__(self, existing, embed, write, batch_size: int = BULK_BATCH_SIZE,
+                 workers: int = BULK_WORKERS, write_size: int = BULK_WRITE_SIZE,
+                 queue_depth: int = BULK_QUEUE_DEPTH, on_progress=None, on_source_done=None,
+                 progress_seconds: float = BULK_PROGRESS_SECONDS):
+        self.existing = existing
+        self.embed = embed
+        self.write = write
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.write_size = write_size
+        self.on_progress = on_progress
+        self.on_source_done = on_source_done
+        self.progress_seconds = progress_seconds
+
+        self._embed_q = queue.Queue(maxsize=queue_depth)
+        self._write_q = queue.Queue(maxsize=queue_depth)
+        self._stop = threading.Event()
+        self._errors = []
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._max_queued = {"embed": 0, "write": 0}
+        self._started = None
+
+    # ============================
+    # Queue helpers
+    # ============================
+
+    def _put(self, q: queue.Queue, item) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _fail(self, error: Exception) -> None:
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    def _count(self, source: str, field: str, n: int) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(source, {"read": 0, "skipped": 0, "embedded": 0, "written": 0})
+            counts[field] += n
+
+    # ============================
+    # Stages
+    # ============================
+
+    def _read(self, sources: dict) -> None:
+        try:
+            for source, documents in sources.items():
+                self._count(source, "read", 0)
+                batches = 0
+                batch = []
+                for doc in documents:
+                    batch.append(doc)
+                    if len(batch) >= self.batch_size:
+                        self._count(source, "read", len(batch))
+                        self._put(self._embed_q, (source, batch))
+                        batches += 1
+                        batch = []
+                if batch:
+                    self._count(source, "read", len(batch))
+                    self._put(self._embed_q, (source, batch))
+                    batches += 1
+                # Tells the writer how many batches complete this source
+                self._put(self._write_q, ("source_end", source, batches))
+        except _Stopped:
+            return
+        except Exception as e:
+            self._fail(e)
+            return
+        try:
+            for _ in range(self.workers):
+                self._put(self._embed_q, None)
+        except _Stopped:
+            pass
+
+    def _embed_loop(self) -> None:
+        try:
+            while True:
+                item = self._get(self._embed_q)
+                if item is None:
+                    self._put(self._write_q, None)
+                    return
+                source, docs = item
+                present = self.existing([doc.doc_id for doc in docs])
+                unique = {}
+                for doc in docs:
+                    if doc.doc_id not in present:
+                        unique.setdefault(doc.doc_id, doc)
+                self._count(source, "skipped", len(docs) - len(unique))
+                ids = list(unique)
+                contents = [doc.content for doc in unique.values()]
+                metadatas = [doc.to_document()["metadata"] for doc in unique.values()]
+                embeddings = self.embed(contents) if contents else []
+                self._count(source, "embedded", len(contents))
+                self._put(self._write_q, ("batch", source, (ids, contents, embeddings, metadatas)))
+        except _Stopped:
+            return
+        except Exception as e:
+            self._fail(e)
+
+    def _flush(self, buffer: dict) -> None:
+        """Bulk-write buffered rows; buffer maps doc_id -> (source, content, embedding, metadata)."""
+        if not buffer:
+            return
+        # The same document can reach two flushes through different batches
+        for doc_id in self.existing(list(buffer)):
+            self._count(buffer.pop(doc_id)[0], "skipped", 1)
+        by_source = {}
+        for doc_id, (source, *row) in buffer.items():
+            by_source.setdefault(source, []).append((doc_id, *row))
+        # One write per source (usually just one), so the count write()
+        # reports — rows a concurrent ingest stored first are left out —
+        # can be attributed exactly
+        for source, rows in by_source.items():
+            added = self.write(*(list(column) for column in zip(*rows)))
+            self._count(source, "written", added)
+            self._count(source, "skipped", len(rows) - added)
+        buffer.clear()
+
+    def run(self, sources: dict) -> dict:
+        """
+        Run all sources through the pipeline.
+
+        Args:
+            sources: Ordered dict of source name -> iterable of documents.
+
+        Returns:
+            Report dict (see report()).
+        """
+        self._started = time.perf_counter()
+        reader = threading.Thread(target=self._read, args=(sources,), name="bulk-reader", daemon=True)
+        workers = [
+            threading.Thread(target=self._embed_loop, name=f"bulk-embed-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        reader.start()
+        for worker in workers:
+            worker.start()
+
+        buffer = {}
+        expected, processed, done = {}, {}, set()
+        finished_workers = 0
+        next_progress = time.perf_counter() + self.progress_seconds
+        try:
+            while finished_workers < self.workers:
+                item = self._get(self._write_q)
+                with self._lock:
+                    self._max_queued["embed"] = max(self._max_queued["embed"], self._embed_q.qsize())
+                    self._max_queued["write"] = max(self._max_queued["write"], self._write_q.qsize())
+                if item is None:
+                    finished_workers += 1
+                elif item[0] == "source_end":
+                    expected[item[1]] = item[2]
+                else:
+                    _, source, (ids, contents, embeddings, metadatas) = item
+                    for row in zip(ids, contents, embeddings, metadatas):
+                        if row[0] in buffer:
+                            self._count(source, "skipped", 1)
+                        else:
+                            buffer[row[0]] = (source, *row[1:])
+                    processed[source] = processed.get(source, 0) + 1
+                    if len(buffer) >= self.write_size:
+                        self._flush(buffer)
+
+                for source, total in expected.items():
+                    if source not in done and processed.get(source, 0) == total:
+                        self._flush(buffer)
+                        done.add(source)
+                        if self.on_source_done:
+                            self.on_source_done(source, self.report()["sources"][source]["written"])
+
+                if time.perf_counter() >= next_progress:
+                    self._progress()
+                    next_progress = time.perf_counter() + self.progress_seconds
+            self._flush(buffer)
+        except _Stopped:
+            pass
+        except Exception as e:
+            self._fail(e)
+        finally:
+            reader.join()
+            for worker in workers:
+                worker.join()
+
+        if self._errors:
+            raise self._errors[0]
+        report = self.report()
+        self._progress(report)
+        return report
+
+    # ============================
+    # Reporting
+    # ============================
+
+    def report(self) -> dict:
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        with self._lock:
+            sources = {name: dict(c) for name, c in self._counts.items()}
+            max_queued = dict(self._max_queued)
+        totals = {
+            field: sum(c[field] for c in sources.values())
+            for field in ("read", "skipped", "embedded", "written")
+        }
+        return {
+            "sources": sources,
+            "totals": totals,
+            "elapsed_seconds": round(elapsed, 3),
+            "read_per_second": round(totals["read"] / elapsed, 1) if elapsed else 0.0,
+            "embedded_per_second": round(totals["embedded"] / elapsed, 1) if elapsed else 0.0,
+            "queued": {"embed": self._embed_q.qsize(), "write": self._write_q.qsize()},
+            "max_queued": max_queued,
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+        }
+
+    def _progress(self, report: dict = None) -> None:
+        report = report or self.report()
+        totals = report["totals"]
+        log_rag(
+            f"Bulk ingestion: read {totals['read']}, skipped {totals['skipped']}, "
+            f"embedded {totals['embedded']}, written {totals['written']} "
+            f"in {report['elapsed_seconds']}s ({report['read_per_second']} docs/s, "
+            f"{report['embedded_per_second']} embedded/s)"
+        )
+        if self.on_progress:
+            self.on_progress(report)
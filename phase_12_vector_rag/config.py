@@ -13,10 +13,30 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 EMBEDDING_DIMENSION = 384
 
+# Embedding backend: "torch" (sentence-transformers) or "onnx" (int8 ONNX Runtime)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_DIR = os.getenv(
+    "EMBEDDING_ONNX_DIR", os.path.join(BASE_DIR, "models", "embeddings", "all-MiniLM-L6-v2-onnx")
+)
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", 0))  # 0 = CPUs available to the process
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", 32))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", 2))
+EMBEDDING_LENGTH_BUCKET = int(os.getenv("EMBEDDING_LENGTH_BUCKET", 16))
+EMBEDDING_MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2 max_seq_length
+
+# Persistent document-embedding cache (content-hash keyed, memory-mapped)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "data", "embedding_cache"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") != "0"
+
 # ChromaDB
 CHROMA_PERSIST_DIR = os.path.join(BASE_DIR, "data", "vector_store")
 CHROMA_COLLECTION_NAME = "solarops_memory"
 
+# Vector backend: "chroma" or "numpy" (memory-mapped exact index)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(BASE_DIR, "data", "vector_index"))
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float32")  # or float16
+
 # Retrieval
 DEFAULT_TOP_K = 5
 SIMILARITY_THRESHOLD = 1.5  # L2 distance — lower is more similar
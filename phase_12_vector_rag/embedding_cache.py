@@ -0,0 +1,172 @@
+"""
+Phase 12 — Embedding Cache
+
+Persistent content-hash keyed cache of document embeddings, so that
+re-ingesting, rebuilding or re-sharding the Chroma collection does
+not need the embedding model for text it has already embedded.
+
+One append-only file per model, EMBEDDING_CACHE_DIR/<model>-<dim>.emb,
+of fixed-size records: a 16-byte SHA-256 prefix of the text followed
+by the float32 vector. The file is memory-mapped for reads, so the
+process only holds the key -> row map; vectors stay in the page
+cache. New records are appended with a single write per batch, and
+rows appended by other processes are indexed when a lookup misses.
+A torn trailing record (crash mid-write) is truncated on open.
+"""
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from phase_12_vector_rag.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_DIMENSION,
+    EMBEDDING_MODEL_NAME,
+)
+from phase_12_vector_rag.utils import log_rag
+
+KEY_BYTES = 16
+
+
+def content_key(text: str) -> bytes:
+    """Cache key of a text: leading bytes of its SHA-256 digest."""
+    return hashlib.sha256(text.encode("utf-8")).digest()[:KEY_BYTES]
+
+
+class EmbeddingCache:
+    def __init__(self, directory: str = EMBEDDING_CACHE_DIR,
+                 model_name: str = EMBEDDING_MODEL_NAME, dim: int = EMBEDDING_DIMENSION):
+        self.dim = dim
+        self.dtype = np.dtype([("key", f"V{KEY_BYTES}"), ("vec", "<f4", (dim,))])
+        os.makedirs(directory, exist_ok=True)
+        safe_name = model_name.replace("/", "_")
+        self.path = os.path.join(directory, f"{safe_name}-{dim}.emb")
+        self._lock = threading.Lock()
+        self._rows = {}  # key -> row
+        self._synced = 0  # file rows indexed; > len(_rows) once another process duplicated a key
+        self._mm = None
+        self._stats = {"hits": 0, "misses": 0, "stored": 0}
+        self._open()
+
+    def _open(self) -> None:
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+        size = os.path.getsize(self.path)
+        torn = size % self.dtype.itemsize
+        if torn:
+            log_rag(f"Embedding cache: dropping {torn} bytes of a partial record")
+            with open(self.path, "r+b") as f:
+                f.truncate(size - torn)
+        self._sync()
+
+    def _sync(self) -> None:
+        """Map the file and index rows written since the last sync."""
+        count = os.path.getsize(self.path) // self.dtype.itemsize
+        if count == self._synced and self._mm is not None:
+            return
+        self._mm = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(count,)) if count else None
+        for row in range(self._synced, count):
+            self._rows.setdefault(self._mm["key"][row].tobytes(), row)
+        self._synced = count
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, texts: list) -> list:
+        """Cached vectors (float32 arrays) for texts; None where missing."""
+        keys = [content_key(t) for t in texts]
+        with self._lock:
+            if any(k not in self._rows for k in keys):
+                self._sync()
+            found = [self._rows.get(k) for k in keys]
+            vectors = [None if row is None else np.array(self._mm["vec"][row]) for row in found]
+            hits = sum(row is not None for row in found)
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(keys) - hits
+        return vectors
+
+    def put_many(self, texts: list, vectors) -> int:
+        """Append vectors for texts not already cached. Returns rows written."""
+        records = np.zeros(len(texts), dtype=self.dtype)
+        n = 0
+        with self._lock:
+            seen = set()
+            for text, vector in zip(texts, vectors):
+                key = content_key(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                records[n]["key"] = np.void(key)
+                records[n]["vec"] = vector
+                n += 1
+            if not n:
+                return 0
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, records[:n].tobytes())
+            finally:
+                os.close(fd)
+            self._stats["stored"] += n
+            self._sync()
+        return n
+
+    def encode(self, texts: list, encode_fn) -> list:
+        """
+        Embeddings for texts, calling encode_fn only for cache misses.
+
+        Args:
+            texts: List of strings.
+            encode_fn: Batch encoder, list of strings -> list of vectors.
+
+        Returns:
+            List of lists of floats, in input order.
+        """
+        if not texts:
+            return []
+        vectors = self.get_many(texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            fresh = encode_fn(missing)
+            self.put_many(missing, fresh)
+            by_text = dict(zip(missing, fresh))
+            vectors = [by_text[t] if v is None else v for t, v in zip(texts, vectors)]
+        return [np.asarray(v, dtype=np.float32).tolist() for v in vectors]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._rows),
+                "bytes": self._synced * self.dtype.itemsize,
+                "path": self.path,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            # Quantized vectors differ slightly from torch ones; keep them apart
+            model_key = EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == "torch" else f"{EMBEDDING_MODEL_NAME}-{EMBEDDING_BACKEND}"
+            _cache = EmbeddingCache(model_name=model_key)
+        return _cache
+
+
+def encode_documents(texts: list, encode_fn) -> list:
+    """Embed document texts through the persistent cache (if enabled)."""
+    if not EMBEDDING_CACHE_ENABLED:
+        return encode_fn(texts)
+    return get_embedding_cache().encode(texts, encode_fn)
+
+
+def get_embedding_cache_stats() -> dict:
+    """Cache statistics for /health; None until the cache is first used."""
+    return _cache.stats() if _cache is not None else None
@@ -1,23 +1,32 @@
 """
 Phase 12 — Embedding Model
 
-Wraps sentence-transformers to produce 384-dim embeddings.
+Produces 384-dim all-MiniLM-L6-v2 embeddings with the backend chosen
+by EMBEDDING_BACKEND:
+  torch (default) — sentence-transformers on PyTorch
+  onnx            — int8-quantized ONNX Runtime session (onnx_embedder),
+                    for CPU-only pods
+
 Model is loaded lazily on first call.
 """
 
-from sentence_transformers import SentenceTransformer
-from phase_12_vector_rag.config import EMBEDDING_MODEL_NAME
+from phase_12_vector_rag.config import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME
 from phase_12_vector_rag.utils import log_rag
 
 _model = None
 
 
 def _get_model():
-    """Lazy-load the SentenceTransformer model."""
+    """Lazy-load the configured embedding backend."""
     global _model
     if _model is None:
-        log_rag(f"Loading embedding model: {EMBEDDING_MODEL_NAME} ...")
-        _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        log_rag(f"Loading embedding model: {EMBEDDING_MODEL_NAME} ({EMBEDDING_BACKEND}) ...")
+        if EMBEDDING_BACKEND == "onnx":
+            from phase_12_vector_rag.onnx_embedder import get_onnx_embedder
+            _model = get_onnx_embedder()
+        else:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
         log_rag("Embedding model loaded.")
     return _model
 
@@ -33,6 +42,9 @@ def encode_text(text: str) -> list:
         List of floats (384-dim).
     """
     model = _get_model()
+    if EMBEDDING_BACKEND == "onnx":
+        # Concurrent single-text calls are coalesced into one batch
+        return model.encode_one(text).tolist()
     return model.encode(text).tolist()
 
 
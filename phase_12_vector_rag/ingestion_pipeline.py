@@ -2,18 +2,31 @@
 Phase 12 — Ingestion Pipeline
 
 Reads operational data from all phases, converts to structured
-documents, embeds them, and stores in the ChromaDB vector store.
+documents, embeds them, and stores in the vector store.
 
 Sources:
-  - Phase 11: alerts.json
+  - Phase 11: alerts (operational store)
   - Phase 6:  evaluation_report.json
-  - Phase 4:  prediction_logs.json
-  - Phase 10: simulation_logs.json
+  - Phase 4:  prediction log store
+  - Phase 10: simulation logs (operational store)
+
+Each source is a generator of documents streamed from its store in
+pages; run_full_ingestion and run_backfill push them through the
+staged bulk pipeline (bulk_ingestion) so memory stays flat.
+
+Backfill from the command line:
+    python -m phase_12_vector_rag.ingestion_pipeline --since 2024-01-01 [--until ...] [--workers N]
+A backfill only writes the vector store; the serving process's BM25
+index picks the new documents up on its own (lexical_index).
 """
 
+import argparse
 import json
 import os
 
+from phase_04_mlops.logging.prediction_store import iter_predictions, tail_predictions
+from phase_04_mlops.storage.ops_store import iter_alerts, iter_simulations
+from phase_12_vector_rag.bulk_ingestion import BULK_BATCH_SIZE, BULK_WORKERS, BulkIngestion
 from phase_12_vector_rag.config import BASE_DIR, MAX_PREDICTION_LOGS
 from phase_12_vector_rag.document_schemas import (
     AlertRecord,
@@ -21,8 +34,10 @@ from phase_12_vector_rag.document_schemas import (
     OperationalLog,
     SimulationResult,
 )
+from phase_12_vector_rag.embedding_cache import encode_documents
 from phase_12_vector_rag.embedding_model import encode_batch
-from phase_12_vector_rag.vector_store import add_documents
+from phase_12_vector_rag.lexical_index import LEXICAL_INDEX
+from phase_12_vector_rag.vector_store import add_documents, existing_ids, iter_documents
 from phase_12_vector_rag.utils import log_rag
 
 
@@ -37,33 +52,64 @@ def _load_json(path: str):
         return None
 
 
+def _embed(contents: list) -> list:
+    """Embed document texts through the persistent embedding cache."""
+    return encode_documents(contents, encode_batch)
+
+
+def _store(ids: list, contents: list, embeddings: list, metadatas: list) -> int:
+    """Write to the vector store and the BM25 lexical index."""
+    added = add_documents(ids, contents, embeddings, metadatas)
+    LEXICAL_INDEX.add(ids, contents, metadatas)
+    return added
+
+
+def _store_vectors_only(ids: list, contents: list, embeddings: list, metadatas: list) -> int:
+    """Write to the vector store only (no in-memory index in this process)."""
+    return add_documents(ids, contents, embeddings, metadatas)
+
+
 def _ingest_batch(documents: list) -> int:
-    """Embed and store a batch of BaseDocument instances."""
+    """
+    Embed and store a batch of BaseDocument instances.
+
+    IDs already in the collection are resolved first, so only new
+    documents are embedded; their vectors come from the persistent
+    embedding cache when the same content was embedded before.
+    Stored documents are also added to the BM25 lexical index.
+    """
     if not documents:
         return 0
 
-    ids = [doc.doc_id for doc in documents]
-    contents = [doc.content for doc in documents]
-    metadatas = [doc.to_document()["metadata"] for doc in documents]
-    embeddings = encode_batch(contents)
+    present = existing_ids([doc.doc_id for doc in documents])
+    unique = {}
+    for doc in documents:
+        if doc.doc_id not in present:
+            unique.setdefault(doc.doc_id, doc)
+    if not unique:
+        return 0
 
-    return add_documents(ids, contents, embeddings, metadatas)
+    ids = list(unique)
+    contents = [doc.content for doc in unique.values()]
+    metadatas = [doc.to_document()["metadata"] for doc in unique.values()]
+    return _store(ids, contents, _embed(contents), metadatas)
 
 
 # ============================
-# Source-specific ingestors
+# Source readers
 # ============================
 
-def ingest_alerts() -> int:
-    """Ingest alert records from Phase 11."""
-    path = os.path.join(BASE_DIR, "phase_11_alerting", "alerts.json")
-    data = _load_json(path)
-    if not data:
-        return 0
+def _in_range(timestamp: str, since: str = None, until: str = None) -> bool:
+    return (since is None or timestamp >= since) and (until is None or timestamp < until)
 
-    docs = []
-    for entry in data:
+
+def _alert_documents(since: str = None, until: str = None):
+    """Alert records from Phase 11, streamed from the operational store."""
+    for entry in iter_alerts(source="alerting"):
         alert = entry.get("alert", entry)
+        timestamp = alert.get("timestamp", entry.get("logged_at", ""))
+        if not _in_range(timestamp, since, until):
+            continue
         content = (
             f"Alert {alert.get('alert_id', 'unknown')} at "
             f"{alert.get('timestamp', entry.get('logged_at', 'unknown'))}: "
@@ -74,40 +120,34 @@ def ingest_alerts() -> int:
             f"Message: {alert.get('message', 'N/A')}. "
             f"Context: {json.dumps(alert.get('context', {}))}"
         )
-        docs.append(AlertRecord(
+        yield AlertRecord(
             content=content,
             plant_id=alert.get("plant_id", 1),
-            timestamp=alert.get("timestamp", entry.get("logged_at", "")),
+            timestamp=timestamp,
             metadata={"severity": alert.get("severity", ""), "alert_id": alert.get("alert_id", "")},
-        ))
-
-    return _ingest_batch(docs)
+        )
 
 
-def ingest_evaluation_report() -> int:
-    """Ingest model evaluation report from Phase 6."""
+def _evaluation_documents():
+    """Model evaluation report from Phase 6 (a single document)."""
     path = os.path.join(BASE_DIR, "phase_06_evaluation", "evaluation_report.json")
     data = _load_json(path)
     if not data:
-        return 0
-
+        return
     content = f"Model Evaluation Report: {json.dumps(data, indent=2)}"
-    doc = EvaluationReport(
+    yield EvaluationReport(
         content=content,
         metadata={"source": "phase_06_evaluation"},
     )
-    return _ingest_batch([doc])
 
 
-def ingest_prediction_logs() -> int:
-    """Ingest recent prediction logs from Phase 4 MLOps."""
-    path = os.path.join(BASE_DIR, "phase_04_mlops", "logging", "prediction_logs.json")
-    data = _load_json(path)
-    if not data:
-        return 0
-
-    docs = []
-    for entry in data[-MAX_PREDICTION_LOGS:]:
+def _prediction_documents(limit: int = MAX_PREDICTION_LOGS, since=None, until=None):
+    """
+    Prediction logs from Phase 4 MLOps: the most recent `limit`
+    records, or every record in [since, until) when limit is None.
+    """
+    records = tail_predictions(limit) if limit is not None else iter_predictions(since, until)
+    for entry in records:
         content = (
             f"Prediction log at {entry.get('timestamp', 'unknown')}: "
             f"Endpoint {entry.get('endpoint', 'N/A')}, "
@@ -117,32 +157,47 @@ def ingest_prediction_logs() -> int:
             f"Status={entry.get('status', 'N/A')}, "
             f"Model={entry.get('model_version', 'N/A')}"
         )
-        docs.append(OperationalLog(
+        yield OperationalLog(
             content=content,
             timestamp=entry.get("timestamp", ""),
             metadata={"endpoint": entry.get("endpoint", ""), "status": entry.get("status", "")},
-        ))
-
-    return _ingest_batch(docs)
+        )
 
 
-def ingest_simulation_logs() -> int:
-    """Ingest scenario simulation logs from Phase 10."""
-    path = os.path.join(BASE_DIR, "phase_10_scenario_engine", "simulation_logs.json")
-    data = _load_json(path)
-    if not data:
-        return 0
-
-    docs = []
-    for entry in data:
-        content = f"Simulation event: {json.dumps(entry)}"
-        docs.append(SimulationResult(
-            content=content,
+def _simulation_documents(since: str = None, until: str = None):
+    """Scenario simulation logs from Phase 10, streamed from the operational store."""
+    for entry in iter_simulations():
+        if not _in_range(entry.get("timestamp", ""), since, until):
+            continue
+        yield SimulationResult(
+            content=f"Simulation event: {json.dumps(entry)}",
             timestamp=entry.get("timestamp", ""),
             metadata={"source": "phase_10_scenario_engine"},
-        ))
+        )
+
+
+# ============================
+# Source-specific ingestors
+# ============================
+
+def ingest_alerts() -> int:
+    """Ingest alert records from Phase 11."""
+    return _ingest_batch(list(_alert_documents()))
+
+
+def ingest_evaluation_report() -> int:
+    """Ingest model evaluation report from Phase 6."""
+    return _ingest_batch(list(_evaluation_documents()))
 
-    return _ingest_batch(docs)
+
+def ingest_prediction_logs() -> int:
+    """Ingest recent prediction logs from Phase 4 MLOps."""
+    return _ingest_batch(list(_prediction_documents()))
+
+
+def ingest_simulation_logs() -> int:
+    """Ingest scenario simulation logs from Phase 10."""
+    return _ingest_batch(list(_simulation_documents()))
 
 
 def ingest_single_document(doc_type: str, content: str, plant_id: int = 1, metadata: dict = None) -> int:
@@ -167,23 +222,83 @@ def ingest_single_document(doc_type: str, content: str, plant_id: int = 1, metad
     return _ingest_batch([doc])
 
 
-def run_full_ingestion() -> dict:
+def _run_pipeline(sources: dict, lexical: bool = True, on_source_done=None, on_progress=None,
+                  **options) -> dict:
+    if lexical:
+        # Index documents stored by earlier runs; new batches are added as they land
+        LEXICAL_INDEX.ensure_loaded(iter_documents)
+    pipeline = BulkIngestion(
+        existing=existing_ids, embed=_embed, write=_store if lexical else _store_vectors_only,
+        on_source_done=on_source_done, on_progress=on_progress, **options,
+    )
+    return pipeline.run(sources)
+
+
+def run_full_ingestion(on_source_done=None, on_progress=None) -> dict:
     """
     Run the complete ingestion pipeline across all data sources.
     Call at application startup.
 
+    Args:
+        on_source_done: Optional callback(source, count) invoked as
+            each source finishes, for progress reporting.
+        on_progress: Optional callback(report) with periodic
+            pipeline progress (see bulk_ingestion).
+
     Returns:
         Dict of counts per source.
     """
     log_rag("Starting full ingestion pipeline ...")
 
-    counts = {
-        "alerts": ingest_alerts(),
-        "evaluation_report": ingest_evaluation_report(),
-        "prediction_logs": ingest_prediction_logs(),
-        "simulation_logs": ingest_simulation_logs(),
+    sources = {
+        "alerts": _alert_documents(),
+        "evaluation_report": _evaluation_documents(),
+        "prediction_logs": _prediction_documents(),
+        "simulation_logs": _simulation_documents(),
     }
+    report = _run_pipeline(sources, on_source_done=on_source_done, on_progress=on_progress)
 
+    counts = {source: report["sources"][source]["written"] for source in sources}
     total = sum(counts.values())
     log_rag(f"Ingestion complete — {total} new documents added: {counts}")
     return counts
+
+
+def run_backfill(since=None, until=None, workers: int = BULK_WORKERS,
+                 batch_size: int = BULK_BATCH_SIZE, on_progress=None, lexical: bool = False) -> dict:
+    """
+    Ingest every stored alert, prediction log and simulation in
+    [since, until) — not just the startup window — with bounded memory.
+
+    Args:
+        since, until: ISO timestamps (None = unbounded).
+        workers: Embedding worker threads.
+        batch_size: Documents per embedding micro-batch.
+        on_progress: Optional callback(report).
+        lexical: Also maintain this process's BM25 index. Off by
+            default: a separate backfill process would only grow an
+            index it throws away, and memory must stay flat.
+
+    Returns:
+        Pipeline report (per-source counts, throughput).
+    """
+    log_rag(f"Starting backfill since={since} until={until} ...")
+    sources = {
+        "alerts": _alert_documents(since, until),
+        "evaluation_report": _evaluation_documents(),
+        "prediction_logs": _prediction_documents(limit=None, since=since, until=until),
+        "simulation_logs": _simulation_documents(since, until),
+    }
+    return _run_pipeline(sources, lexical=lexical, on_progress=on_progress,
+                         workers=workers, batch_size=batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the vector store from stored history.")
+    parser.add_argument("--since", help="ISO timestamp, inclusive")
+    parser.add_argument("--until", help="ISO timestamp, exclusive")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    args = parser.parse_args()
+    report = run_backfill(args.since, args.until, workers=args.workers, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,186 @@
+"""
+Phase 12 — Lexical Index
+
+BM25 inverted index over the same documents as the vector store.
+MiniLM embeddings blur exact tokens — alert IDs ("3f2a9c1b"),
+severities ("P0"), plant numbers — which BM25 matches exactly and
+without a model forward pass.
+
+Kept in memory and maintained incrementally by the ingestion
+pipeline (every batch added to the vector store is added here too);
+on first use it is bootstrapped from the documents already in the
+vector store, and whenever the store holds more documents than were
+scanned (another process, e.g. a backfill, wrote them) it scans just
+the new tail, so nothing is persisted separately.
+
+A lexical result is "decisive" when the question carries an
+identifier-like token (>= 6 characters, containing a digit) that
+occurs in at most LEXICAL_DECISIVE_MAX_DOCS documents: the retriever
+then answers from the lexical hits without embedding the question.
+"""
+
+import math
+import os
+import re
+import threading
+
+LEXICAL_DECISIVE_MAX_DOCS = int(os.getenv("RAG_LEXICAL_DECISIVE_MAX_DOCS", 5))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+    a an and any are as at be been before did do does for from had has have
+    how i in is it its me of on or our show that the their there this to
+    us was we were what when where which who why with you
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lowercased alphanumeric tokens, stopwords removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def is_identifier(token: str) -> bool:
+    """Alert / document IDs: long tokens that contain a digit."""
+    return len(token) >= 6 and any(c.isdigit() for c in token)
+
+
+class LexicalIndex:
+    """Thread-safe BM25 index keyed by vector store document ID."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._row_of = {}      # doc_id -> row
+        self._ids = []
+        self._lengths = []
+        self._plants = []
+        self._types = []
+        self._postings = {}    # term -> {row: term frequency}
+        self._total_length = 0
+        self._loaded = False
+        self._scanned = 0  # store rows read by ensure_loaded
+        self._load_lock = threading.Lock()
+        self._stats = {"searches": 0, "decisive": 0}
+
+    def add(self, ids: list, contents: list, metadatas: list) -> int:
+        """Index documents not already present. Returns the number added."""
+        added = 0
+        with self._lock:
+            for doc_id, content, metadata in zip(ids, contents, metadatas):
+                if doc_id in self._row_of:
+                    continue
+                row = len(self._ids)
+                tokens = tokenize(content)
+                self._row_of[doc_id] = row
+                self._ids.append(doc_id)
+                self._lengths.append(len(tokens))
+                self._plants.append((metadata or {}).get("plant_id"))
+                self._types.append((metadata or {}).get("doc_type"))
+                self._total_length += len(tokens)
+                for token in tokens:
+                    postings = self._postings.setdefault(token, {})
+                    postings[row] = postings.get(row, 0) + 1
+                added += 1
+        return added
+
+    def _current(self, total) -> bool:
+        return self._loaded and (total is None or total <= self._scanned)
+
+    def ensure_loaded(self, batches, total: int = None) -> None:
+        """
+        Index stored documents not scanned yet: all of them on first
+        use, afterwards only the tail when the store has grown past
+        what was scanned.
+
+        Args:
+            batches: Callable(offset=...) returning an iterable of
+                (ids, contents, metadatas) batches from that offset.
+            total: Current document count of the store (None = only
+                bootstrap).
+        """
+        if self._current(total):
+            return
+        with self._load_lock:
+            if self._current(total):
+                return
+            scanned = self._scanned
+            for ids, contents, metadatas in batches(offset=scanned):
+                self.add(ids, contents, metadatas)
+                scanned += len(ids)
+            self._scanned = scanned
+            self._loaded = True
+
+    def search(self, query: str, top_k: int = 5, plant_id=None, doc_type: str = None) -> dict:
+        """
+        BM25 search.
+
+        Args:
+            query: Question text.
+            top_k: Max hits to return.
+            plant_id: Optional plant filter.
+            doc_type: Optional document type filter.
+
+        Returns:
+            Dict with hits ([(doc_id, score)], best first),
+            decisive (bool) and identifiers (matched ID tokens).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        plant = str(plant_id) if plant_id is not None else None
+        with self._lock:
+            self._stats["searches"] += 1
+            n_docs = len(self._ids)
+            if not n_docs or not terms:
+                return {"hits": [], "decisive": False, "identifiers": []}
+            avg_length = self._total_length / n_docs or 1.0
+
+            scores = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for row, tf in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[row] / avg_length)
+                    scores[row] = scores.get(row, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            allowed = [
+                row for row in scores
+                if (plant is None or self._plants[row] == plant)
+                and (doc_type is None or self._types[row] == doc_type)
+            ]
+            identifiers = [
+                t for t in terms
+                if is_identifier(t) and 0 < len(self._postings.get(t, ())) <= LEXICAL_DECISIVE_MAX_DOCS
+            ]
+            if identifiers:
+                # Only documents carrying the identifier answer the question
+                allowed = [row for row in allowed if any(row in self._postings[t] for t in identifiers)]
+            allowed.sort(key=lambda row: (-scores[row], row))
+            hits = [(self._ids[row], scores[row]) for row in allowed[:top_k]]
+
+            decisive = bool(identifiers and hits)
+            self._stats["decisive"] += decisive
+        return {"hits": hits, "decisive": decisive, "identifiers": identifiers}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "documents": len(self._ids),
+                "terms": len(self._postings),
+                "loaded": self._loaded,
+                "scanned": self._scanned,
+            }
+
+
+LEXICAL_INDEX = LexicalIndex()
+
+
+def get_lexical_stats() -> dict:
+    """Lexical index statistics for /health."""
+    return LEXICAL_INDEX.stats()
@@ -0,0 +1,406 @@
+"""
+Phase 12 — Memory-Mapped Vector Index
+
+In-process alternative to the ChromaDB collection for corpora that
+fit comfortably on one machine. Exposes the subset of the Chroma
+Collection API that vector_store uses (add, get, query, count), so
+it is selected with VECTOR_BACKEND=numpy and nothing else changes.
+
+Layout under VECTOR_INDEX_DIR:
+    vectors.f32 / vectors.f16  append-only row-major embedding matrix,
+                               memory-mapped for queries
+    rows.jsonl                 one [id, document, metadata] line per row
+    meta.json                  dimension and storage dtype
+
+Only ids, metadata columns (one list per key), row norms and
+per-plant / per-doc_type row masks are held in memory; documents
+are read back from rows.jsonl by offset for the returned hits.
+
+Queries are exact: one batched matrix product per block of rows,
+squared L2 distances from precomputed norms (same scale as Chroma's
+"l2" space, so SIMILARITY_THRESHOLD applies unchanged), where-filters
+resolved to row masks, top-k via argpartition. float16 storage
+halves the file and page-cache footprint but converts every block to
+float32 per query (NumPy has no fast half-precision matmul), so it
+suits batched queries or memory-bound hosts rather than latency.
+
+Several processes may share one directory (the app and a backfill,
+say): appends are serialized with an flock on .lock, and every
+reader catches up on rows other processes appended (a stat of
+rows.jsonl per call) before count / get / query. Rows whose vector
+or row line was torn by a crash are truncated on open.
+"""
+
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+MASKED_FIELDS = ("plant_id", "doc_type")
+BLOCK_ROWS = 8192
+_INITIAL_CAPACITY = 1024
+
+
+def _empty_result(n_queries: int) -> dict:
+    return {
+        "ids": [[] for _ in range(n_queries)],
+        "documents": [[] for _ in range(n_queries)],
+        "metadatas": [[] for _ in range(n_queries)],
+        "distances": [[] for _ in range(n_queries)],
+    }
+
+
+class MmapVectorIndex:
+    def __init__(self, directory: str, dtype: str = "float32"):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._rows_path = os.path.join(directory, "rows.jsonl")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._lock = threading.RLock()
+
+        self.dim = None
+        self._n = 0
+        self._rows_end = 0  # bytes of rows.jsonl indexed so far
+        self._ids = []
+        self._row_of = {}
+        self._offsets = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._norms = np.zeros(_INITIAL_CAPACITY, dtype=np.float32)
+        self._columns = {}  # metadata key -> list of values (None if absent)
+        self._masks = {}    # (field, value) -> bool array over capacity
+        self._mm = None
+        self._load()
+
+    # ============================
+    # Persistence
+    # ============================
+
+    @property
+    def _vectors_path(self) -> str:
+        suffix = "f16" if self.dtype == np.float16 else "f32"
+        return os.path.join(self.directory, f"vectors.{suffix}")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock across processes for appends and repairs."""
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> None:
+        if self.dim is not None or not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if meta["dtype"] != self.dtype.name:
+            raise ValueError(
+                f"Index at {self.directory} stores {meta['dtype']}, not {self.dtype.name}"
+            )
+        self.dim = meta["dim"]
+
+    def _load(self) -> None:
+        with self._lock, self._file_lock():
+            self._repair()
+            self._catch_up()
+
+    def _repair(self) -> None:
+        self._read_meta()
+        if self.dim is None:
+            return
+        if not os.path.exists(self._rows_path):
+            # Crash during the first add: vectors without any rows
+            if os.path.exists(self._vectors_path):
+                with open(self._vectors_path, "ab") as f:
+                    f.truncate(0)
+            return
+
+        row_bytes = self.dim * self.dtype.itemsize
+        stored_vectors = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+
+        n_rows = 0
+        offset = 0
+        with open(self._rows_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n") or n_rows == stored_vectors:
+                    break
+                n_rows += 1
+                offset += len(line)
+
+        # Drop torn tails so both files describe the same rows
+        with open(self._rows_path, "r+b") as f:
+            f.truncate(offset)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(n_rows * row_bytes)
+
+    def _catch_up(self) -> None:
+        """Index rows appended (by any process) since the last call."""
+        if not os.path.exists(self._rows_path) or os.path.getsize(self._rows_path) <= self._rows_end:
+            return
+        with self._lock:
+            self._read_meta()
+            if self.dim is None:
+                return
+            row_bytes = self.dim * self.dtype.itemsize
+            stored_vectors = os.path.getsize(self._vectors_path) // row_bytes
+
+            # Vectors are written before rows, so a complete row line
+            # always has its vector; stop at a line still being written
+            rows = []
+            offset = self._rows_end
+            with open(self._rows_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n") or self._n + len(rows) == stored_vectors:
+                        break
+                    rows.append((offset, json.loads(line)))
+                    offset += len(line)
+            if not rows:
+                return
+
+            first = self._n
+            self._remap(first + len(rows))
+            for start in range(0, len(rows), BLOCK_ROWS):
+                block = np.asarray(self._mm[first + start:first + start + BLOCK_ROWS], dtype=np.float32)
+                norms = np.einsum("ij,ij->i", block, block)
+                for i, (line_offset, (doc_id, _, metadata)) in enumerate(rows[start:start + BLOCK_ROWS]):
+                    self._append_row(doc_id, line_offset, norms[i], metadata)
+            self._rows_end = offset
+
+    def _remap(self, n_rows: int) -> None:
+        self._mm = (
+            np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(n_rows, self.dim))
+            if n_rows else None
+        )
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._norms)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._offsets = np.resize(self._offsets, capacity)
+        self._norms = np.resize(self._norms, capacity)
+        for key, mask in self._masks.items():
+            grown = np.zeros(capacity, dtype=bool)
+            grown[:len(mask)] = mask
+            self._masks[key] = grown
+
+    def _append_row(self, doc_id: str, offset: int, norm: float, metadata: dict) -> None:
+        row = self._n
+        self._grow(row + 1)
+        self._ids.append(doc_id)
+        # Two processes can store the same id; lookups use the first row
+        self._row_of.setdefault(doc_id, row)
+        self._offsets[row] = offset
+        self._norms[row] = norm
+        for key in set(self._columns) | set(metadata):
+            column = self._columns.setdefault(key, [None] * row)
+            column.append(metadata.get(key))
+        for field in MASKED_FIELDS:
+            if field in metadata:
+                mask = self._masks.get((field, metadata[field]))
+                if mask is None:
+                    mask = self._masks[(field, metadata[field])] = np.zeros(len(self._norms), dtype=bool)
+                mask[row] = True
+        self._n = row + 1
+
+    # ============================
+    # Collection API
+    # ============================
+
+    def count(self) -> int:
+        self._catch_up()
+        return self._n
+
+    def add(self, ids: list, documents: list, embeddings: list, metadatas: list) -> None:
+        """Append rows; ids already in the index are ignored."""
+        with self._lock, self._file_lock():
+            self._catch_up()
+            fresh, seen = [], set()
+            for i, doc_id in enumerate(ids):
+                if doc_id not in self._row_of and doc_id not in seen:
+                    seen.add(doc_id)
+                    fresh.append(i)
+            if not fresh:
+                return
+            matrix = np.asarray([embeddings[i] for i in fresh], dtype=np.float32)
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                with open(self._meta_path, "w") as f:
+                    json.dump({"dim": self.dim, "dtype": self.dtype.name}, f)
+            if matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} != index dimension {self.dim}")
+
+            stored = matrix.astype(self.dtype)
+            # Serialize before touching either file, and roll both back on
+            # failure: orphan vectors would pair every later row with the
+            # wrong vector
+            lines = [
+                (json.dumps([ids[i], documents[i], metadatas[i]], ensure_ascii=False) + "\n").encode("utf-8")
+                for i in fresh
+            ]
+            offset = self._rows_end
+            try:
+                with open(self._vectors_path, "ab") as f:
+                    f.write(stored.tobytes())
+                with open(self._rows_path, "ab") as f:
+                    f.write(b"".join(lines))
+            except BaseException:
+                with open(self._vectors_path, "ab") as f:
+                    f.truncate(self._n * self.dim * self.dtype.itemsize)
+                with open(self._rows_path, "ab") as f:
+                    f.truncate(offset)
+                raise
+
+            as_stored = stored.astype(np.float32)
+            norms = np.einsum("ij,ij->i", as_stored, as_stored)
+            for j, i in enumerate(fresh):
+                self._append_row(ids[i], offset, norms[j], metadatas[i])
+                offset += len(lines[j])
+            self._rows_end = offset
+            self._remap(self._n)
+
+    def get(self, ids: list = None, include: list = ("metadatas", "documents"),
+            limit: int = None, offset: int = 0) -> dict:
+        """Rows by id (all rows, or a limit/offset page, when ids is None), Chroma-shaped."""
+        self._catch_up()
+        with self._lock:
+            if ids is None:
+                stop = self._n if limit is None else min(self._n, offset + limit)
+                rows = list(range(offset, stop))
+            else:
+                rows = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+            result = {"ids": [self._ids[r] for r in rows]}
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadata(r) for r in rows]
+            if "documents" in include:
+                result["documents"] = self._documents(rows)
+            return result
+
+    def query(self, query_embeddings: list, n_results: int = 5, where: dict = None) -> dict:
+        """
+        Exact nearest neighbours for a batch of query embeddings.
+
+        Returns:
+            Chroma-shaped dict: ids, documents, metadatas, distances,
+            one list per query embedding.
+        """
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        self._catch_up()
+        with self._lock:
+            n, mm, norms = self._n, self._mm, self._norms[:self._n]
+            mask = self._resolve(where, n) if where else None
+        if n == 0:
+            return _empty_result(len(queries))
+
+        rows = np.flatnonzero(mask) if mask is not None else None
+        if rows is not None and len(rows) == 0:
+            return _empty_result(len(queries))
+        distances = self._distances(queries, mm, norms, rows)
+
+        width = distances.shape[1]
+        k = min(n_results, width)
+        if k < width:
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(width), (len(queries), width))
+        result = _empty_result(len(queries))
+        with self._lock:
+            for q in range(len(queries)):
+                order = top[q][np.argsort(distances[q, top[q]], kind="stable")]
+                hit_rows = order if rows is None else rows[order]
+                result["ids"][q] = [self._ids[r] for r in hit_rows]
+                result["documents"][q] = self._documents(hit_rows)
+                result["metadatas"][q] = [self._metadata(r) for r in hit_rows]
+                result["distances"][q] = [float(d) for d in distances[q, order]]
+        return result
+
+    # ============================
+    # Internals
+    # ============================
+
+    def _distances(self, queries: np.ndarray, mm, norms: np.ndarray, rows) -> np.ndarray:
+        """Squared L2 distances, shape (queries, candidate rows)."""
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        if rows is not None:
+            candidates = np.asarray(mm[rows], dtype=np.float32)
+            scores = queries @ candidates.T
+            return np.maximum(query_norms[:, None] + norms[rows][None, :] - 2 * scores, 0)
+
+        distances = np.empty((len(queries), len(norms)), dtype=np.float32)
+        for start in range(0, len(norms), BLOCK_ROWS):
+            block = mm[start:start + BLOCK_ROWS]
+            if block.dtype != np.float32:
+                block = block.astype(np.float32)
+            distances[:, start:start + len(block)] = queries @ block.T
+        distances *= -2
+        distances += query_norms[:, None]
+        distances += norms[None, :]
+        return np.maximum(distances, 0, out=distances)
+
+    def _resolve(self, where: dict, n: int) -> np.ndarray:
+        """Row mask for a Chroma where-filter ($and, $or, $eq, $ne, $in)."""
+        masks = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._resolve(clause, n) for clause in condition]
+                combine = np.logical_and if key == "$and" else np.logical_or
+                masks.append(combine.reduce(parts) if parts else np.ones(n, dtype=bool))
+                continue
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if op == "$eq":
+                    masks.append(self._equals(key, value, n))
+                elif op == "$ne":
+                    masks.append(~self._equals(key, value, n))
+                elif op == "$in":
+                    masks.append(np.logical_or.reduce([self._equals(key, v, n) for v in value])
+                                 if value else np.zeros(n, dtype=bool))
+                else:
+                    raise ValueError(f"Unsupported where operator: {op}")
+        return np.logical_and.reduce(masks) if masks else np.ones(n, dtype=bool)
+
+    def _equals(self, key: str, value, n: int) -> np.ndarray:
+        if key in MASKED_FIELDS:
+            mask = self._masks.get((key, value))
+            return mask[:n].copy() if mask is not None else np.zeros(n, dtype=bool)
+        column = self._columns.get(key)
+        if column is None:
+            return np.zeros(n, dtype=bool)
+        return np.fromiter((v == value for v in column[:n]), dtype=bool, count=n)
+
+    def _metadata(self, row: int) -> dict:
+        return {
+            key: column[row] for key, column in self._columns.items()
+            if row < len(column) and column[row] is not None
+        }
+
+    def _documents(self, rows) -> list:
+        documents = []
+        if not len(rows):
+            return documents  # rows.jsonl is created by the first add
+        with open(self._rows_path, "rb") as f:
+            for row in rows:
+                f.seek(int(self._offsets[row]))
+                documents.append(json.loads(f.readline())[1])
+        return documents
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rows": self._n,
+                "dim": self.dim,
+                "dtype": self.dtype.name,
+                "vector_bytes": self._n * (self.dim or 0) * self.dtype.itemsize,
+                "masks": len(self._masks),
+            }
@@ -0,0 +1,258 @@
+"""
+Phase 12 — ONNX Embedding Backend
+
+int8-quantized ONNX Runtime version of all-MiniLM-L6-v2 for CPU-only
+pods (EMBEDDING_BACKEND=onnx). Reproduces the sentence-transformers
+pipeline — BERT encoder, attention-masked mean pooling, L2
+normalization — so vectors stay interchangeable with the torch
+backend (see the parity check in test_phase12).
+
+  - Export: the transformer is exported once to
+    EMBEDDING_ONNX_DIR/model.onnx (needs torch and
+    sentence-transformers) and dynamically quantized to
+    model.int8.onnx (int8 weights, per-channel). At runtime only
+    onnxruntime and tokenizers are needed. Export ahead of time with
+        python -m phase_12_vector_rag.onnx_embedder export
+  - Threads: intra-op threads default to the CPUs this process may
+    run on (sched_getaffinity, which honours pod cpusets), inter-op
+    to 1; override with EMBEDDING_ONNX_THREADS.
+  - Length bucketing: texts are sorted by token count, batched, and
+    each batch is padded only to its longest member rounded up to a
+    multiple of EMBEDDING_LENGTH_BUCKET, so short texts never pay
+    for long ones and shapes repeat.
+  - Dynamic batching: concurrent single-text calls (query
+    embeddings from parallel requests) wait up to
+    EMBEDDING_BATCH_WAIT_MS and run as one batch.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from phase_12_vector_rag.config import (
+    EMBEDDING_BATCH_WAIT_MS,
+    EMBEDDING_LENGTH_BUCKET,
+    EMBEDDING_MAX_BATCH,
+    EMBEDDING_MAX_SEQ_LENGTH,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_THREADS,
+)
+from phase_12_vector_rag.utils import log_rag
+
+FP32_MODEL = "model.onnx"
+INT8_MODEL = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+# ============================
+# Export
+# ============================
+
+def export_onnx(model_dir: str = EMBEDDING_ONNX_DIR, model_name: str = EMBEDDING_MODEL_NAME) -> str:
+    """
+    Export the sentence-transformers encoder to ONNX and quantize it.
+
+    Args:
+        model_dir: Output directory.
+        model_name: sentence-transformers model to export.
+
+    Returns:
+        Path of the int8 model.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(model_dir, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    transformer.config.return_dict = False  # plain tuple outputs for tracing
+    tokenizer = st_model.tokenizer
+    tokenizer.save_pretrained(model_dir)
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    fp32_path = os.path.join(model_dir, FP32_MODEL)
+    dynamic = {"batch": 0, "sequence": 1}
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in INPUT_NAMES),
+            fp32_path,
+            input_names=list(INPUT_NAMES),
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: dynamic for name in (*INPUT_NAMES, "last_hidden_state")},
+            opset_version=14,
+        )
+
+    int8_path = os.path.join(model_dir, INT8_MODEL)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8, per_channel=True)
+    log_rag(f"Exported {model_name} to {int8_path}")
+    return int8_path
+
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# ============================
+# Inference
+# ============================
+
+class OnnxEmbedder:
+    def __init__(self, model_dir: str = EMBEDDING_ONNX_DIR, quantized: bool = True,
+                 threads: int = EMBEDDING_ONNX_THREADS, max_batch: int = EMBEDDING_MAX_BATCH,
+                 bucket: int = EMBEDDING_LENGTH_BUCKET, max_length: int = EMBEDDING_MAX_SEQ_LENGTH):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, INT8_MODEL if quantized else FP32_MODEL)
+        if not os.path.exists(model_path):
+            export_onnx(model_dir)
+
+        self.max_batch = max_batch
+        self.bucket = bucket
+        self.max_length = max_length
+        self.threads = threads or _available_cpus()
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length=max_length)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self._requests = queue.Queue()
+        self._wait = EMBEDDING_BATCH_WAIT_MS / 1000
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"texts": 0, "batches": 0, "padded_tokens": 0, "tokens": 0, "coalesced_calls": 0}
+
+    def _run(self, encodings: list) -> np.ndarray:
+        longest = max(len(e.ids) for e in encodings)
+        width = max(1, min(-(-longest // self.bucket) * self.bucket, self.max_length))
+        ids = np.zeros((len(encodings), width), dtype=np.int64)
+        mask = np.zeros_like(ids)
+        types = np.zeros_like(ids)
+        for row, encoding in enumerate(encodings):
+            n = len(encoding.ids)
+            ids[row, :n] = encoding.ids
+            mask[row, :n] = encoding.attention_mask
+            types[row, :n] = encoding.type_ids
+        feeds = {"input_ids": ids, "attention_mask": mask, "token_type_ids": types}
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self._input_names})[0]
+
+        # Mean pooling over real tokens, then L2 normalization
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["tokens"] += int(mask.sum())
+            self._stats["padded_tokens"] += ids.size
+        return pooled.astype(np.float32)
+
+    def encode(self, texts):
+        """
+        Embed one text (returns a vector) or a list (returns a matrix).
+        Texts are length-sorted into batches and restored to input order.
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        encodings = self.tokenizer.encode_batch(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(encodings[i].ids))
+        out = None
+        for start in range(0, len(order), self.max_batch):
+            rows = order[start:start + self.max_batch]
+            vectors = self._run([encodings[i] for i in rows])
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[rows] = vectors
+        with self._stats_lock:
+            self._stats["texts"] += len(texts)
+        return out[0] if single else out
+
+    def encode_one(self, text: str) -> np.ndarray:
+        """Embed one text, batched with concurrent callers."""
+        self._ensure_worker()
+        future = Future()
+        self._requests.put((text, future))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._batch_loop, name="onnx-embed", daemon=True)
+                self._worker.start()
+
+    def _batch_loop(self) -> None:
+        while True:
+            pending = [self._requests.get()]
+            deadline = time.monotonic() + self._wait
+            while len(pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                vectors = self.encode([text for text, _ in pending])
+                for (_, future), vector in zip(pending, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+            with self._stats_lock:
+                self._stats["coalesced_calls"] += len(pending) - 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            padded = self._stats["padded_tokens"]
+            return {
+                **self._stats,
+                "threads": self.threads,
+                "padding_ratio": round(1 - self._stats["tokens"] / padded, 4) if padded else 0.0,
+            }
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_onnx_embedder() -> OnnxEmbedder:
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = OnnxEmbedder()
+        return _embedder
+
+
+def get_onnx_stats() -> dict:
+    """Batching and padding statistics for /health; None until first use."""
+    return _embedder.stats() if _embedder is not None else None
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["export"]:
+        export_onnx()
+    else:
+        print("Usage: python -m phase_12_vector_rag.onnx_embedder export")
@@ -0,0 +1,77 @@
+"""
+Phase 12 — Query Caches
+
+Operators ask the same handful of questions all day, so the
+retriever keeps two LRUs in front of the model and Chroma:
+
+  - query embeddings, keyed by normalized question text
+    (lowercased, whitespace collapsed, trailing punctuation
+    stripped) — skips the SentenceTransformer forward pass;
+  - retrieval results, keyed by (normalized question, plant_id,
+    doc_type, top_k, store generation) — skips the HNSW query.
+
+The generation is a counter bumped by vector_store.add_documents,
+so results cached before new documents arrived are never served
+again; they simply age out of the LRU.
+"""
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_QUERY_EMBEDDING_CACHE_SIZE", 512))
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RAG_RETRIEVAL_CACHE_SIZE", 256))
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a question used as cache key."""
+    return " ".join(text.lower().split()).rstrip("?!. ")
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return copy.deepcopy(self._entries[key])
+
+    def put(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = copy.deepcopy(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+QUERY_EMBEDDINGS = LRUCache(QUERY_EMBEDDING_CACHE_SIZE)
+RETRIEVALS = LRUCache(RETRIEVAL_CACHE_SIZE)
+
+
+def get_query_cache_stats() -> dict:
+    """Query embedding and retrieval cache statistics for /health."""
+    return {
+        "query_embeddings": QUERY_EMBEDDINGS.stats(),
+        "retrievals": RETRIEVALS.stats(),
+    }
@@ -7,13 +7,12 @@ formats a structured prompt, computes a confidence boost,
 and optionally generates a grounded answer via Ollama.
 """
 
-import requests
+from phase_09_agent_orchestration.llm_client import OLLAMA_MODEL, generate
 from phase_12_vector_rag.retriever import retrieve_relevant_documents
 from phase_12_vector_rag.utils import log_rag
 
-# Ollama configuration
-OLLAMA_URL = "http://host.docker.internal:11434/api/generate"
-OLLAMA_MODEL = "mistral"
+# Grounded answers are longer than summaries; host, pooling and
+# circuit breaking come from the shared phase 9 LLM client
 OLLAMA_TIMEOUT = 60
 
 
@@ -83,17 +82,7 @@ def _call_ollama(prompt: str) -> str:
     Fully local, zero cost, no API keys needed.
     """
     try:
-        response = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-            },
-            timeout=OLLAMA_TIMEOUT,
-        )
-        data = response.json()
-        return data.get("response", "LLM returned empty response")
+        return generate(prompt, model=OLLAMA_MODEL, timeout=OLLAMA_TIMEOUT)
     except Exception as e:
         return f"Ollama call failed: {str(e)}"
 
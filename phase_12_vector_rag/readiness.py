@@ -0,0 +1,90 @@
+"""
+Phase 12 — RAG Readiness
+
+Runs the startup ingestion in a background thread so the API can
+serve predictions immediately, and tracks whether the vector index
+is warm.
+
+States:
+    idle     — no background warm-up was started (scripts, tests);
+               RAG is used lazily exactly as before
+    warming  — ingestion in progress; RAG routes run degraded
+    ready    — index warm
+    failed   — ingestion raised; RAG routes stay degraded
+"""
+
+import threading
+import time
+
+from phase_12_vector_rag.utils import format_timestamp, log_rag
+
+_state = {
+    "status": "idle",
+    "started_at": None,
+    "completed_at": None,
+    "duration_seconds": None,
+    "sources_done": {},
+    "error": None,
+}
+
+_thread = None
+_lock = threading.Lock()
+
+
+def _on_source_done(source: str, count: int) -> None:
+    _state["sources_done"][source] = count
+
+
+def _run_ingestion() -> None:
+    started = time.perf_counter()
+    try:
+        # Heavy imports (chromadb, sentence-transformers) happen here,
+        # off the startup path
+        from phase_12_vector_rag.ingestion_pipeline import run_full_ingestion
+        run_full_ingestion(on_source_done=_on_source_done)
+        _state["status"] = "ready"
+    except Exception as e:
+        _state["status"] = "failed"
+        _state["error"] = str(e)
+        log_rag(f"Warning: background ingestion failed: {e}")
+    finally:
+        _state["completed_at"] = format_timestamp()
+        _state["duration_seconds"] = round(time.perf_counter() - started, 3)
+
+
+def start_background_ingestion() -> None:
+    """Start warm-up ingestion once; later calls are no-ops."""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _state["status"] = "warming"
+        _state["started_at"] = format_timestamp()
+        _thread = threading.Thread(target=_run_ingestion, name="rag-warmup", daemon=True)
+        _thread.start()
+    log_rag("Background ingestion started.")
+
+
+def is_ready() -> bool:
+    """True once the background warm-up completed successfully."""
+    return _state["status"] == "ready"
+
+
+def rag_available() -> bool:
+    """Whether RAG-dependent code paths should query the vector store."""
+    return _state["status"] in ("idle", "ready")
+
+
+def readiness_label() -> str:
+    """ready / warming / degraded, as reported on /health."""
+    status = _state["status"]
+    if status == "ready":
+        return "ready"
+    if status == "failed":
+        return "degraded"
+    return "warming"
+
+
+def get_readiness() -> dict:
+    """Snapshot of the warm-up state for /health."""
+    return {**_state, "sources_done": dict(_state["sources_done"])}
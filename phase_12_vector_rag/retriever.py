@@ -1,15 +1,26 @@
 """
 Phase 12 — Retriever
 
-Semantic search over the ChromaDB vector store with
-plant_id metadata filtering and similarity threshold.
+Hybrid search over the vector store: BM25 lexical hits (exact IDs,
+severities, plant numbers) fused with semantic vector hits, with
+plant_id / doc_type metadata filtering and a similarity threshold.
+When the lexical match is decisive (a rare identifier in the
+question) the question is answered without embedding it.
+Repeated questions are served from the query caches.
 """
 
+import os
+
 from phase_12_vector_rag.embedding_model import encode_text
-from phase_12_vector_rag.vector_store import query
+from phase_12_vector_rag.lexical_index import LEXICAL_INDEX
+from phase_12_vector_rag.query_cache import QUERY_EMBEDDINGS, RETRIEVALS, normalize_query
+from phase_12_vector_rag.vector_store import get_documents, get_generation, iter_documents, query
 from phase_12_vector_rag.config import DEFAULT_TOP_K, SIMILARITY_THRESHOLD
 from phase_12_vector_rag.utils import log_rag
 
+# Share of a document's relevance that lexical evidence can add
+LEXICAL_WEIGHT = float(os.getenv("RAG_LEXICAL_WEIGHT", 0.5))
+
 
 def retrieve_relevant_documents(
     question: str,
@@ -31,11 +42,63 @@ def retrieve_relevant_documents(
         List of dicts, each with:
           - content: document text
           - metadata: metadata dict
-          - distance: L2 distance (lower = more similar)
+          - distance: L2 distance (lower = more similar),
+                      None for decisive lexical hits
+          - lexical_score: BM25 score relative to the best lexical hit
           - relevance_score: normalised 0→1 score
     """
+    generation = get_generation()
+    # Also picks up documents other processes (e.g. a backfill) stored
+    LEXICAL_INDEX.ensure_loaded(iter_documents, total=generation[0])
+    normalized = normalize_query(question)
+    cache_key = (normalized, plant_id, doc_type, top_k, generation)
+    cached = RETRIEVALS.get(cache_key)
+    if cached is not None:
+        return cached
+
+    lexical = LEXICAL_INDEX.search(normalized, top_k=top_k, plant_id=plant_id, doc_type=doc_type)
+    best = lexical["hits"][0][1] if lexical["hits"] else 0.0
+    lexical_scores = {doc_id: score / best for doc_id, score in lexical["hits"]}
+
+    if lexical["decisive"]:
+        log_rag(f"Lexical match on {lexical['identifiers']} — skipping embedding.")
+        candidates = {doc_id: {"distance": None, "vector": 0.0} for doc_id in lexical_scores}
+        stored = get_documents(list(candidates))
+    else:
+        # Lexical evidence only boosts documents that passed the similarity
+        # threshold: BM25 scores are relative, so a lone common token
+        # ("plant") would otherwise surface unrelated documents
+        candidates, stored = _vector_candidates(normalized, plant_id, top_k, doc_type)
+
+    documents = []
+    for doc_id, candidate in candidates.items():
+        if doc_id not in stored:
+            continue
+        lexical_score = lexical_scores.get(doc_id, 0.0)
+        if lexical["decisive"]:
+            relevance = lexical_score
+        else:
+            relevance = candidate["vector"] + LEXICAL_WEIGHT * lexical_score * (1 - candidate["vector"])
+        content, metadata = stored[doc_id]
+        documents.append({
+            "id": doc_id,
+            "content": content,
+            "metadata": metadata,
+            "distance": candidate["distance"],
+            "lexical_score": round(lexical_score, 4),
+            "relevance_score": round(relevance, 4),
+        })
+    documents.sort(key=lambda d: -d["relevance_score"])
+    documents = documents[:top_k]
+
+    RETRIEVALS.put(cache_key, documents)
+    return documents
+
+
+def _vector_candidates(normalized: str, plant_id, top_k: int, doc_type: str) -> tuple:
+    """Vector hits within the similarity threshold: (candidates, stored docs)."""
     # Embed the question
-    query_embedding = encode_text(question)
+    query_embedding = embed_query(normalized)
 
     # Build metadata filter
     filters = {}
@@ -54,7 +117,7 @@ def retrieve_relevant_documents(
     result = query(query_embedding, top_k=top_k, filters=filters if filters else None)
 
     # Parse and rank results
-    documents = []
+    candidates, stored = {}, {}
     ids = result.get("ids", [[]])[0]
     docs = result.get("documents", [[]])[0]
     metas = result.get("metadatas", [[]])[0]
@@ -66,14 +129,19 @@ def retrieve_relevant_documents(
         if distance > SIMILARITY_THRESHOLD:
             continue
 
-        relevance = max(0.0, 1.0 - (distance / SIMILARITY_THRESHOLD))
-
-        documents.append({
-            "id": doc_id,
-            "content": docs[i] if i < len(docs) else "",
-            "metadata": metas[i] if i < len(metas) else {},
+        candidates[doc_id] = {
             "distance": round(distance, 4),
-            "relevance_score": round(relevance, 4),
-        })
+            "vector": max(0.0, 1.0 - (distance / SIMILARITY_THRESHOLD)),
+        }
+        stored[doc_id] = (docs[i] if i < len(docs) else "", metas[i] if i < len(metas) else {})
 
-    return documents
+    return candidates, stored
+
+
+def embed_query(normalized: str) -> list:
+    """Embedding of a normalized question, from the LRU when seen before."""
+    embedding = QUERY_EMBEDDINGS.get(normalized)
+    if embedding is None:
+        embedding = encode_text(normalized)
+        QUERY_EMBEDDINGS.put(normalized, embedding)
+    return embedding
@@ -1,34 +1,88 @@
 """
-Phase 12 — ChromaDB Vector Store
-
-Persistent vector database using ChromaDB.
-Collection: solarops_memory
-Persists to: data/vector_store/
+Phase 12 — Vector Store
+
+Persistent vector database behind add_documents / query / get_stats.
+Backend is chosen with VECTOR_BACKEND:
+  chroma (default) — ChromaDB collection solarops_memory,
+                     persists to data/vector_store/
+  numpy            — memory-mapped exact index (mmap_index),
+                     persists to data/vector_index/
 """
 
 import os
-import chromadb
-from phase_12_vector_rag.config import CHROMA_PERSIST_DIR, CHROMA_COLLECTION_NAME
+import threading
+
+from phase_12_vector_rag.config import (
+    CHROMA_COLLECTION_NAME,
+    CHROMA_PERSIST_DIR,
+    VECTOR_BACKEND,
+    VECTOR_INDEX_DIR,
+    VECTOR_INDEX_DTYPE,
+)
 from phase_12_vector_rag.utils import log_rag
 
-# Ensure persist directory exists
-os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+if VECTOR_BACKEND == "numpy":
+    from phase_12_vector_rag.mmap_index import MmapVectorIndex
 
-# Initialize persistent ChromaDB client
-_client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+    PERSIST_DIR = VECTOR_INDEX_DIR
+    _collection = MmapVectorIndex(VECTOR_INDEX_DIR, dtype=VECTOR_INDEX_DTYPE)
+else:
+    import chromadb
 
-# Get or create collection
-_collection = _client.get_or_create_collection(
-    name=CHROMA_COLLECTION_NAME,
-    metadata={"hnsw:space": "l2"}
-)
+    PERSIST_DIR = CHROMA_PERSIST_DIR
+    # Ensure persist directory exists
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+
+    # Initialize persistent ChromaDB client
+    _client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+
+    # Get or create collection
+    _collection = _client.get_or_create_collection(
+        name=CHROMA_COLLECTION_NAME,
+        metadata={"hnsw:space": "l2"}
+    )
+
+# Bumped whenever this process adds documents; retrieval caches key on it
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def get_generation() -> tuple:
+    """
+    Current store generation: (document count, local add counter).
+
+    The count is read from the shared collection, so documents added
+    by another process (a backfill, another worker's startup
+    ingestion) change the generation too, not just local adds.
+    """
+    return _collection.count(), _generation
+
+
+def document_count() -> int:
+    """Documents in the collection, including other processes' writes."""
+    return _collection.count()
 
 
 def get_collection():
-    """Return the raw ChromaDB collection for advanced use."""
+    """Return the raw collection (Chroma or MmapVectorIndex) for advanced use."""
     return _collection
 
 
+def existing_ids(ids: list) -> set:
+    """
+    Return the subset of ids already present in the collection.
+
+    Only IDs are fetched (no documents, metadatas or embeddings).
+    """
+    if not ids:
+        return set()
+    try:
+        result = _collection.get(ids=list(ids), include=[])
+        return set(result["ids"]) if result and result["ids"] else set()
+    except Exception:
+        return set()
+
+
 def add_documents(ids: list, documents: list, embeddings: list, metadatas: list):
     """
     Add documents to the vector store with duplicate prevention.
@@ -45,13 +99,7 @@ def add_documents(ids: list, documents: list, embeddings: list, metadatas: list)
         return 0
 
     # Filter out duplicates
-    existing = set()
-    try:
-        result = _collection.get(ids=ids)
-        if result and result["ids"]:
-            existing = set(result["ids"])
-    except Exception:
-        pass
+    existing = existing_ids(ids)
 
     new_ids = []
     new_docs = []
@@ -74,9 +122,42 @@ def add_documents(ids: list, documents: list, embeddings: list, metadatas: list)
         embeddings=new_embs,
         metadatas=new_metas,
     )
+    global _generation
+    with _generation_lock:
+        _generation += 1
     return len(new_ids)
 
 
+def get_documents(ids: list) -> dict:
+    """
+    Fetch stored documents by ID.
+
+    Returns:
+        Dict of id -> (content, metadata) for the IDs that exist.
+    """
+    if not ids:
+        return {}
+    try:
+        result = _collection.get(ids=list(ids), include=["documents", "metadatas"])
+    except Exception as e:
+        log_rag(f"Get error: {e}")
+        return {}
+    return {
+        doc_id: (content, metadata or {})
+        for doc_id, content, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+    }
+
+
+def iter_documents(batch_size: int = 1000, offset: int = 0):
+    """Yield (ids, documents, metadatas) batches over the collection, from offset on."""
+    while True:
+        result = _collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+        if not result["ids"]:
+            return
+        yield result["ids"], result["documents"], result["metadatas"]
+        offset += len(result["ids"])
+
+
 def query(query_embedding: list, top_k: int = 5, filters: dict = None) -> dict:
     """
     Search the vector store for similar documents.
@@ -141,5 +222,6 @@ def get_stats() -> dict:
         "documents_per_type": type_counts,
         "last_ingestion_timestamp": last_ingestion,
         "health": "healthy" if total > 0 else "empty",
-        "persist_directory": CHROMA_PERSIST_DIR,
+        "backend": VECTOR_BACKEND,
+        "persist_directory": PERSIST_DIR,
     }
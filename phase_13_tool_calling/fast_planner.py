@@ -0,0 +1,86 @@
+"""
+Phase 13 — Fast Planner
+
+Deterministic planner for questions the rule-based intent
+classifier and scenario detector already understand. Returns a
+plan in the same shape as the LLM planner, or None when it is not
+confident (broadcast questions, hypotheticals without any
+extractable parameter, historical lookups), in which case the
+caller falls back to the LLM.
+"""
+
+import re
+
+from phase_09_agent_orchestration.intent_classifier import INTENT_MAP, classify_intent
+from phase_10_scenario_engine import detect_scenario
+
+# Phase 9 agent name -> Phase 13 tool name
+AGENT_TOOLS = {
+    "ops_agent": "ops_agent",
+    "risk_agent": "risk_agent",
+    "finance_agent": "finance_agent",
+    "executive_agent": "strategy_agent",
+}
+
+# Overrides run_simulation applies from planner args
+SIMULATION_OVERRIDE_KEYS = ("r2", "rmse", "mape", "mae")
+
+_CONDITIONAL_RE = re.compile(r"\b(?:if|would|could|should)\b")
+
+
+def _step(tool: str, reason: str, args: dict = None) -> dict:
+    return {"tool": tool, "args": args or {}, "reason": reason}
+
+
+def _agent_steps(agents: list) -> list:
+    return [
+        _step(AGENT_TOOLS[agent], "Fast path: matched intent keywords")
+        for agent in INTENT_MAP
+        if agent in agents
+    ]
+
+
+def fast_plan(question: str):
+    """
+    Build a plan without the LLM when the rules are confident.
+
+    Args:
+        question: User's natural language query.
+
+    Returns:
+        Plan dict ({"steps": [...]}) or None to defer to the LLM.
+    """
+    intent = classify_intent(question)
+    q = question.lower()
+
+    if intent["routing_type"] == "knowledge_lookup":
+        return None
+
+    if intent["is_hypothetical"]:
+        scenario = detect_scenario(question)["overrides"]
+        overrides = {
+            key: scenario[key] for key in SIMULATION_OVERRIDE_KEYS
+            if scenario.get(key) is not None
+        }
+        # Nothing concrete to simulate: let the LLM interpret it
+        if not overrides and scenario.get("drift_risk") is None:
+            return None
+
+        steps = [_step(
+            "simulation_engine", "Fast path: hypothetical scenario",
+            {"overrides": overrides} if overrides else {},
+        )]
+        matched = {d["routed_to"] for d in intent["detected_intents"]}
+        steps += _agent_steps(matched or set(AGENT_TOOLS))
+        return {"steps": steps}
+
+    # Conditionals the keyword rules missed ("risk if drift increases")
+    if intent["routing_type"] != "targeted" or _CONDITIONAL_RE.search(q):
+        return None
+
+    steps = _agent_steps(intent["selected_agents"])
+    if "drift" in q:
+        steps.append(_step("drift_checker", "Fast path: drift mentioned"))
+    if re.search(r"\blogs?\b", q):
+        steps.append(_step("log_inspector", "Fast path: logs mentioned"))
+    return {"steps": steps}
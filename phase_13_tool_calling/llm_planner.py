@@ -3,25 +3,90 @@ Phase 13 — LLM Planner
 
 Generates a tool execution plan based on user query.
 Uses the LLM to select the most relevant tools.
+
+Planning tries, in order:
+    1. fast_planner — rule-based plan when intent/scenario rules are confident
+    2. plan_cache   — earlier LLM plan for the same question template,
+                      numeric literals re-bound into args.overrides
+    3. the LLM      — result cached for the next question of that shape
+Each plan is tagged with its "source"; counts and per-source latency
+(stage planner_<source>) show how many LLM calls were saved.
 """
 
 import json
+import os
+import threading
+import time
+
+from phase_04_mlops.monitoring.metrics import observe_stage
 from phase_09_agent_orchestration.llm_client import generate_summary
+from phase_09_agent_orchestration.prompt_builder import measure_prompt
+from phase_13_tool_calling.fast_planner import fast_plan
+from phase_13_tool_calling.plan_cache import PLAN_CACHE, canonicalize
 from phase_13_tool_calling.tool_registry import TOOL_REGISTRY
 
+FAST_PATH_ENABLED = os.getenv("PLANNER_FAST_PATH", "1") != "0"
+
+_stats_lock = threading.Lock()
+_stats = {"fast_path": 0, "cache": 0, "llm": 0, "fallback": 0}
+
+
 def plan_tools(question: str) -> dict:
     """
-    Ask LLM which tools to run for the given question.
-    
+    Decide which tools to run for the given question.
+
     Args:
         question: User's natural language query.
-        
+
     Returns:
         dict: {
-            "tools": ["tool_name_1", "tool_name_2"],
-            "reasoning": "Explanation..."
+            "steps": [{"tool": ..., "args": {...}, "reason": ...}],
+            "source": "fast_path" | "cache" | "llm" | "fallback"
         }
     """
+    started = time.perf_counter()
+    plan = fast_plan(question) if FAST_PATH_ENABLED else None
+    source = "fast_path"
+
+    if plan is None:
+        template, literals = canonicalize(question)
+        plan = PLAN_CACHE.get(template, literals)
+        source = "cache"
+        if plan is None:
+            plan, ok = _llm_plan(question)
+            source = "llm" if ok else "fallback"
+            if ok:
+                PLAN_CACHE.put(template, literals, plan)
+
+    plan["source"] = source
+    with _stats_lock:
+        _stats[source] += 1
+    observe_stage(f"planner_{source}", time.perf_counter() - started)
+    return plan
+
+
+def get_planner_stats() -> dict:
+    """Planner source counts and plan cache stats for /health."""
+    with _stats_lock:
+        counts = dict(_stats)
+    total = sum(counts.values())
+    saved = counts["fast_path"] + counts["cache"]
+    return {
+        "plans": counts,
+        "llm_calls_saved": saved,
+        "saved_ratio": round(saved / total, 4) if total else None,
+        "fast_path_enabled": FAST_PATH_ENABLED,
+        "cache": PLAN_CACHE.stats(),
+    }
+
+
+def _llm_plan(question: str) -> tuple:
+    """
+    Ask LLM which tools to run for the given question.
+
+    Returns:
+        (plan, ok): ok is False when the default fallback plan was used.
+    """
     
     # helper to format tool descriptions
     tool_descriptions = "\n".join(
@@ -51,6 +116,7 @@ def plan_tools(question: str) -> dict:
         f"5. IF hypothetical (e.g. \"what if\", \"simulate\"), YOU MUST START with 'simulation_engine'.\n"
     )
     
+    measure_prompt("planner", prompt)
     response_text = generate_summary(prompt)
     
     # Attempt to parse JSON with regex fallback
@@ -86,8 +152,9 @@ def plan_tools(question: str) -> dict:
                     {"tool": "risk_agent", "args": {}, "reason": "Fallback: Default risk check"}
                 ]
             }
+            return plan, False
             
-        return plan
+        return plan, True
         
     except (json.JSONDecodeError, Exception) as e:
         print(f"[LLM PLANNER ERROR] JSON Parse Failed: {e}\nResponse: {response_text}")
@@ -96,4 +163,4 @@ def plan_tools(question: str) -> dict:
                 {"tool": "ops_agent", "args": {}, "reason": "JSON parsing failed"},
                 {"tool": "risk_agent", "args": {}, "reason": "JSON parsing failed"}
             ]
-        }
+        }, False
@@ -0,0 +1,139 @@
+"""
+Phase 13 — Plan Cache
+
+Remembers LLM-generated plans per question template so repeated
+questions ("what if r2 drops to 0.7?", "what if r2 drops to 0.6?")
+skip the planner round trip.
+
+Questions are canonicalized (lowercased, whitespace and trailing
+punctuation normalized) and their numeric literals replaced with
+<num>. Numbers in a plan's args that come from the question are
+stored as slots and re-bound to the new question's literals on a
+hit. Plans whose numbers cannot be traced back to exactly one
+literal (derived or ambiguous values) are not cached.
+"""
+
+import copy
+import os
+import re
+import threading
+from collections import OrderedDict
+
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", 256))
+
+NUM_TOKEN = "<num>"
+
+_NUMBER_RE = re.compile(r"(?<![\w.])(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+)(?![\w])")
+_SLOT = "$literal"
+
+
+def canonicalize(question: str) -> tuple:
+    """
+    Reduce a question to its template and numeric literals.
+
+    Args:
+        question: User's natural language query.
+
+    Returns:
+        (template, literals): e.g. "what if r2 drops to <num>", [0.7]
+    """
+    text = " ".join(question.lower().split()).rstrip("?!. ")
+    literals = []
+
+    def _abstract(match):
+        raw = match.group(1).replace(",", "")
+        literals.append(float(raw) if "." in raw else int(raw))
+        return NUM_TOKEN
+
+    return _NUMBER_RE.sub(_abstract, text), literals
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_slots(value, literals: list):
+    """Replace question literals inside plan args with slot markers."""
+    if isinstance(value, dict):
+        return {k: _to_slots(v, literals) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_slots(v, literals) for v in value]
+    if _is_number(value):
+        positions = [i for i, lit in enumerate(literals) if lit == value]
+        if len(positions) != 1:
+            raise ValueError(f"value {value!r} does not map to exactly one question literal")
+        return {_SLOT: positions[0]}
+    return value
+
+
+def _from_slots(value, literals: list):
+    if isinstance(value, dict):
+        if set(value) == {_SLOT}:
+            return literals[value[_SLOT]]
+        return {k: _from_slots(v, literals) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_slots(v, literals) for v in value]
+    return value
+
+
+class PlanCache:
+    """Thread-safe LRU of plan templates keyed by canonical question."""
+
+    def __init__(self, max_size: int = PLAN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "uncacheable": 0, "evictions": 0}
+
+    def get(self, template: str, literals: list):
+        """Plan re-bound to these literals, or None on a miss."""
+        with self._lock:
+            steps = self._entries.get(template)
+            if steps is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(template)
+            self._stats["hits"] += 1
+        return {"steps": _from_slots(steps, literals)}
+
+    def put(self, template: str, literals: list, plan: dict) -> bool:
+        """
+        Store a plan as a template. Returns False if it is not cacheable.
+        """
+        if self.max_size <= 0:
+            return False
+        try:
+            steps = [
+                {**step, "args": _to_slots(step.get("args", {}), literals)}
+                for step in copy.deepcopy(plan.get("steps", []))
+            ]
+        except ValueError:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return False
+
+        with self._lock:
+            self._entries[template] = steps
+            self._entries.move_to_end(template)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+            }
+
+
+PLAN_CACHE = PlanCache()
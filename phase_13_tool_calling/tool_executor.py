@@ -3,61 +3,168 @@ Phase 13 — Tool Executor
 
 Executes a list of selected tools safely.
 Handles errors and aggregates results.
+
+Steps are scheduled as a dependency DAG built from the reads/writes
+each tool declares in TOOL_REGISTRY: a step waits for every earlier
+step it conflicts with (write/read, read/write or write/write on the
+same shared_state key) and everything else runs concurrently in a
+shared thread pool. So a simulation_engine step still runs after the
+tools planned before it that read metrics, and before the tools
+planned after it, while independent lookups (drift, logs) overlap.
 """
 
-from phase_13_tool_calling.tool_registry import TOOL_REGISTRY
+import os
 import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 from pydantic import ValidationError
 
+from phase_13_tool_calling.tool_registry import TOOL_REGISTRY
+
+MAX_TOOL_WORKERS = int(os.getenv("TOOL_EXECUTOR_WORKERS", 4))
+
+_pool = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS, thread_name_prefix="tool")
+
+# Undeclared tools conflict with every other step
+_EVERYTHING = None
+
+
+def _access(name: str):
+    """(reads, writes) key sets declared for a tool, or _EVERYTHING."""
+    info = TOOL_REGISTRY.get(name)
+    if info is None:
+        return frozenset(), frozenset()  # unknown tools only produce an error
+    if "reads" not in info or "writes" not in info:
+        return _EVERYTHING, _EVERYTHING
+    return frozenset(info["reads"]), frozenset(info["writes"])
+
+
+def _conflicts(earlier, later) -> bool:
+    reads_a, writes_a = earlier
+    reads_b, writes_b = later
+    # Undeclared tools behave as full barriers
+    if _EVERYTHING in (reads_a, writes_a, reads_b, writes_b):
+        return True
+    return bool(writes_a & (reads_b | writes_b)) or bool(writes_b & reads_a)
+
+
+def build_dependencies(tool_names: list) -> list:
+    """
+    Dependency DAG for a planned sequence of tools.
+
+    Args:
+        tool_names: Tool names in plan order.
+
+    Returns:
+        List of sets: deps[i] holds the indices of earlier steps
+        that must finish before step i starts.
+    """
+    access = [_access(name) for name in tool_names]
+    return [
+        {j for j in range(i) if _conflicts(access[j], access[i])}
+        for i in range(len(tool_names))
+    ]
+
+
+def _run_tool(name: str, state: dict) -> dict:
+    """Run one tool against its state view, with schema validation."""
+    if name not in TOOL_REGISTRY:
+        return {name: {"error": f"Tool '{name}' not found in registry."}}
+
+    try:
+        # Execute the tool function
+        func = TOOL_REGISTRY[name]["func"]
+        output = func(state)
+
+        # SCHEMA VALIDATION
+        schema_model = TOOL_REGISTRY[name].get("schema")
+        if schema_model:
+            try:
+                # Validate output against expected Pydantic schema
+                validated = schema_model(**output)
+                output = validated.model_dump() # Convert back to dict
+            except ValidationError as ve:
+                print(f"[TOOL EXECUTOR ERROR] Schema Validation Failed for {name}: {ve}")
+                output = {"error": f"Schema validation failed: {ve}"}
+
+        return output
+
+    except Exception as e:
+        print(f"[TOOL EXECUTOR ERROR] Failed to run {name}: {e}")
+        return {
+            name: {
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+        }
+
+
+def _state_for(name: str, shared_state: dict, tool_args: dict) -> dict:
+    """
+    Writers get the real shared_state (they run after all conflicting
+    steps); readers get a shallow view so per-step args never race.
+    """
+    _, writes = _access(name)
+    if writes is _EVERYTHING or writes:
+        shared_state["args"] = tool_args
+        return shared_state
+    return {**shared_state, "args": tool_args}
+
+
+def iter_plan_execution(steps: list, shared_state: dict):
+    """
+    Execute planned steps concurrently where the DAG allows.
+
+    Args:
+        steps: Planner steps ({"tool", "args"}) in plan order.
+        shared_state: Mutable shared context; only writer tools mutate it.
+
+    Yields:
+        (index, step, result) in completion order.
+    """
+    names = [step["tool"] for step in steps]
+    deps = build_dependencies(names)
+    remaining = {i: set(d) for i, d in enumerate(deps)}
+    running = {}
+
+    def submit_ready():
+        for i in [i for i, d in remaining.items() if not d]:
+            del remaining[i]
+            state = _state_for(names[i], shared_state, steps[i].get("args", {}))
+            running[_pool.submit(_run_tool, names[i], state)] = i
+
+    submit_ready()
+    while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = running.pop(future)
+            for d in remaining.values():
+                d.discard(i)
+            yield i, steps[i], future.result()
+        submit_ready()
+
+
 def execute_tools(tool_names: list, shared_state: dict, args_map: dict = None) -> dict:
     """
     Run specific tools from the registry.
-    
+
     Args:
         tool_names: List of strings (keys in TOOL_REGISTRY).
-        shared_state: Mutable shared context dict updated by tools sequentially.
+        shared_state: Mutable shared context dict updated by writer tools.
         args_map: Dict mapping tool_name -> args dict.
-        
+
     Returns:
-        dict: Aggregated results from all tools.
+        dict: Aggregated results from all tools (merged in plan order).
     """
-    results = {}
     if args_map is None:
         args_map = {}
-    
-    for name in tool_names:
-        if name not in TOOL_REGISTRY:
-            results[name] = {"error": f"Tool '{name}' not found in registry."}
-            continue
-            
-        try:
-            # Execute the tool function
-            func = TOOL_REGISTRY[name]["func"]
-            tool_args = args_map.get(name, {})
-            
-            # Pass args via shared_state explicitly for this tool
-            shared_state["args"] = tool_args
-            
-            output = func(shared_state)
-            
-            # SCHEMA VALIDATION
-            schema_model = TOOL_REGISTRY[name].get("schema")
-            if schema_model:
-                try:
-                    # Validate output against expected Pydantic schema
-                    validated = schema_model(**output)
-                    output = validated.model_dump() # Convert back to dict
-                except ValidationError as ve:
-                    print(f"[TOOL EXECUTOR ERROR] Schema Validation Failed for {name}: {ve}")
-                    output = {"error": f"Schema validation failed: {ve}"}
-            
-            results.update(output)
-            
-        except Exception as e:
-            print(f"[TOOL EXECUTOR ERROR] Failed to run {name}: {e}")
-            results[name] = {
-                "error": str(e),
-                "traceback": traceback.format_exc()
-            }
-            
+
+    steps = [{"tool": name, "args": args_map.get(name, {})} for name in tool_names]
+    outputs = [None] * len(steps)
+    for i, _, output in iter_plan_execution(steps, shared_state):
+        outputs[i] = output
+
+    results = {}
+    for output in outputs:
+        results.update(output)
     return results
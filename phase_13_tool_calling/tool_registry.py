@@ -3,6 +3,11 @@ Phase 13 — Tool Registry
 
 Maps tool names to their execution functions.
 Central source of truth for available tools.
+
+Each entry declares which shared_state keys the tool reads and
+writes; the executor orders conflicting steps and runs the rest
+concurrently. A tool without declarations is treated as touching
+everything, i.e. it runs alone.
 """
 
 from phase_08_agent.ops_agent import ops_analysis
@@ -98,36 +103,50 @@ TOOL_REGISTRY = {
     "ops_agent": {
         "func": run_ops_agent,
         "desc": "Analyzes operational metrics (RMSE, R2) to detect performance issues.",
-        "schema": OpsAnalysisOutput
+        "schema": OpsAnalysisOutput,
+        "reads": ("metrics",),
+        "writes": ()
     },
     "risk_agent": {
         "func": run_risk_agent,
         "desc": "Calcuates overall risk level and estimated financial loss.",
-        "schema": RiskAssessmentOutput
+        "schema": RiskAssessmentOutput,
+        "reads": ("metrics",),
+        "writes": ()
     },
     "finance_agent": {
         "func": run_finance_agent,
         "desc": "Evaluates financial implications of model performance.",
-        "schema": FinanceAnalysisOutput
+        "schema": FinanceAnalysisOutput,
+        "reads": ("metrics",),
+        "writes": ()
     },
     "strategy_agent": {
         "func": run_strategy_agent,
         "desc": "Provides executive strategic recommendations.",
-        "schema": StrategySummaryOutput
+        "schema": StrategySummaryOutput,
+        "reads": ("metrics",),
+        "writes": ()
     },
     "drift_checker": {
         "func": check_drift_status,
         "desc": "Checks for data drift and model degradation.",
-        "schema": DriftStatusOutput
+        "schema": DriftStatusOutput,
+        "reads": (),  # reads artifacts from disk, not shared_state
+        "writes": ()
     },
     "log_inspector": {
         "func": fetch_recent_logs,
         "desc": "Retrieves recent prediction logs for debugging.",
-        "schema": None # No strict schema for logs right now
+        "schema": None, # No strict schema for logs right now
+        "reads": (),
+        "writes": ()
     },
     "simulation_engine": {
         "func": run_simulation,
         "desc": "Simulates hypothetical scenarios by modifying metrics based on user query.",
-        "schema": SimulationOutput
+        "schema": SimulationOutput,
+        "reads": ("question", "metrics", "drift_status"),
+        "writes": ("metrics", "drift_status", "overrides_applied")
     }
 }
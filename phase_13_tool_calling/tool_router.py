@@ -6,28 +6,30 @@ Replaces static rules with LLM-driven planning and execution.
 
 Flow:
 1. User Question -> LLM Planner
-2. Plan -> Tool Executor
+2. Plan -> Tool Executor (dependency-aware, concurrent)
 3. Results -> LLM Summarizer
 """
 
-import json
 from datetime import datetime
 
 from phase_09_agent_orchestration.llm_client import generate_summary
+from phase_09_agent_orchestration.prompt_builder import Section, build_prompt
 from phase_09_agent_orchestration.tools import get_model_metrics
 from phase_13_tool_calling.llm_planner import plan_tools
-from phase_13_tool_calling.tool_executor import execute_tools
+from phase_13_tool_calling.tool_executor import iter_plan_execution
 
-def run_dynamic_orchestration(question: str, plant_id: int = 1) -> dict:
+def iter_dynamic_orchestration(question: str, plant_id: int = 1):
     """
-    Orchestrate the AI agent using dynamic tool selection.
-    
+    Plan and execute tools step by step, yielding progress events.
+
     Args:
         question: User's query.
         plant_id: Context identifier.
-        
-    Returns:
-        Structured response with plan, execution results, and summary.
+
+    Yields:
+        ("plan", plan), then ("tool_result", {"tool", "args", "result"})
+        per executed step, and finally ("tools_done", state) with
+        plan, steps, tool_results, shared_state and started_at.
     """
     started_at = datetime.utcnow().isoformat()
     
@@ -44,45 +46,100 @@ def run_dynamic_orchestration(question: str, plant_id: int = 1) -> dict:
     print(f"🤔 Planning tools for: {question}")
     plan = plan_tools(question)
     steps = plan.get("steps", [])
+    yield "plan", plan
     
-    # 3. Execute (Run Tools Sequentially)
+    # 3. Execute (dependency DAG: independent tools run concurrently,
+    # steps conflicting with simulation_engine keep their plan order)
     print(f"🛠️  Executing steps: {[s['tool'] for s in steps]}")
-    tool_results = {}
+    outputs = [None] * len(steps)
     
-    for step in steps:
-        tool_name = step["tool"]
-        tool_args = step.get("args", {})
-        
-        # Execute tool with CURRENT shared_state
-        # Simulation engine will update the shared_state in place.
-        result = execute_tools([tool_name], shared_state, args_map={tool_name: tool_args})
-        tool_results.update(result)
+    for index, step, result in iter_plan_execution(steps, shared_state):
+        outputs[index] = result
         
         # Log when simulation updates the context implicitly
-        if tool_name == "simulation_engine":
+        if step["tool"] == "simulation_engine":
              print(f"   🔄 SharedState updated with Simulation Data (Hypothetical Mode)")
 
-    # 4. Synthesize (LLM Summary)
-    summary_prompt = (
-        f"User Question: {question}\n\n"
-        f"Execution Plan: {json.dumps(steps, indent=2)}\n\n"
-        f"Tool Outputs:\n{json.dumps(tool_results, indent=2)}\n\n"
-        f"Task: Provide a concise executive summary and final answer based on the tool outputs."
-    )
+        yield "tool_result", {"tool": step["tool"], "args": step.get("args", {}), "step": index, "result": result}
+
+    # Merge in plan order so results do not depend on completion order
+    tool_results = {}
+    for result in outputs:
+        tool_results.update(result)
+
+    yield "tools_done", {
+        "plan": plan,
+        "steps": steps,
+        "tool_results": tool_results,
+        "shared_state": shared_state,
+        "started_at": started_at
+    }
+
+
+# Summary prompt priority per tool output (higher survives truncation longer)
+OUTPUT_PRIORITY = {
+    "simulation_result": 6,
+    "risk_assessment": 6,
+    "finance_analysis": 5,
+    "ops_analysis": 5,
+    "strategy_summary": 4,
+    "drift_status": 4,
+    "recent_logs": 1,
+}
+
+
+def build_summary_prompt(question: str, steps: list, tool_results: dict) -> tuple:
+    """
+    Prompt for the final LLM summary of the executed plan.
+
+    Returns:
+        (prompt, report) from the token-budgeted prompt builder.
+    """
+    plan = [
+        {"tool": s["tool"], **({"args": s["args"]} if s.get("args") else {})}
+        for s in steps
+    ]
+    return build_prompt("summary", [
+        Section("User Question", question),
+        Section("Execution Plan", plan, priority=2),
+        *(
+            Section(f"Tool Output {name}", output, priority=OUTPUT_PRIORITY.get(name, 3))
+            for name, output in tool_results.items()
+        ),
+        Section("Task", "Provide a concise executive summary and final answer based on the tool outputs."),
+    ])
+
+
+def run_dynamic_orchestration(question: str, plant_id: int = 1) -> dict:
+    """
+    Orchestrate the AI agent using dynamic tool selection.
     
-    final_answer = generate_summary(summary_prompt)
+    Args:
+        question: User's query.
+        plant_id: Context identifier.
+        
+    Returns:
+        Structured response with plan, execution results, and summary.
+    """
+    for event, state in iter_dynamic_orchestration(question, plant_id):
+        pass
+
+    # 4. Synthesize (LLM Summary)
+    prompt, prompt_report = build_summary_prompt(question, state["steps"], state["tool_results"])
+    final_answer = generate_summary(prompt)
     
     # 5. Construct Response
     return {
         "orchestration_type": "llm_dynamic_planning",
         "question": question,
-        "plan": plan,
-        "tool_results": tool_results,
+        "plan": state["plan"],
+        "tool_results": state["tool_results"],
         "final_answer": final_answer,
-        "shared_state": shared_state,  # Added this to return the final mutated state!
+        "shared_state": state["shared_state"],  # Added this to return the final mutated state!
         "metadata": {
-            "started_at": started_at,
+            "started_at": state["started_at"],
             "completed_at": datetime.utcnow().isoformat(),
-            "tools_used": [s['tool'] for s in steps]
+            "tools_used": [s['tool'] for s in state["steps"]],
+            "prompt": prompt_report
         }
     }
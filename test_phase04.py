@@ -0,0 +1,577 @@
+"""Phase 4 — MLOps Serving Test Suite"""
+
+import os
+import sys
+import math
+import sqlite3
+import tempfile
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from phase_04_mlops.drift.streaming_drift import StreamingDriftEngine, build_reference
+from phase_04_mlops.logging import logger as prediction_logger
+from phase_04_mlops.logging import prediction_store
+from phase_04_mlops.monitoring import metrics as service_metrics
+from phase_04_mlops.monitoring import startup_report
+from phase_04_mlops.serving import artifact_cache, model_pool
+from phase_04_mlops.serving.batch_inference import predict_batch, score_anomalies
+from phase_04_mlops.serving.feature_layout import forecast_layout, without_feature_names
+from phase_04_mlops.serving.telemetry import PDM_FEATURES, TelemetryStore, parse_ndjson
+from phase_04_mlops.storage import ops_store
+
+
+def _fit_regressor(offset):
+    from xgboost import XGBRegressor
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        rng.random((200, 5)) * [2, 4000, 24, 31, 12],
+        columns=["plant_id", "DC_POWER", "hour", "day", "month"]
+    )
+    y = X["DC_POWER"] * 0.1 + offset
+    return XGBRegressor(n_estimators=10, max_depth=3).fit(X, y)
+
+
+def test_model_pool():
+    print("TEST: Forecast model pool")
+    model_pool.clear_pool()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        base_path = os.path.join(model_dir, "xgb_base_model.pkl")
+        ft_path = os.path.join(model_dir, "xgb_plant_1_ft.pkl")
+        joblib.dump({"name": "base"}, base_path)
+        joblib.dump({"name": "plant_1"}, ft_path)
+
+        # Fine-tuned plant resolves to its own artifact
+        m1, key1 = model_pool.get_forecast_model(1, model_dir)
+        assert m1["name"] == "plant_1" and key1 == "xgb_plant_1_ft.pkl"
+
+        # Plants without a fine-tuned model share the base model object
+        m2, key2 = model_pool.get_forecast_model(2, model_dir)
+        m3, key3 = model_pool.get_forecast_model(3, model_dir)
+        assert m2 is m3 and key2 == key3 == "xgb_base_model.pkl"
+
+        stats = model_pool.get_pool_stats()
+        assert stats["misses"] == 2 and stats["hits"] == 1
+        print(f"  hits={stats['hits']} misses={stats['misses']}")
+
+        # Rewriting the artifact on disk swaps the pool entry
+        joblib.dump({"name": "plant_1_v2", "pad": "x" * 64}, ft_path)
+        m1b, _ = model_pool.get_forecast_model(1, model_dir)
+        assert m1b["name"] == "plant_1_v2"
+        assert model_pool.get_pool_stats()["reloads"] == 1
+        print("  mtime/size invalidation: OK")
+
+    model_pool.clear_pool()
+    print("  PASSED\n")
+
+
+def test_batch_inference():
+    print("TEST: Vectorized multi-plant batch inference")
+    model_pool.clear_pool()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        joblib.dump(_fit_regressor(0), os.path.join(model_dir, "xgb_base_model.pkl"))
+        joblib.dump(_fit_regressor(500), os.path.join(model_dir, "xgb_plant_1_ft.pkl"))
+
+        original_dir = model_pool.MODEL_DIR
+        model_pool.MODEL_DIR = model_dir
+        try:
+            columns = {
+                "plant_id": np.array([2, 1, 3, 1, 2]),
+                "DC_POWER": np.array([100.0, 2000.0, 3000.0, 50.0, 800.0]),
+                "hour": np.array([10, 12, 14, 9, 11]),
+                "day": np.array([1, 2, 3, 4, 5]),
+                "month": np.array([5, 5, 5, 6, 6]),
+            }
+            predictions, models_used = predict_batch(columns)
+
+            assert models_used == {"xgb_base_model.pkl": 3, "xgb_plant_1_ft.pkl": 2}
+
+            # Row order and values must match the single-row DataFrame path
+            for i, plant_id in enumerate(columns["plant_id"]):
+                model, _ = model_pool.get_forecast_model(int(plant_id))
+                df = pd.DataFrame([{k: v[i] for k, v in columns.items()}])
+                df = df.reindex(columns=model.get_booster().feature_names, fill_value=0)
+                assert abs(model.predict(df)[0] - predictions[i]) < 1e-3
+            print(f"  models_used: {models_used}")
+        finally:
+            model_pool.MODEL_DIR = original_dir
+
+    model_pool.clear_pool()
+    print("  PASSED\n")
+
+
+def test_feature_layout():
+    from types import SimpleNamespace
+
+    print("TEST: Precompiled feature layout (zero-DataFrame path)")
+    model = _fit_regressor(0)
+    entry = {"model": model}
+    layout = forecast_layout(entry)
+    assert forecast_layout(entry) is layout  # compiled once per entry
+
+    for dc in (0.0, 1234.5, 3999.0):
+        request = SimpleNamespace(plant_id=1, DC_POWER=dc, hour=12, day=3, month=7)
+        df = pd.DataFrame([vars(request)]).reindex(
+            columns=model.get_booster().feature_names, fill_value=0
+        )
+        assert abs(model.predict(df)[0] - layout.predict(request)[0]) < 1e-3
+
+    assert layout.row(request).dtype == np.float32
+    print("  parity with pandas path: OK")
+    print("  PASSED\n")
+
+
+def test_async_prediction_logger():
+    import queue
+    import threading
+    import time
+
+    print("TEST: Buffered asynchronous prediction logger")
+    prediction_logger.stop_writer()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        original = (prediction_store._store, prediction_logger._queue, prediction_logger.LOG_QUEUE_POLICY)
+        prediction_store._store = prediction_store.PredictionLogStore(log_dir)
+        try:
+            # Rows stay queued until the writer group-commits them
+            for i in range(10):
+                prediction_logger.log_prediction("predict-power", i, None, i * 2.0, "success", "plant_1")
+            prediction_logger.log_predictions(
+                {"endpoint": "predict-power-batch", "dc_power": 1.0, "ac_power": None,
+                 "prediction": 2.0, "status": "success", "model_version": "plant_2"}
+                for _ in range(5)
+            )
+            prediction_logger.stop_writer()
+
+            rows = prediction_store.tail_predictions(100)
+            assert len(rows) == 15
+            assert rows[0]["endpoint"] == "predict-power" and rows[0]["ac_power"] is None
+            assert rows[-1]["model_version"] == "plant_2"
+            print(f"  rows flushed on stop: {len(rows)}")
+
+            # A full queue behind a dead writer neither hangs shutdown nor loses rows
+            prediction_logger._queue = queue.Queue(maxsize=2)
+            for i in range(2):
+                prediction_logger._queue.put((1_700_000_000.0 + i, "predict-power", i, None, 1.0, "success", "dead"))
+            prediction_logger._writer = threading.Thread(target=lambda: None)
+            prediction_logger._writer.start()
+            prediction_logger._writer.join()
+            started = time.monotonic()
+            prediction_logger.stop_writer(timeout=0.2)
+            assert time.monotonic() - started < 1.0
+            assert prediction_logger._queue.empty()
+            assert [r["model_version"] for r in prediction_store.tail_predictions(100)].count("dead") == 2
+
+            # Drop policy: a full queue discards instead of blocking
+            prediction_logger._queue = queue.Queue(maxsize=1)
+            prediction_logger.LOG_QUEUE_POLICY = "drop"
+            prediction_logger._queue.put(["pending"])
+            dropped_before = prediction_logger.get_logger_stats()["dropped"]
+            prediction_logger._writer = threading.Thread(target=lambda: None)  # never started
+            prediction_logger.log_prediction("detect-anomaly", 1, 1, -1, "abnormal_rule", "v1")
+            assert prediction_logger.get_logger_stats()["dropped"] == dropped_before + 1
+            print("  drop policy: OK")
+        finally:
+            prediction_logger._writer = None
+            prediction_store._store.close()
+            prediction_store._store, prediction_logger._queue, prediction_logger.LOG_QUEUE_POLICY = original
+
+    print("  PASSED\n")
+
+
+def test_streaming_drift():
+    import time
+
+    print("TEST: Streaming windowed drift engine")
+    rng = np.random.default_rng(1)
+    training = np.concatenate([np.zeros(5000), rng.uniform(0, 10000, 5000)])
+    engine = StreamingDriftEngine({"DC_POWER": build_reference(training)}, window_size=512)
+
+    # A window drawn from the training distribution stays LOW,
+    # and one extreme reading does not flip it
+    for v in rng.choice(training, 600):
+        engine.update(1, "DC_POWER", v)
+    engine.update(1, "DC_POWER", 12899.0)
+    stable = engine.status(1)["plants"]["1"]["DC_POWER"]
+    assert stable["drift_risk"] == "LOW", stable
+    print(f"  in-distribution: psi={stable['psi']} ks={stable['ks']}")
+
+    # A sustained shift (no night-time zeros, all high output) is HIGH
+    for v in rng.uniform(9000, 12000, 600):
+        flagged = engine.update(2, "DC_POWER", v)
+    shifted = engine.status(2)["plants"]["2"]["DC_POWER"]
+    assert shifted["drift_risk"] == "HIGH" and flagged, shifted
+    assert engine.status()["drift_risk"] == "HIGH"
+    print(f"  shifted: psi={shifted['psi']} ks={shifted['ks']}")
+
+    # Request-path cost stays in the microsecond range
+    values = rng.uniform(0, 10000, 20000).tolist()
+    started = time.perf_counter()
+    for v in values:
+        engine.update(3, "DC_POWER", v)
+    per_update_us = (time.perf_counter() - started) / len(values) * 1e6
+    assert per_update_us < 50
+    print(f"  update cost: {per_update_us:.2f} µs/value")
+    print("  PASSED\n")
+
+
+def test_batch_anomaly_scoring():
+    from sklearn.ensemble import IsolationForest
+
+    print("TEST: Batch anomaly scoring")
+    rng = np.random.default_rng(2)
+    features = ["DC_POWER", "AC_POWER", "ac_lag_1", "dc_lag_1"]
+    train = pd.DataFrame(rng.normal(500, 50, (500, 4)), columns=features)
+    model = IsolationForest(random_state=0).fit(train)
+
+    X = np.vstack([rng.normal(500, 50, (20, 4)), [[5000, 10, 0, 0], [9000, 9000, 9000, 9000]]]).astype(np.float32)
+    rule_mask = (X[:, 0] > 3000) & (X[:, 1] < 100)
+    array_model = without_feature_names(model, features)
+    assert array_model is not model and list(model.feature_names_in_) == features
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        labels, scores = score_anomalies(array_model, X, rule_mask)
+        assert not caught  # nothing to warn about: no stored names to check
+    try:
+        without_feature_names(model, features[::-1])
+        raise AssertionError("column order mismatch was not detected")
+    except ValueError:
+        pass
+
+    assert rule_mask.sum() == 1 and labels[20] == -1 and np.isnan(scores[20])
+    expected = model.predict(pd.DataFrame(X[~rule_mask], columns=features))
+    assert (labels[~rule_mask] == expected).all()
+    assert np.allclose(scores[~rule_mask], model.score_samples(pd.DataFrame(X[~rule_mask], columns=features)))
+    print(f"  abnormal: {(labels == -1).sum()} / {len(labels)} (rule: {rule_mask.sum()})")
+    print("  PASSED\n")
+
+
+def test_telemetry_features():
+    print("TEST: Server-side PdM telemetry features")
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({"DC_POWER": rng.uniform(0, 8000, 60), "AC_POWER": rng.uniform(0, 800, 60)})
+
+    # Reference: the notebook's shift / rolling definitions
+    df["ac_lag_1"] = df["AC_POWER"].shift(1)
+    df["ac_lag_24"] = df["AC_POWER"].shift(24)
+    df["dc_lag_1"] = df["DC_POWER"].shift(1)
+    df["dc_lag_24"] = df["DC_POWER"].shift(24)
+    df["ac_roll_mean_6"] = df["AC_POWER"].rolling(window=6).mean()
+    df["dc_roll_mean_6"] = df["DC_POWER"].rolling(window=6).mean()
+
+    store = TelemetryStore()
+    readings = [
+        {"inverter_id": "INV-1", "timestamp": f"2020-05-15T{i // 4:02d}:{i % 4 * 15:02d}:00",
+         "DC_POWER": dc, "AC_POWER": ac}
+        for i, (dc, ac) in enumerate(zip(df["DC_POWER"], df["AC_POWER"]))
+    ]
+    out = store.ingest(readings)
+
+    assert all(f is None for f in out[:24])
+    for i in range(24, len(df)):
+        assert np.allclose(out[i], df.loc[i, list(PDM_FEATURES)].values.astype(float))
+
+    # Re-sent reading is rejected, other inverters are independent
+    assert store.ingest([readings[-1]]) == ["out_of_order"]
+    assert store.ingest([{**readings[0], "inverter_id": "INV-2"}]) == [None]
+    assert store.stats()["inverters_tracked"] == 2
+
+    # Non-finite values are rejected and never reach the running sums
+    rejected = store.stats()["readings_rejected"]
+    bad = [{"inverter_id": "INV-4", "DC_POWER": float("nan"), "AC_POWER": 1.0},
+           {"inverter_id": "INV-4", "DC_POWER": 1.0, "AC_POWER": float("inf")}]
+    assert all(r.startswith("invalid reading") for r in store.ingest(bad))
+    assert store.stats()["readings_rejected"] == rejected + 2
+    clean = store.ingest([{"inverter_id": "INV-4", "DC_POWER": 10.0, "AC_POWER": 1.0}] * 40)
+    assert all(math.isfinite(v) for v in clean[-1])
+    assert store.ingest(parse_ndjson(b'{"inverter_id": "INV-4", "DC_POWER": NaN, "AC_POWER": 1}')[0])[0] \
+        .startswith("invalid reading")
+
+    # Timestamps compare as instants, whatever the offset notation
+    assert store.ingest([{**readings[0], "inverter_id": "INV-5", "timestamp": "2020-05-15T00:00:00.5Z"}]) == [None]
+    assert store.ingest([{**readings[0], "inverter_id": "INV-5", "timestamp": "2020-05-15T00:00:00+00:00"}]) \
+        == ["out_of_order"]
+    assert store.ingest([{**readings[0], "inverter_id": "INV-5", "timestamp": "not a time"}])[0] \
+        .startswith("invalid reading")
+
+    # Malformed NDJSON lines are per-line errors, not request failures
+    body = b"\n".join([
+        b'{"inverter_id": "INV-3", "DC_POWER": 1, "AC_POWER": 2}',
+        b"[1,2]", b'"x"', b"5", b"{oops", b"\xff\xfe", b"",
+        b'{"inverter_id": "INV-3", "AC_POWER": 2}',
+    ])
+    parsed, errors = parse_ndjson(body)
+    assert [e["line"] for e in errors] == [2, 3, 4, 5, 6]
+    assert errors[4]["error"] == "invalid UTF-8"
+    assert len(parsed) == 2 and store.ingest(parsed)[1].startswith("invalid reading")
+    print(f"  {len(df) - 24} feature rows match pandas shift/rolling")
+    print("  PASSED\n")
+
+
+def test_artifact_cache():
+    print("TEST: JSON artifact cache")
+    import copy
+    import json
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "evaluation_report.json")
+        with open(path, "w") as f:
+            json.dump({"metrics": {"r2": 0.97, "rmse": 12.0}, "history": [1, 2]}, f)
+
+        first = artifact_cache.load_json(path)
+        assert artifact_cache.load_json(path) is first  # parsed once
+        assert artifact_cache.get_cache_stats()["files"]["evaluation_report.json"]["hits"] == 1
+
+        # Shared views are read-only, copies are plain and mutable
+        for mutate in (
+            lambda: first.__setitem__("x", 1),
+            lambda: first["metrics"].update(r2=0.5),
+            lambda: first["history"].append(3),
+        ):
+            try:
+                mutate()
+                raise AssertionError("cached artifact was mutated")
+            except TypeError:
+                pass
+        simulated = copy.deepcopy(first)
+        simulated["metrics"]["r2"] = 0.5
+        assert type(simulated["history"]) is list and first["metrics"]["r2"] == 0.97
+        assert json.loads(json.dumps(first)) == {"metrics": {"r2": 0.97, "rmse": 12.0}, "history": [1, 2]}
+
+        # Rewritten file is re-parsed
+        with open(path, "w") as f:
+            json.dump({"metrics": {"r2": 0.91}}, f)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+        assert artifact_cache.load_json(path)["metrics"]["r2"] == 0.91
+        assert artifact_cache.get_cache_stats()["files"]["evaluation_report.json"]["reloads"] == 1
+
+        assert artifact_cache.load_json(os.path.join(tmp, "missing.json"), default=[]) == []
+    print("  PASSED\n")
+
+
+def test_service_metrics():
+    print("TEST: Route latency histograms / Prometheus export")
+    import json
+
+    series = service_metrics.route_series("POST", "/test-route")
+    for ms in range(1, 101):
+        series.start()
+        series.finish(ms / 1000, 500 if ms == 100 else 200, ms == 100)
+
+    summary = service_metrics.get_latency_summary()["POST /test-route"]
+    assert summary["requests"] == 100 and summary["errors"] == 1 and summary["in_flight"] == 0
+    assert 25 <= summary["p50_ms"] <= 50 and summary["p99_ms"] <= 100
+
+    # Another (exited) worker's snapshot is merged; its in-flight gauge is dropped
+    with tempfile.TemporaryDirectory() as tmp:
+        other = service_metrics._local_snapshot()
+        other["pid"] = 2 ** 22 + 12345
+        other["routes"]["POST /test-route"]["in_flight"] = 3
+        with open(os.path.join(tmp, f"metrics_{other['pid']}.json"), "w") as f:
+            json.dump(other, f)
+
+        service_metrics.MULTIPROC_DIR = tmp
+        try:
+            merged = service_metrics.collect()
+            text = service_metrics.render_prometheus()
+        finally:
+            service_metrics.MULTIPROC_DIR = None
+
+    route = merged["routes"]["POST /test-route"]
+    assert merged["workers"] == 2 and route["latency"]["count"] == 200 and route["in_flight"] == 0
+    assert 'solarops_http_requests_total{method="POST",route="/test-route",status="500"} 2' in text
+    assert 'solarops_http_request_duration_seconds_bucket{method="POST",route="/test-route",le="+Inf"} 200' in text
+    print("  PASSED\n")
+
+
+def test_startup_report():
+    print("TEST: startup import budget")
+    with startup_report.startup_phase("test_phase"):
+        sum(range(1000))
+
+    phase = startup_report.get_startup_report()["phases"][-1]
+    assert phase["subsystem"] == "test_phase" and phase["ms"] >= 0
+
+    # First use is recorded once; later calls hit sys.modules
+    # (a module no other test imports, so the first use happens here)
+    sys.modules.pop("colorsys", None)
+    module = startup_report.lazy_import("colors", "colorsys")
+    assert startup_report.lazy_import("colors", "colorsys") is module
+    deferred = startup_report.get_startup_report()["deferred"]
+    assert deferred["colors"]["module"] == "colorsys"
+    assert "sentence_transformers" not in sys.modules
+    print("  PASSED\n")
+
+
+def test_prediction_log_store():
+    print("TEST: Segmented prediction log store")
+    import glob
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        store = prediction_store.PredictionLogStore(
+            log_dir, max_segment_bytes=100 * prediction_store.RECORD.size, index_stride=16
+        )
+        base = 1_700_000_000.0
+        for batch in range(10):
+            rows = [
+                (base + batch * 100 + i, "predict-power", i, None, i * 0.5, "success", f"plant_{batch % 3}")
+                for i in range(100 if batch < 9 else 99)
+            ]
+            if batch == 9:
+                # Out-of-order enqueue time is clamped to keep the segment sorted
+                rows.append((base + 500, "detect-anomaly", 1.0, 2.0, -1, "abnormal_rule", "v1"))
+            store.append(rows)
+        assert store.stats()["segments"] == 10
+        assert len(glob.glob(os.path.join(log_dir, "*.idx"))) == 10
+
+        tail = store.tail(3)
+        assert [r["prediction"] for r in tail] == [48.5, 49.0, -1.0]
+        assert tail[-1]["status"] == "abnormal_rule" and tail[-1]["timestamp"] == tail[-2]["timestamp"]
+
+        since = prediction_store._iso(base + 250)
+        until = prediction_store._iso(base + 420)
+        rows = store.scan(since=since, until=until)
+        assert len(rows) == 170
+        assert rows[0]["timestamp"] == since and rows[0]["dc_power"] == 50.0
+        assert rows[-1]["model_version"] == "plant_1" and rows[-1]["dc_power"] == 19.0
+        assert len(store.scan(since=since, limit=7)) == 7
+
+        # A second writer (another worker) interleaves in time with the first
+        other = prediction_store.PredictionLogStore(log_dir)
+        other._seq = 100
+        other.append([(base + 999.5, "predict-power", 0, 0, 123.0, "success", "w2")])
+        assert [r["model_version"] for r in store.tail(2)] == ["v1", "w2"]
+
+        # None strings round-trip as None, distinct from an empty string
+        other.append([(base + 1000, "predict-power", 1, 1, 2.0, None, ""), (base + 1001, None, 1, 1, 2.0, "", None)])
+        first, second = store.tail(2)
+        assert (first["status"], first["model_version"]) == (None, "")
+        assert (second["endpoint"], second["status"], second["model_version"]) == (None, "", None)
+        store.close()
+        other.close()
+    print("  PASSED\n")
+
+
+def test_ops_store():
+    print("TEST: Operational store (SQLite WAL)")
+    import json
+    import threading
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_alerts = os.path.join(tmp, "alerts.json")
+        with open(legacy_alerts, "w") as f:
+            json.dump([
+                {"logged_at": "2026-01-01T00:00:00", "alert": {"alert_id": "a1", "severity": "P0", "plant_id": 1, "timestamp": "2026-01-01T00:00:00"}},
+                {"logged_at": "2026-01-02T00:00:00", "alert": {"alert_id": "a2", "severity": "P1", "plant_id": 2, "timestamp": "2026-01-02T00:00:00"}},
+            ], f)
+        legacy = {"alerts_test": (legacy_alerts, "alerts", "alerting")}
+
+        store = ops_store.OpsStore(os.path.join(tmp, "ops.db"), migrate=False)
+        assert store.migrate_legacy_files(legacy) == {"alerts_test": 2}
+        assert store.migrate_legacy_files(legacy) == {}  # one-time
+        assert store._conn().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        # Concurrent appends from several threads are all kept
+        def writer(n):
+            for i in range(25):
+                store.insert("alerts", {"alert": {"alert_id": f"t{n}-{i}", "severity": "P2", "plant_id": 3,
+                                                  "timestamp": f"2026-02-{n + 1:02d}T00:00:{i:02d}"}}, "alerting")
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert store.count_alerts() == 102
+        assert store.count_alerts(severity="P0") == 1
+
+        # Indexed filters, newest first, original documents returned
+        latest = store.query_alerts(plant_id=3, limit=1)[0]
+        assert latest["alert"]["alert_id"] == "t3-24"
+        assert [a["alert"]["alert_id"] for a in store.query_alerts(until="2026-02-01", newest_first=False)] == ["a1", "a2"]
+
+        # Row-cap retention (agent alerts keep the last 50, memory the last 10)
+        for i in range(60):
+            store.insert("alerts", {"timestamp": f"2026-03-01T00:{i // 60:02d}:{i % 60:02d}", "severity": "P1"}, "agent")
+            store.insert("memory", {"plant_id": 1, "question": f"q{i}", "timestamp": f"2026-03-01T{i:04d}"})
+        assert store.count_alerts(source="agent") == 50
+        memory = store.recent_memory(10)
+        assert [m["question"] for m in memory] == [f"q{i}" for i in range(50, 60)]
+
+        # Age retention
+        original = ops_store.RETENTION[("alerts", "alerting")]
+        ops_store.RETENTION[("alerts", "alerting")] = {"max_rows": None, "max_age_days": 1}
+        try:
+            assert store.apply_retention()["alerts:alerting"] == 102
+        finally:
+            ops_store.RETENTION[("alerts", "alerting")] = original
+    print("  PASSED\n")
+
+
+def test_alert_index():
+    print("TEST: Incremental alert index")
+    from phase_08_agent.alert_index import AlertIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ops_store.OpsStore(os.path.join(tmp, "ops.db"), migrate=False)
+        for i in range(30):
+            store.insert("alerts", {"logged_at": "x", "alert": {
+                "alert_id": f"a{i}", "severity": ("P0", "P1", "P2")[i % 3],
+                "plant_id": 1 + i % 2, "timestamp": f"2026-01-01T00:00:{i:02d}"}}, "alerting")
+
+        index = AlertIndex(store)
+        assert index.count() == 30 and index.count(severity="P0") == 10
+        assert index.count(severity="P1", plant_id=2) == 5
+        assert [a["alert_id"] for a in index.query(severity="P0", limit=2)] == ["a27", "a24"]
+        assert [a["alert_id"] for a in index.query(since="2026-01-01T00:00:10", until="2026-01-01T00:00:13", limit=None)] == ["a12", "a11", "a10"]
+        assert index.counters()["by_plant"] == {1: 15, 2: 15}
+        assert index.stats()["builds"] == 1
+
+        # Appends from another connection are picked up incrementally
+        store.insert("alerts", {"alert": {"alert_id": "late", "severity": "P0", "plant_id": 1,
+                                          "timestamp": "2026-01-02T00:00:00"}}, "alerting")
+        assert index.query(severity="P0", plant_id=1, limit=1)[0]["alert_id"] == "late"
+        assert index.stats()["incremental_rows"] == 1 and index.stats()["builds"] == 1
+
+        # Unchanged store: no query beyond PRAGMA data_version
+        refreshes = index.stats()["refreshes"]
+        index.count()
+        assert index.stats()["refreshes"] == refreshes
+
+        # The 50-row cap on agent alerts is followed by eviction, not rebuilds
+        for i in range(55):
+            store.insert("alerts", {"timestamp": f"2026-02-01T00:00:{i:02d}", "severity": "P1"}, "agent")
+            assert index.count() == 31 + min(i + 1, 50)
+        assert index.query(limit=1)[0]["timestamp"] == "2026-02-01T00:00:54"
+        assert index.query(severity="P1", limit=None)[-1]["alert_id"] == "a1"
+        assert index.count(severity="P1") == 10 + 50
+        assert index.stats()["builds"] == 1 and index.stats()["evicted_rows"] == 5
+
+        # Any other delete (age sweep, manual cleanup) still rebuilds
+        with sqlite3.connect(store.path) as conn:
+            conn.execute("DELETE FROM alerts WHERE source = 'alerting' AND json_extract(record, '$.alert.alert_id') = 'a12'")
+        assert index.count() == 30 + 50 and index.stats()["builds"] == 2
+    print("  PASSED\n")
+
+
+if __name__ == "__main__":
+    test_model_pool()
+    test_batch_inference()
+    test_feature_layout()
+    test_async_prediction_logger()
+    test_streaming_drift()
+    test_batch_anomaly_scoring()
+    test_telemetry_features()
+    test_artifact_cache()
+    test_service_metrics()
+    test_startup_report()
+    test_prediction_log_store()
+    test_ops_store()
+    test_alert_index()
+    print("ALL TESTS PASSED")
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from phase_09_agent_orchestration import llm_client, prompt_builder
+from phase_09_agent_orchestration.prompt_builder import Section, build_prompt
+
+
+class _FakeOllama(BaseHTTPRequestHandler):
+    """Minimal /api/tags + /api/generate stand-in for a local Ollama."""
+
+    def do_GET(self):
+        self._reply({"models": [{"name": "mistral"}]})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if not body.get("stream"):
+            if body["prompt"].startswith("slow"):
+                time.sleep(1)
+            self._reply({"response": f"echo: {body['prompt']}"})
+            return
+
+        # NDJSON token stream, one word per chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for word in body["prompt"].split():
+                self.wfile.write((json.dumps({"response": word + " ", "done": False}) + "\n").encode())
+                self.wfile.flush()
+                time.sleep(0.02)
+            self.wfile.write(b'{"response": "", "done": true}\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _reply(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _closed_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def test_llm_client():
+    print("TEST: Shared LLM client (discovery cache / circuit breaker)")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    live_url = f"http://127.0.0.1:{server.server_address[1]}"
+    dead_url = _closed_port_url()
+
+    original_hosts = llm_client.OLLAMA_HOSTS
+    original_breaker = llm_client.BREAKER
+    try:
+        # Dead host is probed once, then the reachable one is cached
+        llm_client.OLLAMA_HOSTS = [dead_url, live_url]
+        llm_client._host["url"] = None
+        discoveries = llm_client._stats["discoveries"]
+        assert llm_client.generate("hello", timeout=5) == "echo: hello"
+        assert llm_client.generate_summary("again") == "echo: again"
+        assert llm_client._stats["discoveries"] == discoveries + 1
+        assert llm_client.get_llm_stats()["host"] == live_url
+
+        # Streamed tokens arrive in order; closing early frees the slot
+        assert "".join(llm_client.stream_generate("a b c", timeout=5)) == "a b c "
+        tokens = llm_client.stream_generate(" ".join(["w"] * 50), timeout=5)
+        assert next(tokens) == "w "
+        tokens.close()
+        time.sleep(0.1)
+        assert llm_client.get_llm_stats()["in_flight"] == 0
+        assert llm_client.BREAKER.state == "closed"
+
+        # Backend down: breaker opens after 2 failures, then fails fast
+        llm_client.OLLAMA_HOSTS = [dead_url]
+        llm_client._host["url"] = None
+        llm_client.BREAKER = llm_client.CircuitBreaker(failure_threshold=2, cooldown=60)
+        for _ in range(2):
+            assert llm_client.generate_summary("x").startswith("LLM call failed")
+        assert llm_client.BREAKER.state == "open"
+
+        started = time.perf_counter()
+        assert "circuit open" in llm_client.generate_summary("x")
+        assert time.perf_counter() - started < 0.5
+
+        # A cancelled half-open trial releases the trial slot
+        llm_client.OLLAMA_HOSTS = [live_url]
+        llm_client.BREAKER.cooldown = 0
+        trial = asyncio.run_coroutine_threadsafe(
+            llm_client._guarded_generate("slow", llm_client.OLLAMA_MODEL, 5), llm_client._get_loop()
+        )
+        time.sleep(0.2)
+        trial.cancel()
+        time.sleep(0.1)
+        assert not llm_client.BREAKER._trial_in_flight
+
+        # Half-open trial succeeds once the backend is back
+        assert llm_client.generate("back", timeout=5) == "echo: back"
+        assert llm_client.BREAKER.state == "closed"
+
+        # All slots busy until the deadline: a queueing error, not a backend failure
+        llm_client.BREAKER = llm_client.CircuitBreaker(failure_threshold=1, cooldown=60)
+        busy = [
+            asyncio.run_coroutine_threadsafe(
+                llm_client._guarded_generate(f"slow {i}", llm_client.OLLAMA_MODEL, 5), llm_client._get_loop()
+            )
+            for i in range(llm_client.LLM_MAX_CONCURRENCY)
+        ]
+        time.sleep(0.1)
+        failures, queue_timeouts = llm_client._stats["failures"], llm_client._stats["queue_timeouts"]
+        try:
+            llm_client.generate("queued", timeout=0.3)
+            raise AssertionError("saturated client did not time out")
+        except llm_client.LLMBusyError:
+            pass
+        assert llm_client._stats["queue_timeouts"] == queue_timeouts + 1
+        assert llm_client._stats["failures"] == failures and llm_client.BREAKER.state == "closed"
+        assert [f.result(5) for f in busy][0] == "echo: slow 0"
+    finally:
+        llm_client.OLLAMA_HOSTS = original_hosts
+        llm_client.BREAKER = original_breaker
+        llm_client._host["url"] = None
+        server.shutdown()
+    print("  PASSED\n")
+
+
+def test_prompt_builder():
+    print("TEST: Token-budgeted prompt builder")
+    report = {"model_version": "xgb_v1", "top_features": {f"f{i}": 0.1 for i in range(30)},
+              "metrics": {"r2": 0.512345678, "rmse": 123456.78123, "baseline_rmse": 65.6}}
+    tool_results = {
+        "simulation_result": {"metrics": report, "drift_status": {}, "is_simulation": True},
+        "ops_agent": {"error": "boom", "traceback": "Traceback ..." * 50},
+    }
+    compact = prompt_builder.compact_json(tool_results)
+    assert compact == (
+        '{"simulation_result":{"metrics":{"r2":0.5123,"rmse":123456.7812},"is_simulation":true},'
+        '"ops_agent":{"error":"boom"}}'
+    )
+
+    # Within budget: nothing is cut
+    sections = [
+        Section("Question", "what happened?"),
+        Section("Alerts", [{"alert_id": i, "message": "x" * 40} for i in range(20)], priority=2),
+        Section("RAG Context", "context " * 200, priority=1),
+        Section("", "Answer from the data above."),
+    ]
+    prompt, info = build_prompt("test", sections, budget=10_000)
+    assert not info["truncated"] and not info["omitted"]
+    assert info["tokens"] == prompt_builder.estimate_tokens(prompt)
+
+    # Over budget: lowest priority goes first, required sections stay
+    prompt, info = build_prompt("test", sections, budget=300)
+    assert info["tokens"] <= 300
+    assert info["omitted"] == ["RAG Context"] and info["truncated"] == ["Alerts"]
+    assert "what happened?" in prompt and prompt.endswith("Answer from the data above.\n")
+    assert '"alert_id":0' in prompt and "more omitted" in prompt
+    assert prompt_builder.get_prompt_stats()["kinds"]["test"]["prompts"] == 2
+    print("  PASSED\n")
+
+
+if __name__ == "__main__":
+    test_prompt_builder()
+    test_llm_client()
+    print("ALL TESTS PASSED")
@@ -52,6 +52,6 @@ print()
 
 # ========== LOGGER ==========
 log_simulation({"test": "all_cases_passed"})
-print("Logger: OK [simulation_logs.json updated]")
+print("Logger: OK [simulation logged to ops store]")
 print()
 print("ALL TESTS PASSED")
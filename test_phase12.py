@@ -18,6 +18,7 @@ os.makedirs(VECTOR_DIR, exist_ok=True)
 # Temporarily override config to use test directory
 import phase_12_vector_rag.config as cfg
 cfg.CHROMA_PERSIST_DIR = VECTOR_DIR
+cfg.VECTOR_INDEX_DIR = os.path.join(VECTOR_DIR, "index")
 
 # Force re-init of vector store with test directory
 import importlib
@@ -154,6 +155,352 @@ print(f"  doc_count: {rag2['doc_count']}")
 print(f"  confidence_boost: {rag2['confidence_boost']}")
 print("  PASSED\n")
 
+# ========== TEST 9: Embedding cache + skip-existing ingestion ==========
+print("TEST 9: Persistent embedding cache and skip-existing ingestion")
+import tempfile
+from phase_12_vector_rag import ingestion_pipeline
+from phase_12_vector_rag.document_schemas import OperationalLog
+from phase_12_vector_rag import embedding_cache
+from phase_12_vector_rag.embedding_cache import EmbeddingCache
+
+encoded = []
+
+
+def counting_encode(texts):
+    encoded.extend(texts)
+    return encode_batch(texts)
+
+
+with tempfile.TemporaryDirectory() as cache_dir:
+    cache = EmbeddingCache(cache_dir)
+    texts = ["inverter 3 tripped", "string fuse replaced", "inverter 3 tripped"]
+    first = cache.encode(texts, counting_encode)
+    assert encoded == ["inverter 3 tripped", "string fuse replaced"]
+    assert first[0] == first[2]
+    assert len(cache) == 2
+
+    # A fresh instance (e.g. after restart) serves from disk without the model
+    encoded.clear()
+    reopened = EmbeddingCache(cache_dir)
+    again = reopened.encode(texts, counting_encode)
+    assert encoded == [] and reopened.stats()["hits"] == 3
+    assert all(abs(a - b) < 1e-6 for a, b in zip(first[0], again[0]))
+    print(f"  cache entries: {len(reopened)}, reopen hits: {reopened.stats()['hits']}")
+
+    # Two writers appending the same text leave a duplicate row; later
+    # rows from the other writer are still found at the right offset
+    shared_dir = os.path.join(cache_dir, "shared")
+    writer_a, writer_b = EmbeddingCache(shared_dir), EmbeddingCache(shared_dir)
+    vector = [0.5] * cfg.EMBEDDING_DIMENSION
+    writer_a.put_many(["same text"], [vector])
+    writer_b.put_many(["same text"], [vector])
+    writer_b.put_many(["other text"], [[0.25] * cfg.EMBEDDING_DIMENSION])
+    assert writer_a.get_many(["other text"])[0][0] == 0.25
+    assert len(writer_a) == 2 and writer_a._synced == 3
+
+    # Ingestion embeds only documents whose IDs are not yet stored
+    embedding_cache._cache = EmbeddingCache(os.path.join(cache_dir, "ingest"))
+    ingestion_pipeline.encode_batch = counting_encode
+    encoded.clear()
+    docs = [OperationalLog(content=f"cache test log {i}") for i in range(3)]
+    assert ingestion_pipeline._ingest_batch(docs) == 3
+    assert len(encoded) == 3
+    encoded.clear()
+    docs.append(OperationalLog(content="cache test log 3"))
+    assert ingestion_pipeline._ingest_batch(docs) == 1
+    assert encoded == ["cache test log 3"]
+    ingestion_pipeline.encode_batch = encode_batch
+    embedding_cache._cache = None
+print("  PASSED\n")
+
+# ========== TEST 10: Query + retrieval caches ==========
+print("TEST 10: Query embedding and retrieval caches")
+from phase_12_vector_rag import retriever
+from phase_12_vector_rag.query_cache import QUERY_EMBEDDINGS, RETRIEVALS
+from phase_12_vector_rag.vector_store import get_generation
+
+QUERY_EMBEDDINGS.clear()
+RETRIEVALS.clear()
+
+
+def counting_encode_text(text):
+    encoded.append(text)
+    return encode_text(text)
+
+
+retriever.encode_text = counting_encode_text
+encoded.clear()
+
+first = retrieve_relevant_documents("Have we seen CRITICAL alerts?", plant_id=1)
+again = retrieve_relevant_documents("  have we seen critical alerts ", plant_id=1)
+assert again == first and encoded == ["have we seen critical alerts"]
+assert RETRIEVALS.stats()["hits"] == 1
+
+# Different filters reuse the embedding but query the store
+retrieve_relevant_documents("Have we seen CRITICAL alerts?", plant_id=2)
+assert len(encoded) == 1 and RETRIEVALS.stats()["misses"] == 2
+
+# New documents bump the generation and invalidate cached results
+generation = get_generation()
+add_documents(["test_004"], ["CRITICAL P0 alert: tracker stalled at plant 1"],
+              encode_batch(["CRITICAL P0 alert: tracker stalled at plant 1"]),
+              [{"doc_type": "AlertRecord", "plant_id": "1", "timestamp": "2025-01-04"}])
+assert get_generation() == (generation[0] + 1, generation[1] + 1)
+fresh = retrieve_relevant_documents("Have we seen CRITICAL alerts?", plant_id=1)
+assert RETRIEVALS.stats()["misses"] == 3 and len(encoded) == 1
+assert any(d["id"] == "test_004" for d in fresh)
+
+# Writes that bypass this process's add_documents (another process) do too
+generation = get_generation()
+vs.get_collection().add(ids=["test_005"], documents=["CRITICAL P0 alert: combiner box fire at plant 1"],
+                        embeddings=encode_batch(["CRITICAL P0 alert: combiner box fire at plant 1"]),
+                        metadatas=[{"doc_type": "AlertRecord", "plant_id": "1", "timestamp": "2025-01-05"}])
+assert get_generation() != generation
+fresh = retrieve_relevant_documents("Have we seen CRITICAL alerts?", plant_id=1)
+assert RETRIEVALS.stats()["misses"] == 4
+retriever.encode_text = encode_text
+print(f"  caches: {QUERY_EMBEDDINGS.stats()} {RETRIEVALS.stats()}")
+print("  PASSED\n")
+
+# ========== TEST 11: Memory-mapped vector index ==========
+print("TEST 11: Memory-mapped vector index (numpy backend)")
+import numpy as np
+from phase_12_vector_rag.mmap_index import MmapVectorIndex
+
+rng = np.random.default_rng(0)
+vectors = rng.standard_normal((300, 384)).astype(np.float32)
+vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+row_ids = [f"row_{i}" for i in range(300)]
+row_docs = [f"document {i}" for i in range(300)]
+row_metas = [{"plant_id": str(1 + i % 3), "doc_type": ("AlertRecord", "OperationalLog")[i % 2]}
+             for i in range(300)]
+
+with tempfile.TemporaryDirectory() as index_dir:
+    for dtype in ("float32", "float16"):
+        index = MmapVectorIndex(os.path.join(index_dir, dtype), dtype=dtype)
+        index.add(row_ids[:200], row_docs[:200], vectors[:200].tolist(), row_metas[:200])
+        index.add(row_ids[150:], row_docs[150:], vectors[150:].tolist(), row_metas[150:])
+        assert index.count() == 300
+
+        queries = vectors[:4] + 0.01
+        exact = ((vectors[None] - queries[:, None]) ** 2).sum(-1)
+        result = index.query(queries.tolist(), n_results=5)
+        for q in range(4):
+            assert result["ids"][q] == [row_ids[i] for i in np.argsort(exact[q])[:5]]
+        assert result["documents"][0][0] == "document 0"
+        assert abs(result["distances"][0][0] - exact[0].min()) < 1e-2
+
+        where = {"$and": [{"plant_id": "2"}, {"doc_type": "OperationalLog"}]}
+        filtered = index.query(queries[:1].tolist(), n_results=5, where=where)
+        assert len(filtered["ids"][0]) == 5
+        assert all(m == {"plant_id": "2", "doc_type": "OperationalLog"} for m in filtered["metadatas"][0])
+
+        # Survives a restart, including a torn trailing row
+        with open(os.path.join(index_dir, dtype, "rows.jsonl"), "ab") as f:
+            f.write(b'["row_torn"')
+        reopened = MmapVectorIndex(os.path.join(index_dir, dtype), dtype=dtype)
+        assert reopened.count() == 300
+        assert reopened.query(queries.tolist(), n_results=5)["ids"] == result["ids"]
+        print(f"  {dtype}: {reopened.stats()}")
+
+    # Two processes sharing a directory see each other's rows
+    shared = os.path.join(index_dir, "shared")
+    writer, reader = MmapVectorIndex(shared), MmapVectorIndex(shared)
+    writer.add(row_ids[:10], row_docs[:10], vectors[:10].tolist(), row_metas[:10])
+    assert reader.count() == 10
+    reader.add(row_ids[5:20], row_docs[5:20], vectors[5:20].tolist(), row_metas[5:20])
+    writer.add(row_ids[20:30], row_docs[20:30], vectors[20:30].tolist(), row_metas[20:30])
+    for current in (writer, reader, MmapVectorIndex(shared)):
+        assert current.count() == 30
+        hit = current.query(vectors[[3, 15, 25]].tolist(), n_results=1)
+        assert [ids[0] for ids in hit["ids"]] == ["row_3", "row_15", "row_25"]
+        assert max(d[0] for d in hit["distances"]) < 1e-4
+
+    # A failed add leaves no orphan vectors behind
+    index = MmapVectorIndex(os.path.join(index_dir, "rollback"))
+    index.add(row_ids[:2], row_docs[:2], vectors[:2].tolist(), row_metas[:2])
+    try:
+        index.add(["bad"], ["unserializable"], vectors[2:3].tolist(), [{"when": object()}])
+        raise AssertionError("unserializable metadata was accepted")
+    except TypeError:
+        pass
+    index.add(row_ids[3:4], row_docs[3:4], vectors[3:4].tolist(), row_metas[3:4])
+    for current in (index, MmapVectorIndex(os.path.join(index_dir, "rollback"))):
+        hit = current.query(vectors[3:4].tolist(), n_results=1)
+        assert hit["ids"][0] == ["row_3"] and hit["distances"][0][0] < 1e-4
+
+    # Vectors written by a first add that crashed before its rows are dropped
+    crashed = os.path.join(index_dir, "crashed")
+    MmapVectorIndex(crashed).add(row_ids[:1], row_docs[:1], vectors[:1].tolist(), row_metas[:1])
+    os.remove(os.path.join(crashed, "rows.jsonl"))
+    assert MmapVectorIndex(crashed).count() == 0
+    assert os.path.getsize(os.path.join(crashed, "vectors.f32")) == 0
+print("  PASSED\n")
+
+# ========== TEST 12: Hybrid lexical + vector retrieval ==========
+print("TEST 12: BM25 lexical index and hybrid retrieval")
+from phase_12_vector_rag.ingestion_pipeline import ingest_single_document
+from phase_12_vector_rag.lexical_index import LEXICAL_INDEX, LexicalIndex, tokenize
+
+assert tokenize("Have we seen P0 on plant 2?") == ["seen", "p0", "plant", "2"]
+lexical = LexicalIndex()
+lexical.add(["a", "b", "c"],
+            ["Alert 3f2a9c1b: Severity P0, Plant 2", "Alert 77aa12cd: Severity P1, Plant 1",
+             "Alert 9b9b0e01: Severity P0, Plant 1"],
+            [{"plant_id": "2"}, {"plant_id": "1"}, {"plant_id": "1"}])
+by_id = lexical.search("alert 3f2a9c1b")
+assert by_id["decisive"] and [doc_id for doc_id, _ in by_id["hits"]] == ["a"]
+p0 = lexical.search("P0 on plant 2")
+assert not p0["decisive"] and p0["hits"][0][0] == "a" and len(p0["hits"]) == 3
+assert [doc_id for doc_id, _ in lexical.search("P0", plant_id=1)["hits"]] == ["c"]
+
+# Documents ingested after the index was bootstrapped are searchable at once
+ingest_single_document("AlertRecord", "Alert 5e0c7d21: Severity P0, Plant 1. Inverter offline", plant_id=1)
+assert LEXICAL_INDEX.search("5e0c7d21")["decisive"]
+
+# A decisive lexical match answers without embedding the question
+retriever.encode_text = counting_encode_text
+encoded.clear()
+found = retrieve_relevant_documents("What happened with alert 5e0c7d21?")
+assert encoded == [] and found[0]["content"].startswith("Alert 5e0c7d21")
+assert found[0]["distance"] is None and found[0]["relevance_score"] == 1.0
+
+# Otherwise lexical scores are fused with vector relevance
+found = retrieve_relevant_documents("P0 inverter offline at plant 1", plant_id=1)
+assert len(encoded) == 1 and found[0]["content"].startswith("Alert 5e0c7d21")
+assert found[0]["lexical_score"] == 1.0 and found[0]["distance"] is not None
+
+# Documents another process stored (a backfill skips the BM25 index) are picked up at query time
+from phase_12_vector_rag.ingestion_pipeline import _store_vectors_only
+_store_vectors_only(["backfilled-4b1e9a07"], ["Alert 4b1e9a07: Severity P1, Plant 3. String fault"],
+                    [encode_text("Alert 4b1e9a07: Severity P1, Plant 3. String fault")],
+                    [{"doc_type": "AlertRecord", "plant_id": "3"}])
+assert not LEXICAL_INDEX.search("4b1e9a07")["hits"]
+found = retrieve_relevant_documents("What happened with alert 4b1e9a07?")
+assert found[0]["content"].startswith("Alert 4b1e9a07") and LEXICAL_INDEX.search("4b1e9a07")["decisive"]
+
+# A shared common token ("plant") never admits documents without vector support
+assert LEXICAL_INDEX.search("weather forecast for plant 7 tomorrow")["hits"]
+retriever.query = lambda *args, **kwargs: {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+assert retrieve_relevant_documents("What is the weather forecast for plant 7 tomorrow?") == []
+retriever.query = query
+retriever.encode_text = encode_text
+print(f"  lexical index: {LEXICAL_INDEX.stats()}")
+print("  PASSED\n")
+
+# ========== TEST 13: ONNX int8 embedding backend parity ==========
+print("TEST 13: ONNX int8 embedding parity with torch")
+try:
+    import onnxruntime  # noqa: F401
+    from phase_12_vector_rag.onnx_embedder import OnnxEmbedder
+except ImportError:
+    OnnxEmbedder = None
+
+if OnnxEmbedder is None:
+    print("  SKIPPED (onnxruntime not installed)\n")
+else:
+    sentences = [
+        "CRITICAL P0 alert: inverter failure at plant 1",
+        "Normal operation",
+        "Have we seen similar drift in DC_POWER readings before, and what was the decision taken?",
+        "Alert 3f2a9c1b: Severity P1, Priority HIGH, Plant 2. Decision: schedule maintenance.",
+    ]
+    onnx_model = OnnxEmbedder(os.path.join(VECTOR_DIR, "onnx_model"))
+    onnx_vectors = onnx_model.encode(sentences)
+    torch_vectors = np.asarray(encode_batch(sentences))
+    cosines = (onnx_vectors * torch_vectors).sum(axis=1) / (
+        np.linalg.norm(onnx_vectors, axis=1) * np.linalg.norm(torch_vectors, axis=1)
+    )
+    assert onnx_vectors.shape == (4, 384)
+    assert cosines.min() > 0.98, cosines
+    # Bucketed batches and coalesced single calls match unbatched results
+    assert np.allclose(onnx_model.encode_one(sentences[2]), onnx_model.encode(sentences[2]), atol=1e-5)
+    print(f"  cosine vs torch: min {cosines.min():.4f}, mean {cosines.mean():.4f}")
+    print(f"  stats: {onnx_model.stats()}")
+    print("  PASSED\n")
+
+# ========== TEST 14: Bulk ingestion pipeline ==========
+print("TEST 14: Parallel, bounded bulk ingestion")
+import threading
+import time
+from phase_12_vector_rag.bulk_ingestion import BulkIngestion
+
+stored = {}
+stored_lock = threading.Lock()
+done_sources = []
+
+
+def fake_existing(ids):
+    with stored_lock:
+        return {i for i in ids if i in stored}
+
+
+def slow_write(ids, contents, embeddings, metadatas):
+    time.sleep(0.01)  # writer slower than readers: backpressure must hold
+    with stored_lock:
+        for doc_id, embedding in zip(ids, embeddings):
+            stored[doc_id] = embedding
+    return len(ids)
+
+
+def stream(prefix, n):
+    for i in range(n):
+        yield OperationalLog(content=f"{prefix} bulk log {i % (n - 5)}", timestamp=f"2024-01-01T00:00:{i:02d}")
+
+
+preexisting = OperationalLog(content="logs bulk log 0", timestamp="2024-01-01T00:00:00")
+stored[preexisting.doc_id] = [0.0]
+pipeline = BulkIngestion(
+    existing=fake_existing, embed=lambda texts: [[float(len(t))] for t in texts], write=slow_write,
+    batch_size=4, workers=3, write_size=8, queue_depth=2,
+    on_source_done=lambda source, n: done_sources.append((source, n)),
+)
+report = pipeline.run({"logs": stream("logs", 45), "more": stream("more", 25)})
+assert report["sources"]["logs"]["read"] == 45
+assert report["sources"]["logs"]["written"] == 39            # 40 distinct, one pre-stored
+assert report["sources"]["more"]["written"] == 20
+assert report["totals"]["read"] == report["totals"]["written"] + report["totals"]["skipped"]
+assert done_sources == [("logs", 39), ("more", 20)]
+assert report["max_queued"]["embed"] <= 2 and report["max_queued"]["write"] <= 2
+assert len(stored) == 60
+
+# Rows another ingest stored between the recheck and the write are
+# counted as skipped, not written
+raced = []
+
+
+def racing_write(ids, contents, embeddings, metadatas):
+    with stored_lock:
+        if not raced:
+            raced.append(ids[0])
+            stored[ids[0]] = [0.0]  # a concurrent ingest_single_document won
+        new = [i for i in ids if i not in stored]
+        for doc_id in new:
+            stored[doc_id] = [0.0]
+    return len(new)
+
+
+done_sources.clear()
+race = BulkIngestion(
+    fake_existing, lambda texts: [[0.0] for _ in texts], racing_write, batch_size=4,
+    on_source_done=lambda source, n: done_sources.append((source, n)),
+).run({"race": stream("race", 15)})
+assert race["sources"]["race"]["written"] == 9 and race["sources"]["race"]["skipped"] == 6
+assert done_sources == [("race", 9)]
+
+
+def failing_embed(texts):
+    raise RuntimeError("model unavailable")
+
+
+try:
+    BulkIngestion(fake_existing, failing_embed, slow_write, batch_size=4).run({"logs": stream("fail", 40)})
+    raise AssertionError("embedding error was swallowed")
+except RuntimeError as e:
+    assert "model unavailable" in str(e)
+print(f"  {report['totals']} in {report['elapsed_seconds']}s")
+print("  PASSED\n")
+
 # ========== CLEANUP ==========
 try:
     shutil.rmtree(VECTOR_DIR)
@@ -6,6 +6,8 @@ import json
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from phase_13_tool_calling.tool_router import run_dynamic_orchestration
+from phase_13_tool_calling.tool_executor import build_dependencies, execute_tools
+from phase_13_tool_calling.tool_registry import TOOL_REGISTRY
 
 def test_dynamic_routing():
     queries = [
@@ -37,5 +39,86 @@ def test_dynamic_routing():
         except Exception as e:
             print(f"❌ Failed: {e}")
 
+def test_parallel_tool_execution():
+    import time
+    from phase_08_agent.risk_engine import calculate_risk
+
+    # Simulation waits for earlier metric readers, later readers wait for it
+    plan = ["ops_agent", "drift_checker", "simulation_engine", "risk_agent", "log_inspector"]
+    assert build_dependencies(plan) == [set(), set(), {0}, {2}, set()]
+
+    # Independent I/O-bound tools overlap
+    def slow_tool(shared_state):
+        time.sleep(0.2)
+        return {}
+
+    TOOL_REGISTRY["slow_a"] = {"func": slow_tool, "desc": "", "schema": None, "reads": (), "writes": ()}
+    TOOL_REGISTRY["slow_b"] = {"func": slow_tool, "desc": "", "schema": None, "reads": (), "writes": ()}
+    try:
+        started = time.perf_counter()
+        execute_tools(["slow_a", "slow_b"], {})
+        assert time.perf_counter() - started < 0.35, "independent tools did not run concurrently"
+    finally:
+        del TOOL_REGISTRY["slow_a"], TOOL_REGISTRY["slow_b"]
+
+    # Readers planned after the simulation see the simulated metrics
+    shared_state = {
+        "metrics": {"metrics": {"r2": 0.99, "rmse": 2.0, "mape": 1.0}},
+        "drift_status": {},
+        "question": "what if r2 is 0.5?",
+        "overrides_applied": {}
+    }
+    results = execute_tools(["simulation_engine", "risk_agent", "drift_checker"], shared_state)
+    assert shared_state["metrics"]["metrics"]["r2"] == 0.5
+    assert results["risk_assessment"]["risk_level"] == calculate_risk(shared_state["metrics"])
+    print("✅ Validated: DAG ordering around simulation_engine + concurrent lookups")
+
+def test_plan_cache_and_fast_planner():
+    from phase_13_tool_calling import llm_planner
+    from phase_13_tool_calling.fast_planner import fast_plan
+    from phase_13_tool_calling.plan_cache import PlanCache, canonicalize
+
+    assert canonicalize("What if  R2 drops to 0.75?") == ("what if r2 drops to <num>", [0.75])
+    assert canonicalize("risk exceeds 700,000") == ("risk exceeds <num>", [700000])
+
+    # Literals are re-bound on a hit; untraceable numbers are not cached
+    cache = PlanCache(max_size=2)
+    template, literals = canonicalize("If financial risk exceeds 700000 and r2 is 0.8")
+    plan = {"steps": [{"tool": "simulation_engine", "args": {"overrides": {"estimated_financial_risk": 700000, "r2": 0.8}}}]}
+    assert cache.put(template, literals, plan)
+    hit = cache.get(*canonicalize("if financial risk exceeds 900000 and r2 is 0.6"))
+    assert hit["steps"][0]["args"]["overrides"] == {"estimated_financial_risk": 900000, "r2": 0.6}
+    assert not cache.put(*canonicalize("what if r2 drops below 0.8"), {"steps": [{"tool": "simulation_engine", "args": {"overrides": {"r2": 0.79}}}]})
+
+    # Rules plan confident questions, defer ambiguous ones
+    plan = fast_plan("What if R2 drops to 0.7?")
+    assert plan["steps"][0] == {"tool": "simulation_engine", "args": {"overrides": {"r2": 0.7}}, "reason": "Fast path: hypothetical scenario"}
+    assert [s["tool"] for s in fast_plan("Show the drift risk and recent logs")["steps"]] == ["risk_agent", "drift_checker", "log_inspector"]
+    assert fast_plan("What is the financial risk if drift increases?") is None
+    assert fast_plan("Simulate a critical failure in the system.") is None
+
+    # Only the first question of a template reaches the LLM
+    calls = []
+    def fake_llm_plan(question):
+        calls.append(question)
+        return {"steps": [{"tool": "simulation_engine", "args": {"overrides": {"r2": 0.4}}}]}, True
+
+    original = llm_planner._llm_plan
+    llm_planner._llm_plan = fake_llm_plan
+    llm_planner.PLAN_CACHE.clear()
+    try:
+        assert llm_planner.plan_tools("Imagine a failure where r2 hits 0.4")["source"] == "llm"
+        plan = llm_planner.plan_tools("imagine a failure where r2 hits 0.3")
+        assert plan["source"] == "cache" and plan["steps"][0]["args"]["overrides"] == {"r2": 0.3}
+        assert llm_planner.plan_tools("Is the model performance stable?")["source"] == "fast_path"
+        assert len(calls) == 1
+        assert llm_planner.get_planner_stats()["llm_calls_saved"] >= 2
+    finally:
+        llm_planner._llm_plan = original
+        llm_planner.PLAN_CACHE.clear()
+    print("✅ Validated: plan cache re-binding + fast-path planner")
+
 if __name__ == "__main__":
+    test_plan_cache_and_fast_planner()
+    test_parallel_tool_execution()
     test_dynamic_routing()